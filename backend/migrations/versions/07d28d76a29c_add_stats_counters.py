@@ -0,0 +1,115 @@
+"""add stats counters
+
+Revision ID: 07d28d76a29c
+Revises: b03ad6870f21
+Create Date: 2026-10-16 22:40:27.769641
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '07d28d76a29c'
+down_revision = 'b03ad6870f21'
+branch_labels = None
+depends_on = None
+
+
+stats_counter_table = sa.table(
+    'stats_counter',
+    sa.column('name', sa.String),
+    sa.column('value', sa.BigInteger),
+)
+
+user_table = sa.table(
+    'user',
+    sa.column('id', sa.Integer),
+    sa.column('is_active', sa.Boolean),
+    sa.column('created_at', sa.DateTime),
+)
+
+role_table = sa.table(
+    'role',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+)
+
+user_roles_table = sa.table(
+    'user_roles',
+    sa.column('user_id', sa.Integer),
+    sa.column('role_id', sa.Integer),
+)
+
+session_table = sa.table(
+    'session',
+    sa.column('id', sa.Integer),
+    sa.column('status', sa.String),
+    sa.column('created_at', sa.DateTime),
+)
+
+session_file_table = sa.table(
+    'session_file',
+    sa.column('id', sa.Integer),
+    sa.column('file_size', sa.BigInteger),
+)
+
+session_question_table = sa.table(
+    'session_question',
+    sa.column('id', sa.Integer),
+    sa.column('status', sa.String),
+)
+
+
+def _prefixed(prefix, expression):
+    return sa.literal(prefix, sa.String) + sa.cast(expression, sa.String)
+
+
+def _total(name, table, *conditions):
+    return sa.select(sa.literal(name, sa.String), sa.func.count()).select_from(table).where(*conditions)
+
+
+def _per_status(prefix, table):
+    return (
+        sa.select(_prefixed(f'{prefix}.status.', sa.func.coalesce(table.c.status, 'none')), sa.func.count())
+        .group_by(table.c.status)
+    )
+
+
+def _per_day(prefix, table):
+    day = sa.func.date(table.c.created_at)
+    return (
+        sa.select(_prefixed(f'{prefix}.created.', day), sa.func.count())
+        .where(table.c.created_at.isnot(None))
+        .group_by(day)
+    )
+
+
+def upgrade():
+    op.create_table('stats_counter',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # Seed the counters from the existing rows; `flask reconcile-stats`
+    # performs the same computation later on
+    counters = sa.union_all(
+        _total('users.total', user_table),
+        _total('users.active', user_table, user_table.c.is_active == sa.true()),
+        sa.select(_prefixed('users.role.', role_table.c.name), sa.func.count())
+        .select_from(role_table.join(user_roles_table, user_roles_table.c.role_id == role_table.c.id))
+        .group_by(role_table.c.name),
+        _per_day('users', user_table),
+        _per_status('sessions', session_table),
+        _per_day('sessions', session_table),
+        _total('files.total', session_file_table),
+        sa.select(sa.literal('files.bytes', sa.String), sa.func.coalesce(sa.func.sum(session_file_table.c.file_size), 0)),
+        _per_status('questions', session_question_table),
+    )
+    op.execute(stats_counter_table.insert().from_select(['name', 'value'], counters))
+
+
+def downgrade():
+    op.drop_table('stats_counter')
@@ -0,0 +1,113 @@
+"""partition audit log by month
+
+Revision ID: 2ae010f29f16
+Revises: b6956f7e79af
+Create Date: 2026-10-16 23:00:21.522498
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2ae010f29f16'
+down_revision = 'b6956f7e79af'
+branch_labels = None
+depends_on = None
+
+
+# On PostgreSQL audit_log becomes range partitioned by month, which needs the
+# partition key in the primary key. Partitions are named as
+# src/utils/audit_partitions.py expects; the audit-partitions command keeps
+# creating them from here on. SQLite rotates months into their own tables
+# at run time, so it only needs timestamp made NOT NULL.
+COLUMNS = '''
+    id INTEGER NOT NULL DEFAULT nextval('audit_log_id_seq'),
+    user_id INTEGER REFERENCES "user" (id),
+    action VARCHAR(100) NOT NULL,
+    resource_type VARCHAR(50) NOT NULL,
+    resource_id INTEGER,
+    details JSON,
+    ip_address VARCHAR(45),
+    user_agent VARCHAR(500),
+    timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL
+'''
+COLUMN_NAMES = 'id, user_id, action, resource_type, resource_id, details, ip_address, user_agent, timestamp'
+LEGACY_VALUES = (
+    "id, user_id, action, resource_type, resource_id, details, ip_address, user_agent, "
+    "coalesce(timestamp, now() at time zone 'utc')"
+)
+MONTHS_AHEAD = 3
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _rename_legacy():
+    op.execute('ALTER TABLE audit_log RENAME TO audit_log_legacy')
+    op.execute('ALTER TABLE audit_log_legacy RENAME CONSTRAINT audit_log_pkey TO audit_log_legacy_pkey')
+    op.execute('ALTER INDEX ix_audit_log_timestamp RENAME TO ix_audit_log_legacy_timestamp')
+    op.execute('ALTER INDEX ix_audit_log_user_id_timestamp RENAME TO ix_audit_log_legacy_user_id_timestamp')
+
+
+def _copy_from_legacy():
+    op.execute('ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id')
+    op.execute(f'INSERT INTO audit_log ({COLUMN_NAMES}) SELECT {LEGACY_VALUES} FROM audit_log_legacy')
+    op.execute('DROP TABLE audit_log_legacy')
+    op.create_index('ix_audit_log_timestamp', 'audit_log', ['timestamp'])
+    op.create_index('ix_audit_log_user_id_timestamp', 'audit_log', ['user_id', 'timestamp'])
+
+
+def _upgrade_postgresql():
+    oldest = op.get_bind().execute(sa.text('SELECT min(timestamp) FROM audit_log')).scalar()
+    _rename_legacy()
+
+    op.execute(f'CREATE TABLE audit_log ({COLUMNS}, PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)')
+    op.execute('CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT')
+
+    today = datetime.utcnow().date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = date(today.year, today.month, 1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE audit_log_p{month:%Y%m} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+
+    _copy_from_legacy()
+
+
+def _downgrade_postgresql():
+    _rename_legacy()
+    op.execute(f'CREATE TABLE audit_log ({COLUMNS}, PRIMARY KEY (id))')
+    _copy_from_legacy()
+    op.execute('ALTER TABLE audit_log ALTER COLUMN timestamp DROP NOT NULL')
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+        return
+
+    op.execute("UPDATE audit_log SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL")
+    with op.batch_alter_table('audit_log', schema=None) as batch_op:
+        batch_op.alter_column('timestamp',
+               existing_type=sa.DATETIME(),
+               nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _downgrade_postgresql()
+        return
+
+    with op.batch_alter_table('audit_log', schema=None) as batch_op:
+        batch_op.alter_column('timestamp',
+               existing_type=sa.DATETIME(),
+               nullable=True)
@@ -0,0 +1,52 @@
+"""index audit log filters
+
+Revision ID: 50c87ea1c6eb
+Revises: 2ae010f29f16
+Create Date: 2026-10-16 23:03:34.403792
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '50c87ea1c6eb'
+down_revision = '2ae010f29f16'
+branch_labels = None
+depends_on = None
+
+
+# On PostgreSQL an index on audit_log is created on every partition. Months
+# already rotated out on SQLite are separate tables and get their own copy.
+INDEXES = {
+    'action_timestamp': ['action', 'timestamp'],
+    'resource_type_resource_id_timestamp': ['resource_type', 'resource_id', 'timestamp'],
+}
+
+
+def _rotated_tables():
+    if op.get_bind().dialect.name != 'sqlite':
+        return []
+    return op.get_bind().execute(sa.text(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'audit_log_p%'"
+    )).scalars().all()
+
+
+def upgrade():
+    with op.batch_alter_table('audit_log', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_log_action_timestamp', ['action', 'timestamp'], unique=False)
+        batch_op.create_index('ix_audit_log_resource_type_resource_id_timestamp', ['resource_type', 'resource_id', 'timestamp'], unique=False)
+
+    for name in _rotated_tables():
+        for suffix, columns in INDEXES.items():
+            op.create_index(f'ix_{name}_{suffix}', name, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name in _rotated_tables():
+        for suffix in INDEXES:
+            op.drop_index(f'ix_{name}_{suffix}', table_name=name, if_exists=True)
+
+    with op.batch_alter_table('audit_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_log_resource_type_resource_id_timestamp')
+        batch_op.drop_index('ix_audit_log_action_timestamp')
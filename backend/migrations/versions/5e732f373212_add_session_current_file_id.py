@@ -0,0 +1,66 @@
+"""add session current_file_id
+
+Revision ID: 5e732f373212
+Revises: e51ecb2dc8f1
+Create Date: 2026-10-16 22:31:21.913778
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e732f373212'
+down_revision = 'e51ecb2dc8f1'
+branch_labels = None
+depends_on = None
+
+
+session_table = sa.table(
+    'session',
+    sa.column('id', sa.Integer),
+    sa.column('current_file_id', sa.Integer),
+)
+
+session_file_table = sa.table(
+    'session_file',
+    sa.column('id', sa.Integer),
+    sa.column('session_id', sa.Integer),
+    sa.column('version_number', sa.Integer),
+    sa.column('is_current_version', sa.Boolean),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('current_file_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_session_current_file_id', 'session_file', ['current_file_id'], ['id'])
+
+    # Backfill from the newest version flagged as current
+    current_file = (
+        sa.select(session_file_table.c.id)
+        .where(session_file_table.c.session_id == session_table.c.id)
+        .where(session_file_table.c.is_current_version == sa.true())
+        .order_by(session_file_table.c.version_number.desc(), session_file_table.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    op.execute(session_table.update().values(current_file_id=current_file))
+
+    # Older uploads could leave several versions flagged as current; make the
+    # flag agree with the pointer
+    pointer = (
+        sa.select(session_table.c.current_file_id)
+        .where(session_table.c.id == session_file_table.c.session_id)
+        .scalar_subquery()
+    )
+    op.execute(
+        session_file_table.update()
+        .values(is_current_version=sa.func.coalesce(session_file_table.c.id == pointer, sa.false()))
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_session_current_file_id', type_='foreignkey')
+        batch_op.drop_column('current_file_id')
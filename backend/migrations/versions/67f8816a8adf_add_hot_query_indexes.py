@@ -0,0 +1,66 @@
+"""add hot query indexes
+
+Revision ID: 67f8816a8adf
+Revises: 07d28d76a29c
+Create Date: 2026-10-16 22:41:57.289932
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '67f8816a8adf'
+down_revision = '07d28d76a29c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audit_log', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_log_timestamp', ['timestamp'], unique=False)
+        batch_op.create_index('ix_audit_log_user_id_timestamp', ['user_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_id_is_read_created_at', ['user_id', 'is_read', 'created_at'], unique=False)
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.create_index('ix_session_primary_speaker_id', ['primary_speaker_id'], unique=False)
+        batch_op.create_index('ix_session_status_created_at', ['status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('session_assignment', schema=None) as batch_op:
+        batch_op.create_index('ix_session_assignment_approver_id_status', ['approver_id', 'status'], unique=False)
+
+    with op.batch_alter_table('session_file', schema=None) as batch_op:
+        batch_op.create_index('ix_session_file_session_id_is_current_version', ['session_id', 'is_current_version'], unique=False)
+
+    with op.batch_alter_table('session_question', schema=None) as batch_op:
+        batch_op.create_index('ix_session_question_status_is_urgent_created_at', ['status', 'is_urgent', 'created_at'], unique=False)
+
+    with op.batch_alter_table('session_schedule', schema=None) as batch_op:
+        batch_op.create_index('ix_session_schedule_room_id_day_start_time', ['room_id', 'day', 'start_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('session_schedule', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_schedule_room_id_day_start_time')
+
+    with op.batch_alter_table('session_question', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_question_status_is_urgent_created_at')
+
+    with op.batch_alter_table('session_file', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_file_session_id_is_current_version')
+
+    with op.batch_alter_table('session_assignment', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_assignment_approver_id_status')
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_status_created_at')
+        batch_op.drop_index('ix_session_primary_speaker_id')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_id_is_read_created_at')
+
+    with op.batch_alter_table('audit_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_log_user_id_timestamp')
+        batch_op.drop_index('ix_audit_log_timestamp')
@@ -0,0 +1,101 @@
+"""add search indexes
+
+Revision ID: 8b977d83185a
+Revises: 67f8816a8adf
+Create Date: 2026-10-16 22:44:13.524491
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b977d83185a'
+down_revision = '67f8816a8adf'
+branch_labels = None
+depends_on = None
+
+
+# Full-text search lives outside the models: generated tsvector columns with
+# GIN indexes (plus trigram indexes for substring matches) on PostgreSQL,
+# external-content FTS5 tables kept in step by triggers on SQLite. The
+# columns of each index must match src/utils/search.py.
+SEARCHES = {
+    'user': ('user_search', ('first_name', 'last_name', 'email', 'organization')),
+    'session': ('session_search', ('title', 'description')),
+}
+
+POSTGRES_VECTORS = {
+    'user': "to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' "
+            "|| coalesce(email, '') || ' ' || coalesce(organization, ''))",
+    'session': "setweight(to_tsvector('english', coalesce(title, '')), 'A') "
+               "|| setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+}
+
+POSTGRES_TRIGRAM_COLUMNS = {
+    'user': ('first_name', 'last_name', 'email', 'organization'),
+    'session': ('title',),
+}
+
+
+def _upgrade_postgresql():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, vector in POSTGRES_VECTORS.items():
+        op.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN search_vector tsvector '
+            f'GENERATED ALWAYS AS ({vector}) STORED'
+        )
+        op.execute(f'CREATE INDEX ix_{table}_search_vector ON "{table}" USING gin (search_vector)')
+        for column in POSTGRES_TRIGRAM_COLUMNS[table]:
+            op.execute(f'CREATE INDEX ix_{table}_{column}_trgm ON "{table}" USING gin ({column} gin_trgm_ops)')
+
+
+def _downgrade_postgresql():
+    for table in POSTGRES_VECTORS:
+        for column in POSTGRES_TRIGRAM_COLUMNS[table]:
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_{column}_trgm')
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_search_vector')
+        op.execute(f'ALTER TABLE "{table}" DROP COLUMN search_vector')
+
+
+def _upgrade_sqlite():
+    # Batch operations that recreate user or session drop these triggers;
+    # such migrations must create them again
+    for table, (search, columns) in SEARCHES.items():
+        names = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        insert = f'INSERT INTO {search}(rowid, {names}) VALUES (new.id, {new_values});'
+        delete = f"INSERT INTO {search}({search}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+
+        op.execute(f"CREATE VIRTUAL TABLE {search} USING fts5({names}, content='{table}', content_rowid='id')")
+        op.execute(f'CREATE TRIGGER {search}_insert AFTER INSERT ON "{table}" BEGIN {insert} END')
+        op.execute(f'CREATE TRIGGER {search}_delete AFTER DELETE ON "{table}" BEGIN {delete} END')
+        op.execute(
+            f'CREATE TRIGGER {search}_update AFTER UPDATE OF {names} ON "{table}" '
+            f'BEGIN {delete} {insert} END'
+        )
+        op.execute(f"INSERT INTO {search}({search}) VALUES ('rebuild')")
+
+
+def _downgrade_sqlite():
+    for search, _ in SEARCHES.values():
+        for event in ('insert', 'delete', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS {search}_{event}')
+        op.execute(f'DROP TABLE IF EXISTS {search}')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _upgrade_postgresql()
+    elif dialect == 'sqlite':
+        _upgrade_sqlite()
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _downgrade_postgresql()
+    elif dialect == 'sqlite':
+        _downgrade_sqlite()
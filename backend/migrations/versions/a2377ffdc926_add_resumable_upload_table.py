@@ -0,0 +1,46 @@
+"""add resumable upload table
+
+Revision ID: a2377ffdc926
+Revises: 50c87ea1c6eb
+Create Date: 2026-10-16 23:11:19.724180
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2377ffdc926'
+down_revision = '50c87ea1c6eb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumable_upload',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('upload_length', sa.BigInteger(), nullable=False),
+    sa.Column('upload_offset', sa.BigInteger(), nullable=False),
+    sa.Column('chunk_size', sa.Integer(), nullable=False),
+    sa.Column('staging_path', sa.String(length=500), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('resumable_upload', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_resumable_upload_expires_at'), ['expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_resumable_upload_session_id'), ['session_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resumable_upload', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_resumable_upload_session_id'))
+        batch_op.drop_index(batch_op.f('ix_resumable_upload_expires_at'))
+
+    op.drop_table('resumable_upload')
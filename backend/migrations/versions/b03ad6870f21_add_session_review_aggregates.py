@@ -0,0 +1,77 @@
+"""add session review aggregates
+
+Revision ID: b03ad6870f21
+Revises: 5e732f373212
+Create Date: 2026-10-16 22:32:47.339616
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b03ad6870f21'
+down_revision = '5e732f373212'
+branch_labels = None
+depends_on = None
+
+
+session_table = sa.table(
+    'session',
+    sa.column('id', sa.Integer),
+    sa.column('review_count', sa.Integer),
+    sa.column('completed_review_count', sa.Integer),
+    sa.column('scored_review_count', sa.Integer),
+    sa.column('review_score_sum', sa.Integer),
+    sa.column('approve_count', sa.Integer),
+    sa.column('reject_count', sa.Integer),
+)
+
+review_table = sa.table(
+    'session_review',
+    sa.column('session_id', sa.Integer),
+    sa.column('status', sa.String),
+    sa.column('decision', sa.String),
+    sa.column('overall_score', sa.Integer),
+)
+
+
+def _review_aggregate(expression, *conditions):
+    """Correlated per-session aggregate over the session's reviews"""
+    return (
+        sa.select(sa.func.coalesce(expression, 0))
+        .where(review_table.c.session_id == session_table.c.id, *conditions)
+        .scalar_subquery()
+    )
+
+
+def upgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('review_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('completed_review_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('scored_review_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('review_score_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('approve_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('reject_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill the aggregates from existing reviews
+    completed = review_table.c.status == 'completed'
+    scored = sa.and_(review_table.c.overall_score.isnot(None), review_table.c.overall_score != 0)
+    op.execute(session_table.update().values(
+        review_count=_review_aggregate(sa.func.count()),
+        completed_review_count=_review_aggregate(sa.func.count(), completed),
+        scored_review_count=_review_aggregate(sa.func.count(), completed, scored),
+        review_score_sum=_review_aggregate(sa.func.sum(review_table.c.overall_score), completed, scored),
+        approve_count=_review_aggregate(sa.func.count(), completed, review_table.c.decision == 'approve'),
+        reject_count=_review_aggregate(sa.func.count(), completed, review_table.c.decision == 'reject'),
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_column('reject_count')
+        batch_op.drop_column('approve_count')
+        batch_op.drop_column('review_score_sum')
+        batch_op.drop_column('scored_review_count')
+        batch_op.drop_column('completed_review_count')
+        batch_op.drop_column('review_count')
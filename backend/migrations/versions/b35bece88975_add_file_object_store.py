@@ -0,0 +1,153 @@
+"""add file object store
+
+Revision ID: b35bece88975
+Revises: a2377ffdc926
+Create Date: 2026-10-16 23:15:28.455184
+
+"""
+import hashlib
+import os
+import shutil
+import uuid
+
+from alembic import op
+from flask import current_app
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b35bece88975'
+down_revision = 'a2377ffdc926'
+branch_labels = None
+depends_on = None
+
+
+# Existing uploads move from UPLOAD_FOLDER/sessions/<id>/<uuid>.<ext> into
+# the content-addressed store at UPLOAD_FOLDER/objects/ab/cdef..., laid out
+# as src/utils/storage.py expects. Every file is hashed again, since rows
+# from before hashing was reliable may hold an empty or stale file_hash.
+OBJECTS_DIR = 'objects'
+SESSIONS_DIR = 'sessions'
+CHUNK_SIZE = 1024 * 1024
+
+session_file_table = sa.table(
+    'session_file',
+    sa.column('id', sa.Integer),
+    sa.column('session_id', sa.Integer),
+    sa.column('filename', sa.String),
+    sa.column('original_filename', sa.String),
+    sa.column('file_path', sa.String),
+    sa.column('file_size', sa.BigInteger),
+    sa.column('file_hash', sa.String),
+)
+
+file_object_table = sa.table(
+    'file_object',
+    sa.column('sha256', sa.String),
+    sa.column('size', sa.BigInteger),
+    sa.column('ref_count', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _link(source, target):
+    """Give target source's bytes: a hard link where the filesystem allows,
+    otherwise a copy"""
+    if os.path.exists(target):
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        partial = f'{target}.partial'
+        shutil.copyfile(source, partial)
+        os.replace(partial, target)
+
+
+def upgrade():
+    op.create_table('file_object',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    with op.batch_alter_table('file_object', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_file_object_updated_at'), ['updated_at'], unique=False)
+
+    connection = op.get_bind()
+    objects = os.path.join(current_app.config['UPLOAD_FOLDER'], OBJECTS_DIR)
+    rows = connection.execute(sa.select(
+        session_file_table.c.id, session_file_table.c.file_path
+    ).order_by(session_file_table.c.id)).all()
+
+    # Files are linked into the store and their rows pointed at it. The old
+    # names are left in place, since this transaction may yet roll back to
+    # rows naming them; ``flask prune-legacy-files`` removes them once the
+    # upgrade has committed. Rows whose file is missing keep their path and
+    # hash.
+    for row in rows:
+        if not row.file_path or not os.path.isfile(row.file_path):
+            continue
+        sha256 = _sha256(row.file_path)
+        target = os.path.join(objects, sha256[:2], sha256[2:])
+        _link(row.file_path, target)
+        connection.execute(
+            session_file_table.update().where(session_file_table.c.id == row.id)
+            .values(filename=sha256, file_path=target, file_hash=sha256)
+        )
+
+    # Reference counts are per hash, as the flush hook on SessionFile keeps them
+    now = sa.func.current_timestamp()
+    op.execute(file_object_table.insert().from_select(
+        ['sha256', 'size', 'ref_count', 'created_at', 'updated_at'],
+        sa.select(
+            session_file_table.c.file_hash,
+            sa.func.coalesce(sa.func.max(session_file_table.c.file_size), 0),
+            sa.func.count(),
+            now,
+            now,
+        )
+        .where(session_file_table.c.file_hash.isnot(None), session_file_table.c.file_hash != '')
+        .group_by(session_file_table.c.file_hash)
+    ))
+
+
+def downgrade():
+    # Each row gets its own copy back under sessions/<id>/, linked from the
+    # object where possible, before the store is removed
+    connection = op.get_bind()
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    objects = os.path.join(upload_folder, OBJECTS_DIR)
+    rows = connection.execute(sa.select(
+        session_file_table.c.id, session_file_table.c.session_id,
+        session_file_table.c.original_filename, session_file_table.c.file_path
+    )).all()
+    for row in rows:
+        if not row.file_path or not os.path.isfile(row.file_path):
+            continue
+        extension = os.path.splitext(row.original_filename)[1].lower()
+        filename = f'{uuid.uuid4().hex}{extension}'
+        path = os.path.join(upload_folder, SESSIONS_DIR, str(row.session_id), filename)
+        _link(row.file_path, path)
+        connection.execute(
+            session_file_table.update().where(session_file_table.c.id == row.id)
+            .values(filename=filename, file_path=path)
+        )
+    if os.path.isdir(objects):
+        shutil.rmtree(objects)
+
+    with op.batch_alter_table('file_object', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_file_object_updated_at'))
+
+    op.drop_table('file_object')
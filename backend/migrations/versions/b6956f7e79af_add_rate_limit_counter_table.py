@@ -0,0 +1,38 @@
+"""add rate limit counter table
+
+Revision ID: b6956f7e79af
+Revises: 5c20b1372c15
+Create Date: 2026-10-16 22:54:15.331214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6956f7e79af'
+down_revision = '5c20b1372c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rate_limit_counter',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('window_start', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('key', 'window_start')
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        # Counters are disposable, so skip the write-ahead log
+        op.execute('ALTER TABLE rate_limit_counter SET UNLOGGED')
+    with op.batch_alter_table('rate_limit_counter', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_rate_limit_counter_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('rate_limit_counter', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_rate_limit_counter_expires_at'))
+
+    op.drop_table('rate_limit_counter')
@@ -0,0 +1,26 @@
+"""add user token_epoch
+
+Revision ID: c32c2c75b95c
+Revises: 8b977d83185a
+Create Date: 2026-10-16 22:47:48.849914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c32c2c75b95c'
+down_revision = '8b977d83185a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_epoch', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('token_epoch')
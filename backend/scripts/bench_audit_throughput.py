@@ -0,0 +1,123 @@
+"""
+Benchmark request throughput with API access auditing off, synchronous and
+batched.
+
+Seeds a throwaway SQLite database (or the one named by --database-url) with a
+few sessions, then sends --requests GETs to an endpoint wrapped in
+log_api_access from --threads client threads in each mode:
+
+    off    AUDIT_ENABLED false, no audit rows
+    sync   one INSERT and commit per request, the previous behaviour
+    async  entries queued and written in batches by the AuditWriter
+
+Every request is audited in full (AUDIT_POLICY is pinned to ALWAYS, where
+the default would aggregate these GETs), and each mode checks that it wrote
+one row per request.
+
+Run from backend/:
+
+    python scripts/bench_audit_throughput.py --requests 2000 --threads 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PATH = '/api/sessions/sessions?per_page=5'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per mode')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent client threads')
+    parser.add_argument('--database-url', help='Database to seed (default: a temporary SQLite file)')
+    return parser.parse_args()
+
+
+def seed(db, models):
+    """An admin and a handful of sessions to list"""
+    role = models.Role('admin')
+    admin = models.User('bench-audit@example.com', 'benchmark', 'Bench', 'Audit')
+    admin.roles.append(role)
+    session_type = models.SessionType('Talk')
+    db.session.add_all([admin, session_type])
+    db.session.flush()
+    for i in range(20):
+        db.session.add(models.Session(admin.id, session_type.id, f'Session {i}', 'Benchmark session'))
+    db.session.commit()
+    return admin
+
+
+def configure(app, mode):
+    """Switch the app's audit settings to mode"""
+    from src.utils.audit import init_audit_writer, ALWAYS
+
+    writer = app.extensions.pop('audit_writer', None)
+    if writer is not None:
+        writer.close()
+    app.config['AUDIT_POLICY'] = (('*', '*', ALWAYS),)
+    app.config['AUDIT_ENABLED'] = mode != 'off'
+    app.config['AUDIT_ASYNC'] = mode == 'async'
+    return init_audit_writer(app)
+
+
+def run(app, headers, requests, threads):
+    """Requests per second for requests GETs spread over threads"""
+    def worker(count):
+        client = app.test_client()
+        for _ in range(count):
+            response = client.get(PATH, headers=headers)
+            assert response.status_code == 200, response.get_json()
+
+    shares = [requests // threads + (1 if i < requests % threads else 0) for i in range(threads)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, shares))
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(), 'bench.db'
+    )
+    os.environ.setdefault('UPLOAD_FOLDER', tempfile.mkdtemp())
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'
+
+    from flask_jwt_extended import create_access_token
+    from src.main import create_app
+    import src.models as models
+
+    app = create_app()
+    with app.app_context():
+        models.db.create_all()
+        admin = seed(models.db, models)
+        with app.test_request_context():
+            token = create_access_token(identity=admin.id, additional_claims=admin.token_claims())
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f'{"mode":<8} {"requests/s":>12} {"audit rows":>12}')
+    for mode in ('off', 'sync', 'async'):
+        writer = configure(app, mode)
+        with app.app_context():
+            before = models.AuditLog.query.count()
+        app.test_client().get(PATH, headers=headers)  # warm up
+
+        throughput = run(app, headers, args.requests, args.threads)
+        if writer is not None:
+            writer.close()
+        with app.app_context():
+            rows = models.AuditLog.query.count() - before
+        print(f'{mode:<8} {throughput:>12.1f} {rows:>12}')
+        # The timed requests plus the warm-up
+        expected = 0 if mode == 'off' else args.requests + 1
+        assert rows == expected, f'{mode}: expected {expected} audit rows, got {rows}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark the admin and approver dashboard statistics endpoints.
+
+Seeds a throwaway SQLite database (or the one named by --database-url) with
+--sessions sessions plus proportional users, files, questions and approver
+assignments, then times each endpoint through the Flask test client and
+reports the number of SQL statements per request.
+
+Run from backend/:
+
+    python scripts/bench_dashboard_stats.py --sessions 10000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STATUSES = ('draft', 'submitted', 'approved', 'rejected', 'scheduled')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=20, help='Timed requests per endpoint')
+    parser.add_argument('--database-url', help='Database to seed (default: a temporary SQLite file)')
+    return parser.parse_args()
+
+
+def seed(db, models, session_count):
+    """Bulk insert a dashboard-sized data set"""
+    now = datetime.utcnow()
+    rng = random.Random(2025)
+    user_count = max(session_count // 5, 10)
+
+    roles = {}
+    for name in ('admin', 'manager', 'speaker'):
+        roles[name] = models.Role(name)
+        db.session.add(roles[name])
+    session_type = models.SessionType('Talk')
+    db.session.add(session_type)
+
+    admin = models.User('bench-admin@example.com', 'benchmark', 'Bench', 'Admin')
+    admin.roles.append(roles['admin'])
+    manager = models.User('bench-manager@example.com', 'benchmark', 'Bench', 'Manager')
+    manager.roles.append(roles['manager'])
+    db.session.add_all([admin, manager])
+    db.session.commit()
+
+    password_hash = admin.password_hash
+    db.session.execute(models.User.__table__.insert(), [{
+        'email': f'speaker{i}@example.com',
+        'password_hash': password_hash,
+        'first_name': 'Speaker',
+        'last_name': str(i),
+        'is_active': rng.random() > 0.1,
+        'created_at': now - timedelta(days=rng.randint(0, 60))
+    } for i in range(user_count)])
+    speaker_ids = [row[0] for row in db.session.query(models.User.id).filter(
+        models.User.email.like('speaker%')
+    )]
+    db.session.execute(models.user_roles.insert(), [
+        {'user_id': user_id, 'role_id': roles['speaker'].id} for user_id in speaker_ids
+    ])
+
+    db.session.execute(models.Session.__table__.insert(), [{
+        'primary_speaker_id': rng.choice(speaker_ids),
+        'session_type_id': session_type.id,
+        'title': f'Session {i}',
+        'description': 'Benchmark session',
+        'status': rng.choice(STATUSES),
+        'created_at': now - timedelta(days=rng.randint(0, 60)),
+        'updated_at': now
+    } for i in range(session_count)])
+    session_ids = [row[0] for row in db.session.query(models.Session.id)]
+
+    db.session.execute(models.SessionFile.__table__.insert(), [{
+        'session_id': session_id,
+        'filename': f'{session_id}.pdf',
+        'original_filename': f'{session_id}.pdf',
+        'file_path': f'/tmp/{session_id}.pdf',
+        'file_size': rng.randint(100_000, 20_000_000),
+        'file_hash': f'{session_id:064x}',
+        'mime_type': 'application/pdf',
+        'uploaded_by': admin.id,
+        'version_number': 1,
+        'is_current_version': True
+    } for session_id in session_ids])
+
+    db.session.execute(models.SessionQuestion.__table__.insert(), [{
+        'session_id': rng.choice(session_ids),
+        'asked_by': manager.id,
+        'question_text': 'Benchmark question',
+        'is_urgent': rng.random() < 0.2,
+        'status': rng.choice(('open', 'answered', 'closed')),
+        'created_at': now
+    } for _ in range(session_count // 2)])
+
+    db.session.execute(models.SessionAssignment.__table__.insert(), [{
+        'session_id': session_id,
+        'approver_id': manager.id,
+        'assigned_by': admin.id,
+        'status': 'active',
+        'assigned_at': now
+    } for session_id in rng.sample(session_ids, session_count // 5)])
+
+    db.session.commit()
+    return admin, manager
+
+
+def rebuild_counters(app):
+    """Bulk inserts bypass the flush hooks, so rebuild stats_counter afterwards"""
+    from src.commands import reconcile_stats
+
+    result = app.test_cli_runner().invoke(reconcile_stats)
+    assert result.exit_code == 0, result.output
+
+
+def bench(app, client, db, path, user, runs):
+    """Time repeated GETs of path and count the SQL each one issues"""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+
+    with app.test_request_context():
+        token = create_access_token(identity=user.id, additional_claims={
+            'roles': [role.name for role in user.roles]
+        })
+    headers = {'Authorization': f'Bearer {token}'}
+
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        client.get(path, headers=headers)  # warm up
+        statements.clear()
+
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            response = client.get(path, headers=headers)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    return statistics.median(timings), max(timings), len(statements) // runs
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(), 'bench.db'
+    )
+    os.environ.setdefault('UPLOAD_FOLDER', tempfile.mkdtemp())
+
+    from src.main import create_app
+    import src.models as models
+
+    app = create_app()
+    with app.app_context():
+        db = models.db
+        db.create_all()
+
+        started = time.perf_counter()
+        admin, manager = seed(db, models, args.sessions)
+        rebuild_counters(app)
+        print(f'Seeded {args.sessions} sessions in {time.perf_counter() - started:.1f}s')
+
+        client = app.test_client()
+        print(f'{"endpoint":<40} {"user":<8} {"median ms":>10} {"max ms":>10} {"queries":>8}')
+        for path, label, user in (
+            ('/api/admin/system-stats', 'admin', admin),
+            ('/api/approver/dashboard-stats', 'admin', admin),
+            ('/api/approver/dashboard-stats', 'manager', manager),
+        ):
+            median, worst, queries = bench(app, client, db, path, user, args.runs)
+            print(f'{path:<40} {label:<8} {median:>10.2f} {worst:>10.2f} {queries:>8}')
+
+
+if __name__ == '__main__':
+    main()
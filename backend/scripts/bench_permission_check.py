@@ -0,0 +1,166 @@
+"""
+Micro-benchmark the require_permission decorator.
+
+Wraps a no-op view in the previous implementation (load the user, then walk
+its roles' JSON permissions) and in the compiled-bitmask one, and times each
+call inside its own request context so every call starts with a cold flask.g,
+as a real request does. The bitmask decorator is timed both with a token
+carrying the ``perms`` claim and with one that predates it, which falls back
+to the user's roles. A second table times the permission test alone.
+
+Run from backend/:
+
+    python scripts/bench_permission_check.py --calls 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from functools import wraps
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PERMISSION = 'download_files'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000, help='Timed calls per variant')
+    parser.add_argument('--repeat', type=int, default=5, help='Rounds per variant; the median is reported')
+    return parser.parse_args()
+
+
+def legacy_require_permission(permission):
+    """require_permission as it was before permissions were compiled"""
+    from flask import jsonify
+    from flask_jwt_extended import jwt_required
+    from src.utils.security import load_current_user
+
+    def decorator(f):
+        @wraps(f)
+        @jwt_required()
+        def decorated_function(*args, **kwargs):
+            user = load_current_user()
+
+            if not user or not user.is_active:
+                return jsonify({'error': 'User not found or inactive'}), 401
+
+            has_permission = False
+            for role in user.roles:
+                if role.permissions.get(permission, False):
+                    has_permission = True
+                    break
+
+            if not has_permission:
+                return jsonify({'error': 'Insufficient permissions'}), 403
+
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+def seed(db, models):
+    """A user holding three roles, the permission granted only by the last"""
+    names = list(models.PERMISSIONS)
+    roles = [
+        models.Role('bench-speaker', permissions={name: True for name in names[10:12]}),
+        models.Role('bench-reviewer', permissions={name: True for name in names[4:9]}),
+        models.Role('bench-files', permissions={PERMISSION: True}),
+    ]
+    user = models.User('bench-permissions@example.com', 'benchmark', 'Bench', 'Permissions')
+    user.roles.extend(roles)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def time_calls(app, view, headers, calls, repeat):
+    """Median microseconds per decorated call over repeat rounds of calls"""
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            with app.test_request_context(headers=headers):
+                assert view() == 'ok'
+        rounds.append((time.perf_counter() - started) / calls * 1e6)
+    return statistics.median(rounds)
+
+
+def time_check(check, calls, repeat):
+    """Median nanoseconds per call of check()"""
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            check()
+        rounds.append((time.perf_counter() - started) / calls * 1e9)
+    return statistics.median(rounds)
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ.setdefault('UPLOAD_FOLDER', tempfile.mkdtemp())
+
+    from flask_jwt_extended import create_access_token
+    from src.main import create_app
+    from src.utils.security import require_permission
+    import src.models as models
+
+    app = create_app()
+    app.config['AUTH_TRUST_ROLE_CLAIMS'] = True
+
+    def view():
+        return 'ok'
+
+    legacy_view = legacy_require_permission(PERMISSION)(view)
+    compiled_view = require_permission(PERMISSION)(view)
+
+    with app.app_context():
+        models.db.create_all()
+        user = seed(models.db, models)
+        claims = user.token_claims()
+        legacy_claims = {key: value for key, value in claims.items() if key != 'perms'}
+        with app.test_request_context():
+            token = create_access_token(identity=user.id, additional_claims=claims)
+            legacy_token = create_access_token(identity=user.id, additional_claims=legacy_claims)
+
+        roles = list(user.roles)
+        mask = user.permission_mask
+        bit = models.permission_bit(PERMISSION)
+
+        def walk_roles():
+            return any(role.permissions.get(PERMISSION, False) for role in roles)
+
+        def and_mask():
+            return mask & bit
+
+        checks = (
+            ('walk roles\' JSON permissions', walk_roles),
+            ('AND with compiled mask', and_mask),
+        )
+        check_timings = [(label, time_check(check, args.calls * 50, args.repeat)) for label, check in checks]
+
+    print(f'{"decorator":<44} {"median us/call":>15}')
+    for label, decorated, bearer in (
+        ('previous (roles from the database)', legacy_view, legacy_token),
+        ('bitmask, perms claim', compiled_view, token),
+        ('bitmask, token without perms claim', compiled_view, legacy_token),
+    ):
+        headers = {'Authorization': f'Bearer {bearer}'}
+        with app.test_request_context(headers=headers):
+            decorated()  # warm up the token epoch cache
+        micros = time_calls(app, decorated, headers, args.calls, args.repeat)
+        print(f'{label:<44} {micros:>15.1f}')
+
+    print()
+    print(f'{"permission test alone":<44} {"median ns/call":>15}')
+    for label, nanos in check_timings:
+        print(f'{label:<44} {nanos:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Check that the main query behind each hot route is planned with an index.
+
+Migrates a database to head (a throwaway SQLite file unless --database-url
+names another, e.g. a scratch PostgreSQL database), EXPLAINs each query the
+way the route builds it, and fails if the plan does not use the expected
+index. PostgreSQL is run with enable_seqscan off: an empty table is always
+cheapest to scan, so this checks that the index is usable rather than what
+the planner would pick on production-sized data.
+
+Run from backend/:
+
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --database-url postgresql://localhost/cybercon_plans
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import textwrap
+from datetime import date, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Database to migrate and check (default: a temporary SQLite file)')
+    return parser.parse_args()
+
+
+def route_queries(models):
+    """(route, expected index, statement) for each hot query shape"""
+    from sqlalchemy import and_, or_, select
+    from src.utils.stats import assigned_session_ids
+
+    Session = models.Session
+    SessionQuestion = models.SessionQuestion
+    SessionSchedule = models.SessionSchedule
+    Notification = models.Notification
+    AuditLog = models.AuditLog
+    SessionFile = models.SessionFile
+
+    return [
+        ('GET /api/sessions?status=', 'ix_session_status_created_at',
+         select(Session).where(Session.status == 'submitted')
+         .order_by(Session.created_at.desc(), Session.id.desc()).limit(21)),
+        ('GET /api/sessions (speaker)', 'ix_session_primary_speaker_id',
+         select(Session).where(or_(Session.primary_speaker_id == 1, Session.id.in_([2, 3])))),
+        ('GET /api/notifications', 'ix_notifications_user_id_is_read_created_at',
+         select(Notification).where(Notification.user_id == 1)
+         .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(21)),
+        ('GET /api/notifications?unread_only=true', 'ix_notifications_user_id_is_read_created_at',
+         select(Notification).where(Notification.user_id == 1, Notification.is_read == False)
+         .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(21)),
+        ('GET /api/approver/dashboard-stats (manager)', 'ix_session_assignment_approver_id_status',
+         assigned_session_ids(1)),
+        ('GET /api/approver/questions', 'ix_session_question_status_is_urgent_created_at',
+         select(SessionQuestion).where(SessionQuestion.status == 'open')
+         .order_by(SessionQuestion.is_urgent.desc(), SessionQuestion.created_at.desc(),
+                   SessionQuestion.id.desc()).limit(21)),
+        ('POST /api/approver/sessions/<id>/schedule', 'ix_session_schedule_room_id_day_start_time',
+         select(SessionSchedule).where(and_(
+             SessionSchedule.room_id == 1,
+             SessionSchedule.day == date(2025, 11, 27),
+             SessionSchedule.status.in_(['tentative', 'confirmed']),
+             SessionSchedule.start_time < time(11, 0),
+             SessionSchedule.end_time > time(10, 0)
+         ))),
+        ('SessionFile current version', 'ix_session_file_session_id_is_current_version',
+         select(SessionFile).where(SessionFile.session_id == 1, SessionFile.is_current_version == True)),
+        ('Audit log, newest first', 'ix_audit_log_timestamp',
+         select(AuditLog).order_by(AuditLog.timestamp.desc()).limit(50)),
+        ('Audit log for one user', 'ix_audit_log_user_id_timestamp',
+         select(AuditLog).where(AuditLog.user_id == 1).order_by(AuditLog.timestamp.desc()).limit(50)),
+        ('GET /api/admin/audit?action=', 'ix_audit_log_action_timestamp',
+         select(AuditLog).where(AuditLog.action == 'login_success')
+         .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(21)),
+        ('GET /api/admin/audit?resource_type=&resource_id=', 'ix_audit_log_resource_type_resource_id_timestamp',
+         select(AuditLog).where(AuditLog.resource_type == 'session', AuditLog.resource_id == 1)
+         .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(21)),
+    ]
+
+
+def explain(db, statement):
+    """The database's plan for statement, flattened to text"""
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    connection = db.session.connection()
+    if dialect.name == 'postgresql':
+        plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}').scalar()
+        return plan if isinstance(plan, str) else json.dumps(plan)
+    return '\n'.join(row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}'))
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(), 'plans.db'
+    )
+    os.environ.setdefault('UPLOAD_FOLDER', tempfile.mkdtemp())
+
+    from flask_migrate import upgrade
+    from src.main import create_app, MIGRATIONS_DIR
+    import src.models as models
+
+    app = create_app()
+    checks = route_queries(models)
+    failures = 0
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        db = models.db
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text('SET enable_seqscan = off'))
+
+        for route, index, statement in checks:
+            plan = explain(db, statement)
+            if index in plan:
+                print(f'✓ {route}: {index}')
+            else:
+                failures += 1
+                print(f'✗ {route}: expected {index}')
+                print(textwrap.indent(plan, '    '))
+
+    print(f'{failures} of {len(checks)} queries missed their index' if failures
+          else 'All queries use their index')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Flask CLI maintenance commands for the Cybercon Melbourne 2025 Speaker System
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.orm import selectinload
+
+from src.models import db, Session, SessionFile, StatsCounter, ResumableUpload, FileObject
+from src.utils.stats import expected_counters
+from src.utils.token_blocklist import get_token_blocklist
+from src.utils.audit_partitions import ensure_partitions, expire_partitions
+from src.utils.storage import iter_objects
+
+
+@click.command('recompute-review-stats')
+@click.option('--batch-size', default=500, show_default=True, help='Sessions loaded per batch')
+@with_appcontext
+def recompute_review_stats(batch_size):
+    """Rebuild the review aggregates on every session and report drift"""
+    checked = 0
+    drifted = 0
+    last_id = 0
+
+    while True:
+        sessions = Session.query.filter(Session.id > last_id).order_by(Session.id).options(
+            selectinload(Session.reviews)
+        ).limit(batch_size).all()
+        if not sessions:
+            break
+
+        for session in sessions:
+            if session.recompute_review_aggregates():
+                drifted += 1
+                click.echo(f"Session {session.id}: review aggregates repaired")
+
+        checked += len(sessions)
+        last_id = sessions[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+
+    click.echo(f"✓ Checked {checked} sessions, repaired {drifted}")
+
+
+@click.command('reconcile-stats')
+@click.option('--dry-run', is_flag=True, help='Report drift without rewriting the counters')
+@with_appcontext
+def reconcile_stats(dry_run):
+    """Rebuild stats_counter from the underlying tables and report drift.
+
+    Writes that commit while this runs can leave fresh drift behind, so run it
+    when the system is quiet.
+    """
+    expected = expected_counters()
+    stored = {counter.name: counter for counter in StatsCounter.query.all()}
+
+    drifted = 0
+    for name in sorted(set(expected) | set(stored)):
+        want = expected.get(name, 0)
+        counter = stored.get(name)
+        have = counter.value if counter else 0
+        if want == have:
+            continue
+
+        drifted += 1
+        click.echo(f"{name}: stored {have}, actual {want} ({want - have:+d})")
+        if dry_run:
+            continue
+        if counter is None:
+            db.session.add(StatsCounter(name=name, value=want))
+        elif want:
+            counter.value = want
+        else:
+            db.session.delete(counter)
+
+    if not dry_run:
+        db.session.commit()
+    action = 'found' if dry_run else 'repaired'
+    click.echo(f"✓ Checked {len(expected)} counters, {action} {drifted}")
+
+
+@click.command('prune-revoked-tokens')
+@with_appcontext
+def prune_revoked_tokens():
+    """Delete revocations of tokens that have expired anyway"""
+    pruned = get_token_blocklist().prune()
+    click.echo(f"✓ Pruned {pruned} expired revoked tokens")
+
+
+@click.command('audit-partitions')
+@click.option('--months-ahead', default=3, show_default=True, help='Future months to partition (PostgreSQL)')
+@with_appcontext
+def audit_partitions(months_ahead):
+    """Create upcoming audit_log partitions, or rotate finished months on SQLite"""
+    created = ensure_partitions(months_ahead)
+    for name in created:
+        click.echo(f"{name}: created")
+    click.echo(f"✓ Audit log partitions up to date, {len(created)} created")
+
+
+@click.command('expire-audit-log')
+@click.option('--older-than-days', type=int, help='Retention period (default: AUDIT_RETENTION_DAYS)')
+@click.option('--archive-dir', help='Where archives are written (default: AUDIT_ARCHIVE_DIR)')
+@click.option('--dry-run', is_flag=True, help='List the months that would be archived')
+@with_appcontext
+def expire_audit_log(older_than_days, archive_dir, dry_run):
+    """Archive audit_log months past retention to NDJSON and drop them"""
+    if older_than_days is None:
+        older_than_days = current_app.config['AUDIT_RETENTION_DAYS']
+    archive_dir = archive_dir or current_app.config['AUDIT_ARCHIVE_DIR']
+
+    expired = 0
+    for month, rows, path in expire_partitions(older_than_days, archive_dir, dry_run=dry_run):
+        expired += 1
+        if dry_run:
+            click.echo(f"{month:%Y-%m}: would be archived")
+        else:
+            click.echo(f"{month:%Y-%m}: {rows} entries archived to {path}")
+    action = 'would be archived' if dry_run else 'archived'
+    click.echo(f"✓ {expired} months {action}")
+
+
+@click.command('prune-uploads')
+@with_appcontext
+def prune_uploads():
+    """Delete resumable uploads abandoned past their expiry, with their bytes"""
+    expired = ResumableUpload.query.filter(ResumableUpload.expires_at < datetime.utcnow()).all()
+    for upload in expired:
+        if os.path.exists(upload.staging_path):
+            os.remove(upload.staging_path)
+        db.session.delete(upload)
+    db.session.commit()
+    click.echo(f"✓ Pruned {len(expired)} abandoned uploads")
+
+
+@click.command('gc-file-objects')
+@click.option('--grace-minutes', default=60, show_default=True,
+              help='How long an unreferenced object is kept for reuse')
+@click.option('--dry-run', is_flag=True, help='List the objects that would be removed')
+@with_appcontext
+def gc_file_objects(grace_minutes, dry_run):
+    """Delete stored objects that no session file refers to any more"""
+    cutoff = datetime.utcnow() - timedelta(minutes=grace_minutes)
+    table = FileObject.__table__
+    counts = dict(db.session.query(FileObject.sha256, FileObject.ref_count))
+    unreferenced = {
+        sha256 for (sha256,) in db.session.query(FileObject.sha256)
+        .filter(FileObject.ref_count <= 0, FileObject.updated_at < cutoff)
+    }
+
+    removed = 0
+    on_disk = set()
+    for sha256, path in iter_objects():
+        on_disk.add(sha256)
+        # Objects without a row are left over from uploads that failed
+        # before their SessionFile was written
+        if sha256 in counts and sha256 not in unreferenced:
+            continue
+        # A recent mtime means an upload of the same bytes has just reused it
+        if os.path.getmtime(path) > time.time() - grace_minutes * 60:
+            continue
+        removed += 1
+        if dry_run:
+            click.echo(f"{sha256}: would be removed")
+            continue
+        if sha256 in counts:
+            deleted = db.session.execute(
+                table.delete().where(table.c.sha256 == sha256, table.c.ref_count <= 0)
+            ).rowcount
+            db.session.commit()
+            if not deleted:
+                removed -= 1
+                continue
+        os.remove(path)
+
+    missing = unreferenced - on_disk
+    if missing and not dry_run:
+        # Rows for objects already gone from disk
+        db.session.execute(table.delete().where(table.c.sha256.in_(missing), table.c.ref_count <= 0))
+        db.session.commit()
+    action = 'would be removed' if dry_run else 'removed'
+    click.echo(f"✓ {removed} unreferenced objects {action}")
+
+
+@click.command('prune-legacy-files')
+@click.option('--directory', 'directories', multiple=True,
+              help='Directory of pre-object-store uploads (default: UPLOAD_FOLDER/sessions)')
+@click.option('--dry-run', is_flag=True, help='List the files that would be removed')
+@with_appcontext
+def prune_legacy_files(directories, dry_run):
+    """Delete upload files from before the object store that no session
+    file refers to any more, once the migration to it has committed"""
+    directories = directories or [os.path.join(current_app.config['UPLOAD_FOLDER'], 'sessions')]
+    referenced = {
+        os.path.abspath(path) for (path,) in db.session.query(SessionFile.file_path) if path
+    }
+
+    removed = 0
+    for directory in directories:
+        for root, _, filenames in os.walk(directory, topdown=False):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                if os.path.abspath(path) in referenced:
+                    continue
+                removed += 1
+                if dry_run:
+                    click.echo(f"{path}: would be removed")
+                else:
+                    os.remove(path)
+            if not dry_run and root != directory and not os.listdir(root):
+                os.rmdir(root)
+    action = 'would be removed' if dry_run else 'removed'
+    click.echo(f"✓ {removed} legacy files {action}")
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI"""
+    app.cli.add_command(recompute_review_stats)
+    app.cli.add_command(reconcile_stats)
+    app.cli.add_command(prune_revoked_tokens)
+    app.cli.add_command(audit_partitions)
+    app.cli.add_command(expire_audit_log)
+    app.cli.add_command(prune_uploads)
+    app.cli.add_command(gc_file_objects)
+    app.cli.add_command(prune_legacy_files)
@@ -6,7 +6,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from flask import Flask, send_from_directory
 from flask_cors import CORS
-from flask_migrate import Migrate
+from flask_migrate import Migrate, stamp, upgrade
 from src.models import (
     db, User, Role, AuditLog, SessionType, Room
 )
@@ -18,9 +18,22 @@ from src.routes.admin import admin_bp
 from src.routes.files import files_bp
 from src.routes.notifications import notifications_bp
 from src.utils.security import SecurityHeaders
+from src.utils.token_blocklist import init_token_blocklist
+from src.utils.rate_limit import init_rate_limiter
+from src.utils.audit import init_audit_writer
+from src.utils.file_delivery import FILE_DELIVERY_MODES
+from src.utils.uploads import UploadRequest
+from src.commands import register_commands
+
+# Alembic migration history, and the revision matching the schema that
+# db.create_all() produced before migrations were introduced
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+INITIAL_SCHEMA_REVISION = 'e51ecb2dc8f1'
 
 def create_app():
     app = Flask(__name__)
+    # Streams uploads for views marked with stream_uploads straight to storage
+    app.request_class = UploadRequest
     
     # Production configuration
     app.config['SECRET_KEY'] = os.environ.get('SESSION_SECRET', 'dev-secret-key-change-in-production')
@@ -41,9 +54,66 @@ def create_app():
         'max_overflow': 0
     }
     
+    # Authorize role checks from signed token claims instead of the database;
+    # token epochs are re-read at most every AUTH_EPOCH_CACHE_SECONDS, for up
+    # to AUTH_EPOCH_CACHE_SIZE users per worker. A role change or deactivation
+    # applies at once in the worker that made it and within
+    # AUTH_EPOCH_CACHE_SECONDS in the others.
+    app.config['AUTH_TRUST_ROLE_CLAIMS'] = os.environ.get('AUTH_TRUST_ROLE_CLAIMS', 'true').lower() == 'true'
+    app.config['AUTH_EPOCH_CACHE_SECONDS'] = int(os.environ.get('AUTH_EPOCH_CACHE_SECONDS', 30))
+    app.config['AUTH_EPOCH_CACHE_SIZE'] = int(os.environ.get('AUTH_EPOCH_CACHE_SIZE', 10000))
+    
+    # Revoked tokens are shared through the database, or through a SQLite file
+    # given as sqlite:///<path> on single-node deployments; each worker picks up
+    # other workers' revocations within JWT_BLOCKLIST_SYNC_SECONDS
+    app.config['JWT_BLOCKLIST_URL'] = os.environ.get('JWT_BLOCKLIST_URL', '')
+    app.config['JWT_BLOCKLIST_SYNC_SECONDS'] = float(os.environ.get('JWT_BLOCKLIST_SYNC_SECONDS', 5))
+    app.config['JWT_BLOCKLIST_PRUNE_SECONDS'] = float(os.environ.get('JWT_BLOCKLIST_PRUNE_SECONDS', 3600))
+    
+    # Rate limit counters live in the database by default so every worker
+    # shares them; sqlite:///<path> uses a standalone file, memory:// keeps
+    # them per process
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATE_LIMIT_STORAGE_URL'] = os.environ.get('RATE_LIMIT_STORAGE_URL', '')
+    app.config['RATE_LIMIT_PRUNE_SECONDS'] = float(os.environ.get('RATE_LIMIT_PRUNE_SECONDS', 60))
+    
+    # API access, denial and authentication audit entries are queued and
+    # written in batches by a background thread; AUDIT_OVERFLOW decides what
+    # happens when the queue is full ('drop', or 'block' for up to
+    # AUDIT_BLOCK_TIMEOUT_MS before dropping)
+    app.config['AUDIT_ENABLED'] = os.environ.get('AUDIT_ENABLED', 'true').lower() == 'true'
+    app.config['AUDIT_ASYNC'] = os.environ.get('AUDIT_ASYNC', 'true').lower() == 'true'
+    app.config['AUDIT_BATCH_SIZE'] = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+    app.config['AUDIT_FLUSH_INTERVAL_MS'] = int(os.environ.get('AUDIT_FLUSH_INTERVAL_MS', 500))
+    app.config['AUDIT_QUEUE_SIZE'] = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+    app.config['AUDIT_OVERFLOW'] = os.environ.get('AUDIT_OVERFLOW', 'drop')
+    app.config['AUDIT_BLOCK_TIMEOUT_MS'] = int(os.environ.get('AUDIT_BLOCK_TIMEOUT_MS', 50))
+    
+    # audit_log is kept by month; expire-audit-log archives months older than
+    # AUDIT_RETENTION_DAYS to AUDIT_ARCHIVE_DIR before dropping them
+    app.config['AUDIT_RETENTION_DAYS'] = int(os.environ.get('AUDIT_RETENTION_DAYS', 365))
+    app.config['AUDIT_ARCHIVE_DIR'] = os.environ.get('AUDIT_ARCHIVE_DIR', 'database/audit_archive')
+    
     # File upload configuration
     app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
     app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', '/tmp/uploads')
+    # Resumable uploads are sent in chunks of this size and abandoned ones
+    # are pruned after RESUMABLE_UPLOAD_EXPIRY_HOURS without a chunk
+    app.config['RESUMABLE_CHUNK_SIZE'] = int(os.environ.get('RESUMABLE_CHUNK_SIZE', 5 * 1024 * 1024))
+    app.config['RESUMABLE_UPLOAD_EXPIRY_HOURS'] = int(os.environ.get('RESUMABLE_UPLOAD_EXPIRY_HOURS', 24))
+    # Session file bytes are streamed by the worker ('send_file'), or handed
+    # to the front proxy once access is checked: 'x-accel-redirect' for nginx,
+    # through an internal location at FILE_DELIVERY_PREFIX such as
+    #     location /protected-files/ { internal; alias <UPLOAD_FOLDER>/; }
+    # or 'x-sendfile' for Apache mod_xsendfile and lighttpd, given the path
+    app.config['FILE_DELIVERY'] = os.environ.get('FILE_DELIVERY', 'send_file')
+    app.config['FILE_DELIVERY_PREFIX'] = os.environ.get('FILE_DELIVERY_PREFIX', '/protected-files/')
+    if app.config['FILE_DELIVERY'] not in FILE_DELIVERY_MODES:
+        raise ValueError(f"Unknown FILE_DELIVERY mode: {app.config['FILE_DELIVERY']}")
+    # Signed file URLs are valid for SIGNED_URL_EXPIRY_SECONDS and keyed on
+    # SIGNED_URL_SECRET (SECRET_KEY when unset)
+    app.config['SIGNED_URL_SECRET'] = os.environ.get('SIGNED_URL_SECRET', '')
+    app.config['SIGNED_URL_EXPIRY_SECONDS'] = int(os.environ.get('SIGNED_URL_EXPIRY_SECONDS', 900))
     
     # Production settings
     app.config['DEBUG'] = os.environ.get('DEBUG', 'false').lower() == 'true'
@@ -56,7 +126,11 @@ def create_app():
     db.init_app(app)
     print(f"--- Configuring JWT with key: {app.config.get('JWT_SECRET_KEY')} ---")
     jwt.init_app(app)
-    migrate = Migrate(app, db)
+    init_token_blocklist(app)
+    init_rate_limiter(app)
+    init_audit_writer(app)
+    migrate = Migrate(app, db, directory=MIGRATIONS_DIR, render_as_batch=True)
+    register_commands(app)
     
     # Enable CORS for all origins (required for frontend-backend communication)
     CORS(app, origins="*", supports_credentials=True)
@@ -82,17 +156,24 @@ def create_app():
     
     @app.after_request
     def after_request(response):
-        # Security headers
+        # Security headers; a view may set a stricter Content-Security-Policy
         response.headers['X-Content-Type-Options'] = 'nosniff'
         response.headers['X-Frame-Options'] = 'DENY'
         response.headers['X-XSS-Protection'] = '1; mode=block'
         response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-        response.headers['Content-Security-Policy'] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self' https:; connect-src 'self' https:;"
+        response.headers.setdefault('Content-Security-Policy', "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self' https:; connect-src 'self' https:;")
         
         # CORS headers for production
         response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With'
+        response.headers['Access-Control-Allow-Methods'] = 'GET, HEAD, POST, PUT, PATCH, DELETE, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = (
+            'Content-Type, Authorization, X-Requested-With, '
+            'Tus-Resumable, Upload-Length, Upload-Metadata, Upload-Offset'
+        )
+        response.headers['Access-Control-Expose-Headers'] = (
+            'Location, Tus-Resumable, Upload-Length, Upload-Offset, Upload-Chunk-Size, '
+            'X-RateLimit-Limit, X-RateLimit-Remaining, X-RateLimit-Reset, Retry-After'
+        )
         response.headers['Access-Control-Allow-Credentials'] = 'true'
         
         return response
@@ -125,8 +206,14 @@ def create_app():
 def init_database(app):
     """Initialize database with default data"""
     with app.app_context():
-        # Create all tables
-        db.create_all()
+        # Databases created before migrations existed have the initial schema
+        # but no alembic_version table, so record where they start from
+        inspector = db.inspect(db.engine)
+        if inspector.has_table('user') and not inspector.has_table('alembic_version'):
+            stamp(directory=MIGRATIONS_DIR, revision=INITIAL_SCHEMA_REVISION)
+        
+        # Create or upgrade all tables
+        upgrade(directory=MIGRATIONS_DIR)
         print("✓ Database tables created")
         
         # Check if roles exist
@@ -2,7 +2,10 @@
 Database models for the Cybercon Melbourne 2025 Speaker Presentation Management System
 """
 
-from src.models.user import db, User, Role, AuditLog, user_roles, jwt
+from src.models.user import (
+    db, User, Role, AuditLog, user_roles, jwt,
+    PERMISSIONS, permission_bit, permission_names
+)
 from src.models.presentation import Presentation, PresentationFile
 from src.models.review import Review, ReviewComment, ReviewAssignment
 from src.models.schedule import TimeSlot, PresentationSchedule, ScheduleConflict
@@ -19,6 +22,11 @@ from src.models.session_review import (
 from src.models.notification import (
     Notification, NotificationPreference, NotificationDelivery
 )
+from src.models.stats import StatsCounter
+from src.models.token import RevokedToken
+from src.models.rate_limit import RateLimitCounter
+from src.models.upload import ResumableUpload
+from src.models.file_object import FileObject
 
 # Export all models for easy importing
 __all__ = [
@@ -28,6 +36,9 @@ __all__ = [
     'Role', 
     'AuditLog',
     'user_roles',
+    'PERMISSIONS',
+    'permission_bit',
+    'permission_names',
     'Presentation',
     'PresentationFile',
     'Review',
@@ -53,6 +64,11 @@ __all__ = [
     'SessionSchedule',
     'Notification',
     'NotificationPreference',
-    'NotificationDelivery'
+    'NotificationDelivery',
+    'StatsCounter',
+    'RevokedToken',
+    'RateLimitCounter',
+    'ResumableUpload',
+    'FileObject'
 ]
 
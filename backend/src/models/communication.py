@@ -6,6 +6,9 @@ from src.models.user import db
 
 class SessionQuestion(db.Model):
     """Questions submitted by speakers about their sessions"""
+    __table_args__ = (
+        db.Index('ix_session_question_status_is_urgent_created_at', 'status', 'is_urgent', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('session.id'), nullable=False)
     asked_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -0,0 +1,99 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.user import db
+from src.models.session import SessionFile
+
+
+class FileObject(db.Model):
+    """A stored file, kept once per distinct content under its SHA-256.
+
+    ref_count is the number of SessionFile rows whose file_hash names it,
+    kept current on every flush. Objects nothing refers to are left on disk
+    until ``gc-file-objects`` removes them, so an upload of the same bytes
+    in the meantime can still reuse them.
+    """
+    __tablename__ = 'file_object'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<FileObject {self.sha256} refs={self.ref_count}>'
+
+    @classmethod
+    def apply(cls, connection, deltas, sizes):
+        """Add deltas to the reference counts with atomic increments"""
+        table = cls.__table__
+        now = datetime.utcnow()
+        dialect = connection.dialect.name
+        # Fixed order so concurrent flushes lock object rows in the same sequence
+        for sha256 in sorted(deltas):
+            delta = deltas[sha256]
+            if not delta:
+                continue
+            if delta > 0 and dialect in ('postgresql', 'sqlite'):
+                # A single upsert, so two flushes storing the same new bytes
+                # can't both insert its row
+                insert = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+                connection.execute(
+                    insert.values(sha256=sha256, size=sizes.get(sha256) or 0, ref_count=delta,
+                                  created_at=now, updated_at=now)
+                    .on_conflict_do_update(
+                        index_elements=[table.c.sha256],
+                        set_={'ref_count': table.c.ref_count + insert.excluded.ref_count, 'updated_at': now}
+                    )
+                )
+                continue
+            result = connection.execute(
+                table.update().where(table.c.sha256 == sha256)
+                .values(ref_count=table.c.ref_count + delta, updated_at=now)
+            )
+            if result.rowcount == 0 and delta > 0:
+                connection.execute(table.insert().values(
+                    sha256=sha256, size=sizes.get(sha256) or 0, ref_count=delta,
+                    created_at=now, updated_at=now
+                ))
+
+
+@event.listens_for(db.session, 'before_flush')
+def load_deleted_file_hashes(session, flush_context, instances):
+    """Load the hash a deleted file refers to while it can still be read"""
+    for obj in session.deleted:
+        if isinstance(obj, SessionFile):
+            obj.file_hash
+
+
+@event.listens_for(db.session, 'after_flush')
+def update_file_object_refs(session, flush_context):
+    """Fold the flush's SessionFile inserts, deletes and rehashes into
+    file_object"""
+    deltas = Counter()
+    sizes = {}
+    for obj in session.new:
+        if isinstance(obj, SessionFile) and obj.file_hash:
+            deltas[obj.file_hash] += 1
+            sizes[obj.file_hash] = obj.file_size
+    for obj in session.deleted:
+        if isinstance(obj, SessionFile) and obj.file_hash:
+            deltas[obj.file_hash] -= 1
+    for obj in session.dirty:
+        if not isinstance(obj, SessionFile) or obj in session.deleted:
+            continue
+        history = inspect(obj).attrs.file_hash.history
+        if history.has_changes():
+            for old in history.deleted:
+                if old:
+                    deltas[old] -= 1
+            if obj.file_hash:
+                deltas[obj.file_hash] += 1
+                sizes[obj.file_hash] = obj.file_size
+
+    if any(deltas.values()):
+        FileObject.apply(session.connection(), deltas, sizes)
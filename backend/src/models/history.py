@@ -0,0 +1,27 @@
+from sqlalchemy import event, inspect
+
+
+def previous_value(obj, key):
+    """A column attribute's value as stored before the flush in progress"""
+    history = inspect(obj).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+def track_previous_values(model, keys):
+    """Load the stored value of model's column attributes in keys before an
+    expired one is overwritten, so previous_value() can always tell what a
+    flushed row held"""
+    for key in keys:
+        # Checked on the table, as inspecting relationships would configure
+        # mappers whose targets may not be defined yet
+        if key in model.__table__.c:
+            # The listener does nothing itself; active_history does the loading
+            event.listen(getattr(model, key), 'set', _load_previous_value, active_history=True)
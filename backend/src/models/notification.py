@@ -5,6 +5,9 @@ from src.models.user import db
 class Notification(db.Model):
     """User notifications"""
     __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ix_notifications_user_id_is_read_created_at', 'user_id', 'is_read', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
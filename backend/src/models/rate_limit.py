@@ -0,0 +1,19 @@
+from src.models.user import db
+
+
+class RateLimitCounter(db.Model):
+    """Requests made by one client in one fixed rate-limit window.
+
+    The sliding-window limiter only reads the current and previous windows,
+    so each row can go once ``expires_at`` (seconds since the epoch) passes.
+    On PostgreSQL the table is UNLOGGED: losing counts in a crash is fine.
+    """
+    __tablename__ = 'rate_limit_counter'
+
+    key = db.Column(db.String(255), primary_key=True)
+    window_start = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    expires_at = db.Column(db.BigInteger, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<RateLimitCounter {self.key}@{self.window_start}={self.count}>'
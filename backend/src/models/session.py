@@ -1,8 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload, selectinload
+from collections import Counter
 from datetime import datetime
 
 # Import db from user model to maintain consistency
-from src.models.user import db
+from src.models.user import db, User
+from src.models.history import previous_value, track_previous_values
+from src.models.session_review import SessionReview, SessionSchedule
 
 class SessionType(db.Model):
     """Session types for presentations"""
@@ -37,6 +42,18 @@ class SessionType(db.Model):
 
 class Session(db.Model):
     """Updated session model with new requirements"""
+    __table_args__ = (
+        db.Index('ix_session_status_created_at', 'status', 'created_at'),
+        db.Index('ix_session_primary_speaker_id', 'primary_speaker_id'),
+    )
+    # Top-level fields to_dict() can emit, and the relationship groups it can embed
+    SERIALIZED_FIELDS = (
+        'id', 'primary_speaker_id', 'session_type_id', 'session_type', 'title', 'description',
+        'upload_comments', 'status', 'created_at', 'updated_at', 'submitted_at',
+        'review_summary'
+    )
+    SERIALIZED_INCLUDES = ('speakers', 'files', 'reviews', 'schedule')
+    
     id = db.Column(db.Integer, primary_key=True)
     primary_speaker_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     session_type_id = db.Column(db.Integer, db.ForeignKey('session_type.id'), nullable=False)
@@ -54,10 +71,26 @@ class Session(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     submitted_at = db.Column(db.DateTime)
     
+    # Denormalized pointer to the current file version, kept in step with
+    # SessionFile.is_current_version so listings don't need a query per session
+    current_file_id = db.Column(db.Integer, db.ForeignKey('session_file.id', use_alter=True,
+                                                          name='fk_session_current_file_id'))
+    
+    # Review aggregates, maintained with SQL-side increments as reviews are
+    # flushed so listings can report a review summary without loading them
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    scored_review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    review_score_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    approve_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    reject_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Relationships
     primary_speaker = db.relationship('User', backref='primary_sessions')
     additional_speakers = db.relationship('SessionSpeaker', backref='session', lazy=True, cascade='all, delete-orphan')
-    files = db.relationship('SessionFile', backref='session', lazy=True, cascade='all, delete-orphan')
+    files = db.relationship('SessionFile', backref='session', lazy=True, cascade='all, delete-orphan',
+                            foreign_keys='SessionFile.session_id')
+    current_file = db.relationship('SessionFile', foreign_keys=[current_file_id], post_update=True)
     reviews = db.relationship('SessionReview', backref='session', lazy=True, cascade='all, delete-orphan')
     questions = db.relationship('SessionQuestion', backref='session', lazy=True, cascade='all, delete-orphan')
     schedule = db.relationship('SessionSchedule', backref='session', uselist=False, cascade='all, delete-orphan')
@@ -78,19 +111,10 @@ class Session(db.Model):
         speakers.extend([ss.speaker for ss in self.additional_speakers])
         return speakers
 
-    @property
-    def current_file(self):
-        """Get the current version of the session file"""
-        return SessionFile.query.filter_by(
-            session_id=self.id, 
-            is_current_version=True
-        ).first()
-
     @property
     def review_summary(self):
-        """Get summary of review status"""
-        reviews = self.reviews
-        if not reviews:
+        """Get summary of review status from the stored aggregates"""
+        if not self.review_count:
             return {
                 'total_reviews': 0,
                 'completed_reviews': 0,
@@ -98,28 +122,23 @@ class Session(db.Model):
                 'recommendation': None
             }
         
-        completed_reviews = [r for r in reviews if r.status == 'completed']
-        scores = [r.overall_score for r in completed_reviews if r.overall_score]
-        
         return {
-            'total_reviews': len(reviews),
-            'completed_reviews': len(completed_reviews),
-            'average_score': sum(scores) / len(scores) if scores else None,
-            'recommendation': self._get_overall_recommendation(completed_reviews)
+            'total_reviews': self.review_count,
+            'completed_reviews': self.completed_review_count,
+            'average_score': self.review_score_sum / self.scored_review_count if self.scored_review_count else None,
+            'recommendation': self._get_overall_recommendation()
         }
 
-    def _get_overall_recommendation(self, completed_reviews):
+    def _get_overall_recommendation(self):
         """Determine overall recommendation based on completed reviews"""
-        if not completed_reviews:
+        if not self.completed_review_count:
             return None
         
-        recommendations = [r.recommendation for r in completed_reviews if r.recommendation]
-        if not recommendations:
+        approve_count = self.approve_count or 0
+        reject_count = self.reject_count or 0
+        if not approve_count and not reject_count:
             return None
         
-        approve_count = recommendations.count('approve')
-        reject_count = recommendations.count('reject')
-        
         if approve_count > reject_count:
             return 'approve'
         elif reject_count > approve_count:
@@ -127,6 +146,24 @@ class Session(db.Model):
         else:
             return 'pending'
 
+    def recompute_review_aggregates(self):
+        """Rebuild the review aggregates from the reviews table.
+
+        Returns True if the stored values had drifted.
+        """
+        before = self._review_aggregates()
+        
+        totals = Counter()
+        for review in self.reviews:
+            totals.update(review_contribution(lambda key: getattr(review, key)))
+        for column in REVIEW_AGGREGATES:
+            setattr(self, column, totals[column])
+        
+        return self._review_aggregates() != before
+
+    def _review_aggregates(self):
+        return tuple(getattr(self, column) for column in REVIEW_AGGREGATES)
+
     def submit(self):
         """Submit session for review"""
         if self.status == 'draft':
@@ -140,6 +177,7 @@ class Session(db.Model):
         # Mark all files as not current, new upload will set current
         for file in self.files:
             file.is_current_version = False
+        self.current_file = None
 
     def can_edit(self, user):
         """Check if user can edit this session"""
@@ -169,12 +207,54 @@ class Session(db.Model):
         # Managers and admins can view all sessions
         return user.has_role('manager') or user.has_role('admin')
 
-    def to_dict(self, include_files=True, include_reviews=False, include_speakers=True):
-        """Convert session to dictionary representation"""
+    @classmethod
+    def serialization_options(cls, include_files=True, include_reviews=False, include_speakers=True,
+                              include_schedule=True):
+        """Loader options that fetch everything to_dict() touches for a page of sessions.
+
+        Takes the same include_* flags as to_dict() so a listing costs a fixed
+        number of queries regardless of how many sessions are on the page.
+        """
+        # session_type is a top-level field, serialized whatever is included
+        options = [joinedload(cls.session_type)]
+        
+        if include_schedule:
+            options.extend([
+                selectinload(cls.schedule).joinedload(SessionSchedule.room),
+                selectinload(cls.schedule).joinedload(SessionSchedule.scheduler).selectinload(User.roles),
+            ])
+        
+        # The review summary comes from stored aggregates, so the reviews
+        # themselves are only needed when they are serialized
+        if include_reviews:
+            options.append(selectinload(cls.reviews).joinedload(SessionReview.reviewer).selectinload(User.roles))
+        
+        if include_speakers:
+            options.extend([
+                joinedload(cls.primary_speaker).selectinload(User.roles),
+                selectinload(cls.additional_speakers).joinedload(SessionSpeaker.speaker).selectinload(User.roles),
+            ])
+        
+        if include_files:
+            options.extend([
+                selectinload(cls.files),
+                joinedload(cls.current_file),
+            ])
+        
+        return options
+
+    def to_dict(self, include_files=True, include_reviews=False, include_speakers=True,
+                include_schedule=True, fields=None):
+        """Convert session to dictionary representation
+
+        fields optionally limits the top-level fields to a subset of
+        SERIALIZED_FIELDS; the id is always included.
+        """
         data = {
             'id': self.id,
             'primary_speaker_id': self.primary_speaker_id,
             'session_type_id': self.session_type_id,
+            'session_type': self.session_type.to_dict() if self.session_type else None,
             'title': self.title,
             'description': self.description,
             'upload_comments': self.upload_comments,
@@ -185,10 +265,12 @@ class Session(db.Model):
             'review_summary': self.review_summary
         }
         
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key == 'id' or key in fields}
+        
         if include_speakers:
             data['primary_speaker'] = self.primary_speaker.to_dict() if self.primary_speaker else None
             data['additional_speakers'] = [ss.to_dict() for ss in self.additional_speakers]
-            data['session_type'] = self.session_type.to_dict() if self.session_type else None
         
         if include_files:
             data['files'] = [f.to_dict() for f in self.files]
@@ -197,7 +279,7 @@ class Session(db.Model):
         if include_reviews:
             data['reviews'] = [r.to_dict() for r in self.reviews]
         
-        if self.schedule:
+        if include_schedule and self.schedule:
             data['schedule'] = self.schedule.to_dict()
         
         return data
@@ -242,6 +324,9 @@ class SessionSpeaker(db.Model):
 
 class SessionFile(db.Model):
     """Files uploaded for sessions"""
+    __table_args__ = (
+        db.Index('ix_session_file_session_id_is_current_version', 'session_id', 'is_current_version'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('session.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)  # System filename
@@ -265,7 +350,7 @@ class SessionFile(db.Model):
     uploader = db.relationship('User', backref='uploaded_session_files')
 
     def __init__(self, session_id, filename, original_filename, file_path, 
-                 file_size, mime_type, uploaded_by, **kwargs):
+                 file_size, mime_type, uploaded_by, file_hash=None, **kwargs):
         self.session_id = session_id
         self.filename = filename
         self.original_filename = original_filename
@@ -274,15 +359,17 @@ class SessionFile(db.Model):
         self.mime_type = mime_type
         self.uploaded_by = uploaded_by
         
-        # Calculate file hash
-        self.file_hash = self._calculate_file_hash(file_path)
-        
-        # Set version number
-        self._set_version_number()
+        # Uploads arrive hashed as they were written; anything else is read
+        # back to hash it
+        self.file_hash = file_hash or self._calculate_file_hash(file_path)
         
+        # Applied before versioning so is_current_version=False is honoured
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
+        
+        # Set version number
+        self._set_version_number()
 
     def _calculate_file_hash(self, file_path):
         """Calculate SHA-256 hash of the file"""
@@ -305,11 +392,19 @@ class SessionFile(db.Model):
         
         self.version_number = (max_version or 0) + 1
         
-        # Mark all other versions as not current
+        # New uploads become the current version unless told otherwise
+        if self.is_current_version is None:
+            self.is_current_version = True
+        
+        # Mark all other versions as not current and repoint the session
         if self.is_current_version:
             SessionFile.query.filter_by(
                 session_id=self.session_id
             ).update({'is_current_version': False})
+            
+            session = db.session.get(Session, self.session_id)
+            if session:
+                session.current_file = self
 
     @property
     def file_extension(self):
@@ -353,3 +448,84 @@ class SessionFile(db.Model):
     def __repr__(self):
         return f'<SessionFile {self.original_filename} v{self.version_number}>'
 
+
+# Session columns summarizing its reviews, and the review attributes they
+# are computed from
+REVIEW_AGGREGATES = ('review_count', 'completed_review_count', 'scored_review_count',
+                     'review_score_sum', 'approve_count', 'reject_count')
+REVIEW_AGGREGATE_SOURCES = ('session_id', 'status', 'decision', 'overall_score')
+
+
+def review_contribution(get):
+    """What one review adds to each of its session's aggregates"""
+    counters = Counter({'review_count': 1})
+    if get('status') == 'completed':
+        counters['completed_review_count'] += 1
+        if get('overall_score'):
+            counters['scored_review_count'] += 1
+            counters['review_score_sum'] += get('overall_score')
+        if get('decision') == 'approve':
+            counters['approve_count'] += 1
+        elif get('decision') == 'reject':
+            counters['reject_count'] += 1
+    return counters
+
+
+@event.listens_for(db.session, 'before_flush')
+def load_deleted_review_attributes(session, flush_context, instances):
+    """Load what deleted reviews count towards while they can still be read"""
+    for obj in session.deleted:
+        if isinstance(obj, SessionReview):
+            for key in REVIEW_AGGREGATE_SOURCES:
+                getattr(obj, key)
+
+
+@event.listens_for(db.session, 'after_flush')
+def update_review_aggregates(session, flush_context):
+    """Fold the flush's review inserts, updates and deletes into their
+    sessions' aggregates.
+
+    The aggregates are incremented in SQL rather than from the values loaded
+    into Python, so reviews completed concurrently don't overwrite each
+    other's counts.
+    """
+    deltas = {}
+
+    def add(session_id, counters, sign):
+        if session_id is not None:
+            for column, value in counters.items():
+                deltas.setdefault(session_id, Counter())[column] += sign * value
+
+    for obj in session.new:
+        if isinstance(obj, SessionReview):
+            add(obj.session_id, review_contribution(lambda key: getattr(obj, key)), 1)
+    for obj in session.deleted:
+        if isinstance(obj, SessionReview):
+            add(previous_value(obj, 'session_id'),
+                review_contribution(lambda key: previous_value(obj, key)), -1)
+    for obj in session.dirty:
+        if not isinstance(obj, SessionReview) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        if any(state.attrs[key].history.has_changes() for key in REVIEW_AGGREGATE_SOURCES):
+            add(obj.session_id, review_contribution(lambda key: getattr(obj, key)), 1)
+            add(previous_value(obj, 'session_id'),
+                review_contribution(lambda key: previous_value(obj, key)), -1)
+
+    table = Session.__table__
+    connection = session.connection()
+    # Fixed order so concurrent flushes lock session rows in the same sequence
+    for session_id in sorted(deltas):
+        changes = {column: table.c[column] + delta for column, delta in deltas[session_id].items() if delta}
+        if not changes:
+            continue
+        connection.execute(table.update().where(table.c.id == session_id).values(**changes))
+        # The loaded values are now stale; reload them on next access
+        loaded = session.identity_map.get(inspect(Session).identity_key_from_primary_key((session_id,)))
+        if loaded is not None:
+            session.expire(loaded, list(changes))
+
+
+# Load the stored value before an expired attribute is overwritten, so the
+# flush hook can always tell what a review counted towards
+track_previous_values(SessionReview, REVIEW_AGGREGATE_SOURCES)
@@ -124,6 +124,9 @@ class SessionReviewComment(db.Model):
 
 class SessionAssignment(db.Model):
     """Assignment of sessions to approvers/managers"""
+    __table_args__ = (
+        db.Index('ix_session_assignment_approver_id_status', 'approver_id', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('session.id'), nullable=False)
     approver_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -214,6 +217,9 @@ class Room(db.Model):
 
 class SessionSchedule(db.Model):
     """Scheduling information for approved sessions"""
+    __table_args__ = (
+        db.Index('ix_session_schedule_room_id_day_start_time', 'room_id', 'day', 'start_time'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('session.id'), nullable=False)
     room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
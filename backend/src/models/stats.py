@@ -0,0 +1,165 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.user import db, User
+from src.models.history import previous_value, track_previous_values
+from src.models.session import Session, SessionFile
+from src.models.communication import SessionQuestion
+
+
+def status_counter(prefix, status):
+    """Counter name for rows of one status, e.g. sessions.status.submitted"""
+    return f'{prefix}.status.{status or "none"}'
+
+
+def created_counter(prefix, day):
+    """Counter name for rows created on one UTC day, e.g. users.created.2025-11-27"""
+    if isinstance(day, datetime):
+        day = day.date()
+    return f'{prefix}.created.{day}'
+
+
+class StatsCounter(db.Model):
+    """Running totals behind the admin dashboard, kept current on every flush"""
+    __tablename__ = 'stats_counter'
+
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StatsCounter {self.name}={self.value}>'
+
+    @classmethod
+    def snapshot(cls, days=()):
+        """Read the totals plus the per-day counters for days in one query"""
+        daily = [created_counter(prefix, day) for prefix in ('users', 'sessions') for day in days]
+        rows = db.session.query(cls.name, cls.value).filter(
+            or_(~cls.name.like('%.created.%'), cls.name.in_(daily))
+        )
+        return dict(rows.all())
+
+    @classmethod
+    def apply(cls, connection, deltas):
+        """Add deltas to the stored counters with atomic increments"""
+        table = cls.__table__
+        now = datetime.utcnow()
+        dialect = connection.dialect.name
+        # Fixed order so concurrent flushes lock counter rows in the same sequence
+        for name in sorted(deltas):
+            delta = deltas[name]
+            if not delta:
+                continue
+            if dialect in ('postgresql', 'sqlite'):
+                # A single upsert, so two flushes creating the same counter
+                # can't both insert it
+                insert = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+                connection.execute(
+                    insert.values(name=name, value=delta, updated_at=now)
+                    .on_conflict_do_update(
+                        index_elements=[table.c.name],
+                        set_={'value': table.c.value + insert.excluded.value, 'updated_at': now}
+                    )
+                )
+                continue
+            result = connection.execute(
+                table.update().where(table.c.name == name)
+                .values(value=table.c.value + delta, updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(name=name, value=delta, updated_at=now))
+
+
+def _value(obj, key, previous):
+    """An attribute's value before (previous=True) or after the flush in progress"""
+    history = inspect(obj).attrs[key].history
+    relationship = inspect(type(obj)).relationships.get(key)
+    if relationship is not None and relationship.uselist:
+        changed = history.deleted if previous else history.added
+        return list(history.unchanged) + list(changed)
+    if previous:
+        return previous_value(obj, key)
+    return getattr(obj, key)
+
+
+def _user_counters(get):
+    counters = Counter({'users.total': 1})
+    if get('is_active'):
+        counters['users.active'] += 1
+    for role in get('roles'):
+        counters[f'users.role.{role.name}'] += 1
+    if get('created_at'):
+        counters[created_counter('users', get('created_at'))] += 1
+    return counters
+
+
+def _session_counters(get):
+    counters = Counter({status_counter('sessions', get('status')): 1})
+    if get('created_at'):
+        counters[created_counter('sessions', get('created_at'))] += 1
+    return counters
+
+
+def _file_counters(get):
+    return Counter({'files.total': 1, 'files.bytes': get('file_size') or 0})
+
+
+def _question_counters(get):
+    return Counter({status_counter('questions', get('status')): 1})
+
+
+# Model -> (attributes its counters depend on, function returning what one
+# row adds to each counter)
+TRACKED_MODELS = {
+    User: (('is_active', 'roles', 'created_at'), _user_counters),
+    Session: (('status', 'created_at'), _session_counters),
+    SessionFile: (('file_size',), _file_counters),
+    SessionQuestion: (('status',), _question_counters),
+}
+
+
+def _contribution(obj, previous):
+    """What obj adds to each counter, as stored before or after this flush"""
+    _, counters = TRACKED_MODELS[type(obj)]
+    return counters(lambda key: _value(obj, key, previous))
+
+
+@event.listens_for(db.session, 'before_flush')
+def load_deleted_stats_attributes(session, flush_context, instances):
+    """Load what deleted rows count towards while they can still be read"""
+    for obj in session.deleted:
+        if type(obj) in TRACKED_MODELS:
+            keys, _ = TRACKED_MODELS[type(obj)]
+            for key in keys:
+                getattr(obj, key)
+
+
+@event.listens_for(db.session, 'after_flush')
+def update_stats_counters(session, flush_context):
+    """Fold the flush's inserts, updates and deletes into stats_counter"""
+    deltas = Counter()
+    for obj in session.new:
+        if type(obj) in TRACKED_MODELS:
+            deltas.update(_contribution(obj, previous=False))
+    for obj in session.deleted:
+        if type(obj) in TRACKED_MODELS:
+            deltas.subtract(_contribution(obj, previous=True))
+    for obj in session.dirty:
+        if type(obj) not in TRACKED_MODELS or obj in session.deleted:
+            continue
+        keys, _ = TRACKED_MODELS[type(obj)]
+        state = inspect(obj)
+        if any(state.attrs[key].history.has_changes() for key in keys):
+            deltas.update(_contribution(obj, previous=False))
+            deltas.subtract(_contribution(obj, previous=True))
+
+    if any(deltas.values()):
+        StatsCounter.apply(session.connection(), deltas)
+
+
+# Load the stored value before an expired attribute is overwritten, so the
+# flush hook can always tell which counter a row is leaving
+for _model, (_keys, _) in TRACKED_MODELS.items():
+    track_previous_values(_model, _keys)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from src.models.user import db
+
+
+class RevokedToken(db.Model):
+    """A JWT revoked before it expires, shared by every worker.
+
+    Rows are only needed until the token would have expired anyway, after
+    which ``prune-revoked-tokens`` (or the blocklist itself) removes them.
+    """
+    __tablename__ = 'revoked_token'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10))
+    user_id = db.Column(db.Integer)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
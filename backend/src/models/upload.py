@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from src.models.user import db
+
+
+class ResumableUpload(db.Model):
+    """A file upload in progress, sent in fixed-size chunks that may span
+    several requests, workers and restarts.
+
+    Chunks are written at their offsets into a staging file, which is
+    hashed in one pass once the last chunk is in. upload_offset doubles as
+    the row's version: a chunk is only recorded if no other request has
+    moved the offset since it was read. Uploads untouched past expires_at are
+    removed by ``prune-uploads``.
+    """
+    __tablename__ = 'resumable_upload'
+
+    id = db.Column(db.String(32), primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('session.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    upload_length = db.Column(db.BigInteger, nullable=False)
+    upload_offset = db.Column(db.BigInteger, nullable=False, default=0)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    staging_path = db.Column(db.String(500), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __mapper_args__ = {
+        'version_id_col': upload_offset,
+        'version_id_generator': False
+    }
+
+    @property
+    def is_complete(self):
+        return self.upload_offset >= self.upload_length
+
+    def next_chunk_length(self):
+        """Bytes the next chunk must carry: a full chunk, or what is left"""
+        return min(self.chunk_size, self.upload_length - self.upload_offset)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'session_id': self.session_id,
+            'filename': self.filename,
+            'upload_length': self.upload_length,
+            'upload_offset': self.upload_offset,
+            'chunk_size': self.chunk_size,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+    def __repr__(self):
+        return f'<ResumableUpload {self.id} {self.upload_offset}/{self.upload_length}>'
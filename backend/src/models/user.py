@@ -1,6 +1,7 @@
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, select, update
 from datetime import datetime
 import secrets
 
@@ -15,6 +16,53 @@ user_roles = db.Table('user_roles',
     db.Column('assigned_by', db.Integer, db.ForeignKey('user.id'))
 )
 
+# Every permission a role can grant, in bit order: a permission's bit is its
+# position here. Access tokens carry masks built from this order, so only
+# ever append to it.
+PERMISSIONS = (
+    'manage_users',
+    'manage_roles',
+    'view_audit_logs',
+    'view_system_stats',
+    'review_sessions',
+    'approve_sessions',
+    'schedule_sessions',
+    'manage_rooms',
+    'answer_questions',
+    'send_notifications',
+    'submit_sessions',
+    'upload_files',
+    'download_files',
+)
+
+PERMISSION_BITS = {name: 1 << position for position, name in enumerate(PERMISSIONS)}
+
+# Masks compiled per process, keyed by the set of permissions granted, so a
+# role whose permissions change compiles afresh
+_compiled_masks = {}
+
+def permission_bit(permission):
+    """The bit for a registered permission"""
+    try:
+        return PERMISSION_BITS[permission]
+    except KeyError:
+        raise ValueError(f'Unknown permission: {permission}') from None
+
+def permission_names(mask):
+    """The permissions set in a mask"""
+    return [name for name in PERMISSIONS if mask & PERMISSION_BITS[name]]
+
+def compile_permissions(permissions):
+    """Bitmask of the permissions granted in a role's JSON permissions"""
+    granted = frozenset(name for name, allowed in (permissions or {}).items() if allowed)
+    mask = _compiled_masks.get(granted)
+    if mask is None:
+        mask = 0
+        for name in granted:
+            mask |= PERMISSION_BITS.get(name, 0)
+        _compiled_masks[granted] = mask
+    return mask
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
@@ -32,6 +80,9 @@ class User(db.Model):
     email_verification_token = db.Column(db.String(100))
     mfa_enabled = db.Column(db.Boolean, default=False)
     mfa_secret = db.Column(db.String(32))
+    # Bumped whenever roles or active status change; access tokens carry the
+    # epoch they were issued under and are refused once it moves on
+    token_epoch = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -81,6 +132,28 @@ class User(db.Model):
         if role in self.roles:
             self.roles.remove(role)
 
+    @property
+    def permission_mask(self):
+        """Bitmask of every permission granted through the user's roles"""
+        mask = 0
+        for role in self.roles:
+            mask |= role.permission_mask
+        return mask
+
+    def revoke_tokens(self):
+        """Invalidate every access token issued to this user so far"""
+        self.token_epoch = (self.token_epoch or 0) + 1
+
+    def token_claims(self):
+        """Claims embedded in this user's access tokens"""
+        return {
+            'roles': [role.name for role in self.roles],
+            'email': self.email,
+            'user_id': self.id,
+            'epoch': self.token_epoch or 0,
+            'perms': self.permission_mask
+        }
+
     @property
     def full_name(self):
         """Get user's full name"""
@@ -129,20 +202,26 @@ class Role(db.Model):
         self.description = description
         self.permissions = permissions or {}
 
+    @property
+    def permission_mask(self):
+        """Bitmask of the permissions this role grants"""
+        return compile_permissions(self.permissions)
+
     def has_permission(self, permission):
         """Check if role has a specific permission"""
-        return self.permissions.get(permission, False)
+        return bool(self.permission_mask & permission_bit(permission))
 
+    # The JSON column only notices reassignment, so permissions are replaced
+    # rather than edited in place
     def add_permission(self, permission):
         """Add a permission to the role"""
-        if not self.permissions:
-            self.permissions = {}
-        self.permissions[permission] = True
+        permission_bit(permission)
+        self.permissions = {**(self.permissions or {}), permission: True}
 
     def remove_permission(self, permission):
         """Remove a permission from the role"""
         if self.permissions and permission in self.permissions:
-            del self.permissions[permission]
+            self.permissions = {k: v for k, v in self.permissions.items() if k != permission}
 
     def to_dict(self):
         return {
@@ -157,8 +236,36 @@ class Role(db.Model):
         return f'<Role {self.name}>'
 
 
+def _revoke_member_tokens(connection, role_id):
+    """Bump the token epoch of every holder of a role, whose tokens carry its
+    old permission mask"""
+    members = select(user_roles.c.user_id).where(user_roles.c.role_id == role_id)
+    connection.execute(
+        update(User).where(User.id.in_(members)).values(token_epoch=User.token_epoch + 1)
+    )
+
+@event.listens_for(Role, 'after_update')
+def revoke_tokens_on_permission_change(mapper, connection, role):
+    if db.inspect(role).attrs.permissions.history.has_changes():
+        _revoke_member_tokens(connection, role.id)
+
+@event.listens_for(db.session, 'before_flush')
+def revoke_tokens_on_role_delete(session, flush_context, instances):
+    # Memberships of a deleted role are removed before its row, so its
+    # holders are found ahead of the flush
+    for obj in session.deleted:
+        if isinstance(obj, Role) and obj.id is not None:
+            _revoke_member_tokens(session.connection(), obj.id)
+
+
 class AuditLog(db.Model):
     """Audit log for tracking all significant system events"""
+    __table_args__ = (
+        db.Index('ix_audit_log_timestamp', 'timestamp'),
+        db.Index('ix_audit_log_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_audit_log_action_timestamp', 'action', 'timestamp'),
+        db.Index('ix_audit_log_resource_type_resource_id_timestamp', 'resource_type', 'resource_id', 'timestamp'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     action = db.Column(db.String(100), nullable=False)
@@ -167,7 +274,9 @@ class AuditLog(db.Model):
     details = db.Column(db.JSON)
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.String(500))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    # Partition key on PostgreSQL, where the primary key is (id, timestamp);
+    # see src/utils/audit_partitions.py
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     user = db.relationship('User', backref='audit_logs')
 
@@ -1,18 +1,26 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app, send_file, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
+from datetime import datetime, timezone
+import csv
+import io
+import json
 import os
 import zipfile
 import tempfile
-from sqlalchemy import and_, or_
+from sqlalchemy import and_
+from sqlalchemy.orm import joinedload
 
 from src.models import (
     db, User, Role, ApproverInvitation, FAQ, BroadcastMessage, MessageDelivery,
     SessionAssignment, Session, SessionFile
 )
 from src.utils.security import (
-    require_role, log_api_access, get_current_user, sanitize_input
+    require_role, log_api_access, get_current_user, sanitize_input, forget_token_epoch
 )
+from src.utils.pagination import paginate_query, InvalidCursor
+from src.utils.stats import system_stats
+from src.utils.search import search_users, search_sessions, user_search_condition, InvalidSearch
+from src.utils.audit_partitions import audit_query, audit_entry, audit_entries, InvalidAuditFilter
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -27,8 +35,6 @@ def get_users():
         role = request.args.get('role')
         search = request.args.get('search')
         is_active = request.args.get('is_active')
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 20)), 100)
         
         query = User.query
         
@@ -37,42 +43,24 @@ def get_users():
             query = query.join(User.roles).filter(Role.name == role)
         
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    User.email.ilike(search_term),
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term),
-                    User.organization.ilike(search_term)
-                )
-            )
+            query = query.filter(user_search_condition(search))
         
         if is_active is not None:
             active_filter = is_active.lower() == 'true'
             query = query.filter(User.is_active == active_filter)
         
-        # Order by creation date
-        query = query.order_by(User.created_at.desc())
-        
-        # Paginate results
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        users = pagination.items
+        # Paginate results, newest first
+        users, pagination = paginate_query(query, [User.created_at, User.id])
         
         return jsonify({
             'users': [user.to_dict() for user in users],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except InvalidSearch as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching users: {str(e)}")
         return jsonify({'error': 'Failed to fetch users'}), 500
@@ -99,9 +87,11 @@ def update_user_roles(user_id):
         if len(roles) != len(role_names):
             return jsonify({'error': 'One or more invalid roles'}), 400
         
-        # Update user roles
+        # Update user roles; tokens carrying the old roles stop working
         user.roles = roles
+        user.revoke_tokens()
         db.session.commit()
+        forget_token_epoch(user.id)
         
         return jsonify({
             'message': 'User roles updated successfully',
@@ -129,7 +119,9 @@ def activate_user(user_id):
         
         user.is_active = is_active
         user.updated_at = datetime.utcnow()
+        user.revoke_tokens()
         db.session.commit()
+        forget_token_epoch(user.id)
         
         action = 'activated' if is_active else 'deactivated'
         return jsonify({
@@ -207,8 +199,6 @@ def get_invitations():
     try:
         # Get query parameters
         status = request.args.get('status')  # valid, used, expired
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 20)), 100)
         
         query = ApproverInvitation.query
         
@@ -230,28 +220,18 @@ def get_invitations():
                 )
             )
         
-        # Order by creation date
-        query = query.order_by(ApproverInvitation.created_at.desc())
-        
-        # Paginate results
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # Paginate results, newest first
+        invitations, pagination = paginate_query(
+            query, [ApproverInvitation.created_at, ApproverInvitation.id]
         )
         
-        invitations = pagination.items
-        
         return jsonify({
             'invitations': [inv.to_dict() for inv in invitations],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching invitations: {str(e)}")
         return jsonify({'error': 'Failed to fetch invitations'}), 500
@@ -526,29 +506,17 @@ def create_broadcast_message():
 def get_broadcast_messages():
     """Get all broadcast messages"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 20)), 100)
-        
-        pagination = BroadcastMessage.query.order_by(
-            BroadcastMessage.created_at.desc()
-        ).paginate(
-            page=page, per_page=per_page, error_out=False
+        messages, pagination = paginate_query(
+            BroadcastMessage.query, [BroadcastMessage.created_at, BroadcastMessage.id]
         )
         
-        messages = pagination.items
-        
         return jsonify({
             'messages': [msg.to_dict() for msg in messages],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching broadcast messages: {str(e)}")
         return jsonify({'error': 'Failed to fetch broadcast messages'}), 500
@@ -579,7 +547,8 @@ def bulk_download_presentations():
         if session_type_id:
             query = query.filter(Session.session_type_id == session_type_id)
         
-        sessions = query.all()
+        # Fetch each session's current file in the same query
+        sessions = query.options(joinedload(Session.current_file)).all()
         
         if not sessions:
             return jsonify({'error': 'No sessions found matching criteria'}), 404
@@ -638,70 +607,186 @@ def bulk_download_presentations():
 def get_system_stats():
     """Get comprehensive system statistics"""
     try:
-        # User stats
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        speakers = User.query.join(User.roles).filter(Role.name == 'speaker').count()
-        managers = User.query.join(User.roles).filter(Role.name == 'manager').count()
-        admins = User.query.join(User.roles).filter(Role.name == 'admin').count()
-        
-        # Session stats
-        total_sessions = Session.query.count()
-        draft_sessions = Session.query.filter_by(status='draft').count()
-        submitted_sessions = Session.query.filter_by(status='submitted').count()
-        approved_sessions = Session.query.filter_by(status='approved').count()
-        rejected_sessions = Session.query.filter_by(status='rejected').count()
-        scheduled_sessions = Session.query.filter_by(status='scheduled').count()
-        
-        # File stats
-        total_files = SessionFile.query.count()
-        total_file_size = db.session.query(db.func.sum(SessionFile.file_size)).scalar() or 0
-        
-        # Question stats
-        total_questions = SessionQuestion.query.count()
-        open_questions = SessionQuestion.query.filter_by(status='open').count()
-        answered_questions = SessionQuestion.query.filter_by(status='answered').count()
-        
-        # Recent activity (last 7 days)
-        from datetime import timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_sessions = Session.query.filter(Session.created_at >= week_ago).count()
-        recent_users = User.query.filter(User.created_at >= week_ago).count()
+        return jsonify({'stats': system_stats()}), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error fetching system stats: {str(e)}")
+        return jsonify({'error': 'Failed to fetch system stats'}), 500
+
+@admin_bp.route('/search', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+@log_api_access
+def search():
+    """Search users and sessions, best matches first, with highlighted fields"""
+    try:
+        term = request.args.get('q', '').strip()
+        types = {t.strip() for t in request.args.get('type', 'users,sessions').split(',') if t.strip()}
+        limit = request.args.get('limit', 20, type=int)
+        
+        unknown = types - {'users', 'sessions'}
+        if unknown:
+            return jsonify({'error': f'Unknown type: {", ".join(sorted(unknown))}. Allowed: users, sessions'}), 400
+        
+        results = {}
+        if 'users' in types:
+            results['users'] = [{
+                'user': match['object'].to_dict(),
+                'rank': match['rank'],
+                'highlights': match['highlights']
+            } for match in search_users(term, limit)]
+        
+        if 'sessions' in types:
+            includes = {'include_files': False, 'include_schedule': False}
+            results['sessions'] = [{
+                'session': match['object'].to_dict(**includes),
+                'rank': match['rank'],
+                'highlights': match['highlights']
+            } for match in search_sessions(term, limit, Session.serialization_options(**includes))]
         
         return jsonify({
-            'stats': {
-                'users': {
-                    'total': total_users,
-                    'active': active_users,
-                    'speakers': speakers,
-                    'managers': managers,
-                    'admins': admins
-                },
-                'sessions': {
-                    'total': total_sessions,
-                    'draft': draft_sessions,
-                    'submitted': submitted_sessions,
-                    'approved': approved_sessions,
-                    'rejected': rejected_sessions,
-                    'scheduled': scheduled_sessions
-                },
-                'files': {
-                    'total_files': total_files,
-                    'total_size_mb': round(total_file_size / (1024 * 1024), 2)
-                },
-                'questions': {
-                    'total': total_questions,
-                    'open': open_questions,
-                    'answered': answered_questions
-                },
-                'recent_activity': {
-                    'new_sessions_week': recent_sessions,
-                    'new_users_week': recent_users
-                }
-            }
+            'query': term,
+            'results': results
         }), 200
         
+    except InvalidSearch as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        current_app.logger.error(f"Error fetching system stats: {str(e)}")
-        return jsonify({'error': 'Failed to fetch system stats'}), 500
+        current_app.logger.error(f"Error searching: {str(e)}")
+        return jsonify({'error': 'Search failed'}), 500
+
+AUDIT_EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+AUDIT_EXPORT_COLUMNS = (
+    'id', 'timestamp', 'user_id', 'action', 'resource_type', 'resource_id',
+    'details', 'ip_address', 'user_agent'
+)
+# Streamed responses are sent in chunks of about this many bytes
+AUDIT_EXPORT_CHUNK_SIZE = 64 * 1024
 
+def _audit_time(name):
+    """A since/until argument as a naive UTC datetime"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidAuditFilter(f'{name} must be an ISO 8601 date or time')
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _audit_filters():
+    """(since, until, column filters) from the request's audit arguments"""
+    filters = {}
+    for key in ('user_id', 'resource_id'):
+        value = request.args.get(key)
+        if value:
+            try:
+                filters[key] = int(value)
+            except ValueError:
+                raise InvalidAuditFilter(f'{key} must be an integer')
+    for key in ('action', 'resource_type'):
+        value = request.args.get(key)
+        if value:
+            filters[key] = value
+    return _audit_time('since'), _audit_time('until'), filters
+
+def _csv_cell(value):
+    """A CSV cell, with text that a spreadsheet would run as a formula
+    quoted"""
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(',', ':'))
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+@admin_bp.route('/audit', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+@log_api_access
+def get_audit_log():
+    """Audit entries newest first, filtered by user_id, action, resource_type,
+    resource_id and a since/until time range"""
+    try:
+        since, until, filters = _audit_filters()
+        query, columns = audit_query(since, until, **filters)
+        
+        # Pass cursor= for keyset pagination, which stays fast however deep
+        entries, pagination = paginate_query(query, [columns.timestamp, columns.id])
+        
+        return jsonify({
+            'entries': [audit_entry(entry) for entry in entries],
+            'pagination': pagination
+        }), 200
+        
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except InvalidAuditFilter as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error fetching audit log: {str(e)}")
+        return jsonify({'error': 'Failed to fetch audit log'}), 500
+
+@admin_bp.route('/audit/export', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+@log_api_access
+def export_audit_log():
+    """Stream every matching audit entry, oldest first, as NDJSON or CSV.
+    
+    Takes the same filters as the listing and also reads archived months.
+    Rows are fetched in batches from a server-side cursor and written out
+    as they arrive, so memory use does not grow with the size of the export.
+    The status is sent before the first row, so an export that fails part
+    way ends with a marker instead: an NDJSON line with "export_truncated"
+    set, or a CSV row starting "# export truncated".
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in AUDIT_EXPORT_FORMATS:
+            return jsonify({'error': f'Unknown format: {export_format}. Allowed: {", ".join(AUDIT_EXPORT_FORMATS)}'}), 400
+        since, until, filters = _audit_filters()
+        archive_dir = current_app.config['AUDIT_ARCHIVE_DIR']
+        
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer) if export_format == 'csv' else None
+            if writer:
+                writer.writerow(AUDIT_EXPORT_COLUMNS)
+            rows = 0
+            try:
+                for entry in audit_entries(archive_dir, since, until, **filters):
+                    rows += 1
+                    if writer:
+                        writer.writerow([_csv_cell(entry.get(column)) for column in AUDIT_EXPORT_COLUMNS])
+                    else:
+                        buffer.write(json.dumps(entry, separators=(',', ':')) + '\n')
+                    if buffer.tell() >= AUDIT_EXPORT_CHUNK_SIZE:
+                        yield buffer.getvalue()
+                        buffer.seek(0)
+                        buffer.truncate()
+            except Exception as e:
+                # The status has been sent already, so mark the body as short
+                current_app.logger.error(f"Audit export failed after {rows} rows: {str(e)}")
+                if writer:
+                    writer.writerow([f'# export truncated after {rows} rows'])
+                else:
+                    buffer.write(json.dumps({'export_truncated': True, 'rows': rows}) + '\n')
+            yield buffer.getvalue()
+        
+        filename = f'audit_log_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+        return Response(
+            stream_with_context(generate()),
+            mimetype=AUDIT_EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+        
+    except InvalidAuditFilter as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error exporting audit log: {str(e)}")
+        return jsonify({'error': 'Failed to export audit log'}), 500
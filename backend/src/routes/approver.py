@@ -10,6 +10,9 @@ from src.models import (
 from src.utils.security import (
     require_role, log_api_access, get_current_user, sanitize_input
 )
+from src.utils.pagination import paginate_query, InvalidCursor
+from src.utils.serialization import session_serialization_args, InvalidFieldset
+from src.utils.stats import approver_dashboard_stats
 
 approver_bp = Blueprint('approver', __name__)
 
@@ -26,8 +29,6 @@ def get_assigned_sessions():
         
         # Get query parameters
         status = request.args.get('status')
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 20)), 100)
         
         if current_user.has_role('admin'):
             # Admins can see all sessions
@@ -41,28 +42,24 @@ def get_assigned_sessions():
         if status:
             query = query.filter(Session.status == status)
         
-        # Order by submission date
-        query = query.order_by(Session.submitted_at.desc().nullslast(), Session.created_at.desc())
+        # Load only the requested relationships, for the whole page up front
+        includes, fields = session_serialization_args(include_files=True)
+        query = query.options(*Session.serialization_options(**includes))
         
-        # Paginate results
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # Paginate results, ordered by submission date
+        sessions, pagination = paginate_query(
+            query, [Session.submitted_at, Session.created_at, Session.id]
         )
         
-        sessions = pagination.items
-        
         return jsonify({
-            'sessions': [s.to_dict(include_files=True) for s in sessions],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'sessions': [s.to_dict(fields=fields, **includes) for s in sessions],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except InvalidFieldset as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching assigned sessions: {str(e)}")
         return jsonify({'error': 'Failed to fetch assigned sessions'}), 500
@@ -223,8 +220,6 @@ def get_questions():
         # Get query parameters
         status = request.args.get('status', 'open')
         urgent_only = request.args.get('urgent_only', 'false').lower() == 'true'
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 20)), 100)
         
         if current_user.has_role('admin'):
             # Admins can see all questions
@@ -240,31 +235,18 @@ def get_questions():
         if urgent_only:
             query = query.filter(SessionQuestion.is_urgent == True)
         
-        # Order by urgency and creation date
-        query = query.order_by(
-            SessionQuestion.is_urgent.desc(),
-            SessionQuestion.created_at.desc()
-        )
-        
-        # Paginate results
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # Paginate results, ordered by urgency and creation date
+        questions, pagination = paginate_query(
+            query, [SessionQuestion.is_urgent, SessionQuestion.created_at, SessionQuestion.id]
         )
         
-        questions = pagination.items
-        
         return jsonify({
             'questions': [q.to_dict() for q in questions],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching questions: {str(e)}")
         return jsonify({'error': 'Failed to fetch questions'}), 500
@@ -496,64 +478,7 @@ def get_dashboard_stats():
     """Get dashboard statistics for approvers"""
     try:
         current_user = get_current_user()
-        
-        if current_user.has_role('admin'):
-            # Admin stats - all sessions
-            total_sessions = Session.query.count()
-            pending_sessions = Session.query.filter_by(status='submitted').count()
-            approved_sessions = Session.query.filter_by(status='approved').count()
-            rejected_sessions = Session.query.filter_by(status='rejected').count()
-            scheduled_sessions = Session.query.filter_by(status='scheduled').count()
-            
-            # Questions stats
-            open_questions = SessionQuestion.query.filter_by(status='open').count()
-            urgent_questions = SessionQuestion.query.filter(
-                and_(SessionQuestion.status == 'open', SessionQuestion.is_urgent == True)
-            ).count()
-        else:
-            # Manager stats - only assigned sessions
-            assigned_session_ids = [a.session_id for a in current_user.assigned_sessions if a.status == 'active']
-            
-            total_sessions = len(assigned_session_ids)
-            pending_sessions = Session.query.filter(
-                and_(Session.id.in_(assigned_session_ids), Session.status == 'submitted')
-            ).count()
-            approved_sessions = Session.query.filter(
-                and_(Session.id.in_(assigned_session_ids), Session.status == 'approved')
-            ).count()
-            rejected_sessions = Session.query.filter(
-                and_(Session.id.in_(assigned_session_ids), Session.status == 'rejected')
-            ).count()
-            scheduled_sessions = Session.query.filter(
-                and_(Session.id.in_(assigned_session_ids), Session.status == 'scheduled')
-            ).count()
-            
-            # Questions stats for assigned sessions
-            open_questions = SessionQuestion.query.filter(
-                and_(
-                    SessionQuestion.session_id.in_(assigned_session_ids),
-                    SessionQuestion.status == 'open'
-                )
-            ).count()
-            urgent_questions = SessionQuestion.query.filter(
-                and_(
-                    SessionQuestion.session_id.in_(assigned_session_ids),
-                    SessionQuestion.status == 'open',
-                    SessionQuestion.is_urgent == True
-                )
-            ).count()
-        
-        return jsonify({
-            'stats': {
-                'total_sessions': total_sessions,
-                'pending_sessions': pending_sessions,
-                'approved_sessions': approved_sessions,
-                'rejected_sessions': rejected_sessions,
-                'scheduled_sessions': scheduled_sessions,
-                'open_questions': open_questions,
-                'urgent_questions': urgent_questions
-            }
-        }), 200
+        return jsonify({'stats': approver_dashboard_stats(current_user)}), 200
         
     except Exception as e:
         current_app.logger.error(f"Error fetching dashboard stats: {str(e)}")
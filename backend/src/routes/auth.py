@@ -10,16 +10,16 @@ import secrets
 import re
 
 from src.models import db, User, Role, AuditLog, jwt
+from src.utils.token_blocklist import get_token_blocklist
+from src.utils.security import rate_limit
+from src.utils.audit import record_audit_event
 
 auth_bp = Blueprint('auth', __name__)
 
-# Token blacklist for logout functionality
-blacklisted_tokens = set()
-
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload):
-    """Check if JWT token is blacklisted"""
-    return jwt_payload['jti'] in blacklisted_tokens
+    """Check if JWT token has been revoked by a logout"""
+    return get_token_blocklist().is_revoked(jwt_payload['jti'])
 
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
@@ -62,7 +62,7 @@ def validate_email(email):
 
 def log_auth_event(user_id, action, details=None, ip_address=None, user_agent=None):
     """Log authentication events for security monitoring"""
-    audit_log = AuditLog(
+    record_audit_event(
         user_id=user_id,
         action=action,
         resource_type='authentication',
@@ -70,10 +70,9 @@ def log_auth_event(user_id, action, details=None, ip_address=None, user_agent=No
         ip_address=ip_address,
         user_agent=user_agent
     )
-    db.session.add(audit_log)
-    db.session.commit()
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit(max_requests=5, window_minutes=60)
 def register():
     """Register a new user"""
     try:
@@ -138,6 +137,7 @@ def register():
         return jsonify({'error': 'Registration failed'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit(max_requests=10, window_minutes=15)
 def login():
     """Authenticate user and return JWT tokens"""
     try:
@@ -192,11 +192,7 @@ def login():
                 return jsonify({'error': 'Invalid MFA code'}), 401
         
         # Create JWT tokens
-        additional_claims = {
-            'roles': [role.name for role in user.roles],
-            'email': user.email,
-            'user_id': user.id
-        }
+        additional_claims = user.token_claims()
         
         access_token = create_access_token(
             identity=user.id,
@@ -245,11 +241,7 @@ def refresh():
             return jsonify({'error': 'User not found or inactive'}), 401
         
         # Create new access token
-        additional_claims = {
-            'roles': [role.name for role in user.roles],
-            'email': user.email,
-            'user_id': user.id
-        }
+        additional_claims = user.token_claims()
         
         access_token = create_access_token(
             identity=user.id,
@@ -269,10 +261,10 @@ def refresh():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """Logout user and blacklist token"""
+    """Logout user and revoke token"""
     try:
         jti = get_jwt()['jti']
-        blacklisted_tokens.add(jti)
+        get_token_blocklist().revoke(get_jwt())
         
         current_user_id = get_jwt_identity()
         
@@ -1,35 +1,20 @@
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, request, jsonify, current_app
 import os
-import hashlib
-import magic
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime
 from src.models import db, SessionFile, Session, User, AuditLog
-from src.utils.security import require_auth, require_role
+from src.utils.security import require_auth, require_role, get_current_user, rate_limit
+from src.utils.uploads import save_upload, stream_uploads, UnsupportedUpload
+from src.utils.file_delivery import send_stored_file
 from flask_jwt_extended import get_jwt_identity
 
 files_bp = Blueprint('files', __name__)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
 ALLOWED_EXTENSIONS = {'.pdf', '.ppt', '.pptx', '.mp4', '.mov'}
 
-def ensure_upload_directory():
-    """Ensure upload directory exists"""
-    upload_path = os.path.join(current_app.root_path, UPLOAD_FOLDER)
-    os.makedirs(upload_path, exist_ok=True)
-    return upload_path
-
-def get_file_hash(file_path):
-    """Calculate SHA-256 hash of file"""
-    hash_sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_sha256.update(chunk)
-    return hash_sha256.hexdigest()
-
 def validate_file(file):
     """Validate uploaded file"""
     if not file or not file.filename:
@@ -54,6 +39,8 @@ def validate_file(file):
 
 @files_bp.route('/upload', methods=['POST'])
 @require_auth
+@rate_limit(max_requests=30, window_minutes=15)
+@stream_uploads(max_size_mb=MAX_FILE_SIZE // (1024 * 1024))
 def upload_file():
     """Upload a presentation file"""
     try:
@@ -79,32 +66,24 @@ def upload_file():
         if not session:
             return jsonify({'error': 'Session not found or access denied'}), 404
         
-        # Ensure upload directory exists
-        upload_path = ensure_upload_directory()
-        
-        # Generate unique filename
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"{session_id}_{timestamp}_{filename}"
-        file_path = os.path.join(upload_path, unique_filename)
-        
-        # Save file
-        file.save(file_path)
         
-        # Calculate file hash
-        file_hash = get_file_hash(file_path)
-        
-        # Detect MIME type
-        mime_type = magic.from_file(file_path, mime=True)
-        
-        # Get file size
-        file_size = os.path.getsize(file_path)
+        # Save file to the object store under its hash, computing its size
+        # and checking its contents match its extension as it is written
+        try:
+            stored = save_upload(file)
+        except UnsupportedUpload as e:
+            return jsonify({'error': str(e)}), 400
+        file_hash = stored.sha256
+        file_path = stored.path
+        mime_type = stored.mime_type
+        file_size = stored.size
         
         # Create database record
         session_file = SessionFile(
             session_id=session_id,
             original_filename=filename,
-            stored_filename=unique_filename,
+            stored_filename=file_hash,
             file_path=file_path,
             file_size=file_size,
             file_type=mime_type,
@@ -122,7 +101,7 @@ def upload_file():
         db.session.add(session_file)
         
         # Update session current file
-        session.current_file_id = session_file.id
+        session.current_file = session_file
         session.updated_at = datetime.utcnow()
         
         # Create audit log
@@ -169,7 +148,7 @@ def download_file(file_id):
         session = Session.query.get(session_file.session_id)
         
         # Check permissions
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         can_access = (
             session.speaker_id == current_user_id or  # Speaker owns the session
             user.has_role('admin') or  # Admin can access all
@@ -194,10 +173,13 @@ def download_file(file_id):
         db.session.add(audit_log)
         db.session.commit()
         
-        return send_file(
+        return send_stored_file(
             session_file.file_path,
-            as_attachment=True,
-            download_name=session_file.original_filename
+            session_file.mime_type,
+            etag=session_file.file_hash,
+            last_modified=session_file.uploaded_at,
+            download_name=session_file.original_filename,
+            as_attachment=True
         )
         
     except Exception as e:
@@ -216,7 +198,7 @@ def view_file(file_id):
         session = Session.query.get(session_file.session_id)
         
         # Check permissions
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         can_access = (
             session.speaker_id == current_user_id or  # Speaker owns the session
             user.has_role('admin') or  # Admin can access all
@@ -242,9 +224,11 @@ def view_file(file_id):
         db.session.commit()
         
         # Return file for inline viewing
-        return send_file(
+        return send_stored_file(
             session_file.file_path,
-            as_attachment=False,
+            session_file.mime_type,
+            etag=session_file.file_hash,
+            last_modified=session_file.uploaded_at,
             download_name=session_file.original_filename
         )
         
@@ -264,7 +248,7 @@ def delete_file(file_id):
         session = Session.query.get(session_file.session_id)
         
         # Check permissions (only speaker or admin can delete)
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         can_delete = (
             session.speaker_id == current_user_id or  # Speaker owns the session
             user.has_role('admin')  # Admin can delete
@@ -273,9 +257,9 @@ def delete_file(file_id):
         if not can_delete:
             return jsonify({'error': 'Access denied'}), 403
         
-        # Remove file from disk
-        if os.path.exists(session_file.file_path):
-            os.remove(session_file.file_path)
+        # The stored object may be shared with other files; deleting the
+        # record releases its reference and gc-file-objects removes it once
+        # nothing uses it
         
         # Update session if this was the current file
         if session.current_file_id == file_id:
@@ -312,7 +296,7 @@ def get_session_files(session_id):
         
         # Check if session exists and user has permission
         session = Session.query.get_or_404(session_id)
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         
         can_access = (
             session.speaker_id == current_user_id or  # Speaker owns the session
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 from src.models import db, User, Notification, NotificationPreference, AuditLog
 from src.utils.security import require_auth, require_role
+from src.utils.pagination import paginate_query, InvalidCursor
 from flask_jwt_extended import get_jwt_identity
 import smtplib
 from email.mime.text import MIMEText
@@ -89,8 +90,6 @@ def get_notifications():
     """Get user's notifications"""
     try:
         current_user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         unread_only = request.args.get('unread_only', 'false').lower() == 'true'
         
         # Build query
@@ -100,9 +99,7 @@ def get_notifications():
             query = query.filter_by(is_read=False)
         
         # Get paginated results
-        notifications = query.order_by(Notification.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        notifications, pagination = paginate_query(query, [Notification.created_at, Notification.id])
         
         # Get unread count
         unread_count = Notification.query.filter_by(
@@ -111,7 +108,7 @@ def get_notifications():
         ).count()
         
         notifications_data = []
-        for notification in notifications.items:
+        for notification in notifications:
             notifications_data.append({
                 'id': notification.id,
                 'title': notification.title,
@@ -126,16 +123,11 @@ def get_notifications():
         return jsonify({
             'notifications': notifications_data,
             'unread_count': unread_count,
-            'pagination': {
-                'page': notifications.page,
-                'pages': notifications.pages,
-                'per_page': notifications.per_page,
-                'total': notifications.total,
-                'has_next': notifications.has_next,
-                'has_prev': notifications.has_prev
-            }
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f"Get notifications error: {str(e)}")
         return jsonify({'error': 'Failed to retrieve notifications'}), 500
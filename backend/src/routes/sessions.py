@@ -1,25 +1,40 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime, timedelta
+import base64
+import binascii
 import os
 import uuid
-import mimetypes
 
 from src.models import (
     db, Session, SessionType, SessionSpeaker, SessionFile, User, 
-    SessionQuestion, SessionQuestionResponse, SessionReview, SessionAssignment
+    SessionQuestion, SessionQuestionResponse, SessionReview, SessionAssignment,
+    ResumableUpload
 )
 from src.utils.security import (
     require_role, require_ownership_or_role, validate_file_upload, 
-    log_api_access, get_current_user, sanitize_input
+    log_api_access, get_current_user, sanitize_input, rate_limit
 )
+from src.utils.audit import record_audit_event
+from src.utils.pagination import paginate_query, InvalidCursor
+from src.utils.serialization import session_serialization_args, InvalidFieldset
+from src.utils.uploads import (
+    save_upload, incoming_directory, upload_mime_type, UnsupportedUpload, hash_file, SNIFF_SIZE, UPLOAD_CHUNK_SIZE
+)
+from src.utils.storage import object_path, store_object
+from src.utils.file_delivery import send_stored_file
+from src.utils.signed_urls import signed_file_url, verify_signed_file_url, served_disposition, DISPOSITIONS
 
 sessions_bp = Blueprint('sessions', __name__)
 
 # Allowed file extensions for presentations
 ALLOWED_EXTENSIONS = {'pdf', 'ppt', 'pptx', 'mp4', 'mov'}
 
+MAX_UPLOAD_SIZE_MB = 100
+TUS_VERSION = '1.0.0'
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and \
@@ -117,8 +132,6 @@ def get_sessions():
         # Get query parameters
         status = request.args.get('status')
         session_type_id = request.args.get('session_type_id')
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 20)), 100)
         
         # Build query based on user role
         if current_user.has_role('admin'):
@@ -150,28 +163,22 @@ def get_sessions():
         if session_type_id:
             query = query.filter(Session.session_type_id == session_type_id)
         
-        # Order by creation date (newest first)
-        query = query.order_by(Session.created_at.desc())
-        
-        # Paginate results
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Load only the requested relationships, for the whole page up front
+        includes, fields = session_serialization_args()
+        query = query.options(*Session.serialization_options(**includes))
         
-        sessions = pagination.items
+        # Paginate results, newest first
+        sessions, pagination = paginate_query(query, [Session.created_at, Session.id])
         
         return jsonify({
-            'sessions': [s.to_dict() for s in sessions],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'sessions': [s.to_dict(fields=fields, **includes) for s in sessions],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except InvalidFieldset as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching sessions: {str(e)}")
         return jsonify({'error': 'Failed to fetch sessions'}), 500
@@ -191,10 +198,14 @@ def get_session(session_id):
         if not session.can_view(current_user):
             return jsonify({'error': 'Access denied'}), 403
         
+        includes, fields = session_serialization_args(include_files=True, include_reviews=True)
+        
         return jsonify({
-            'session': session.to_dict(include_files=True, include_reviews=True)
+            'session': session.to_dict(fields=fields, **includes)
         }), 200
         
+    except InvalidFieldset as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching session {session_id}: {str(e)}")
         return jsonify({'error': 'Failed to fetch session'}), 500
@@ -328,7 +339,8 @@ def resubmit_session(session_id):
 @sessions_bp.route('/sessions/<int:session_id>/files', methods=['POST'])
 @jwt_required()
 @require_ownership_or_role('admin', 'manager')
-@validate_file_upload(allowed_extensions=ALLOWED_EXTENSIONS, max_size_mb=100)
+@rate_limit(max_requests=30, window_minutes=15)
+@validate_file_upload(allowed_extensions=ALLOWED_EXTENSIONS, max_size_mb=MAX_UPLOAD_SIZE_MB)
 @log_api_access
 def upload_session_file(session_id):
     """Upload a file for a session"""
@@ -348,31 +360,24 @@ def upload_session_file(session_id):
                 'error': f'File type not allowed. Allowed types: {", ".join(ALLOWED_EXTENSIONS)}'
             }), 400
         
-        # Create upload directory if it doesn't exist
-        upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'sessions', str(session_id))
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        file_extension = file.filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
-        file_path = os.path.join(upload_dir, unique_filename)
-        
-        # Save file
-        file.save(file_path)
-        
-        # Get file info
-        file_size = os.path.getsize(file_path)
-        mime_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        # Save file, hashing it and checking its contents match its extension
+        # on the way to disk; it is stored under its hash, once however many
+        # sessions upload it
+        try:
+            stored = save_upload(file)
+        except UnsupportedUpload as e:
+            return jsonify({'error': str(e)}), 400
         
         # Create file record
         session_file = SessionFile(
             session_id=session.id,
-            filename=unique_filename,
+            filename=stored.sha256,
             original_filename=file.filename,
-            file_path=file_path,
-            file_size=file_size,
-            mime_type=mime_type,
-            uploaded_by=current_user.id
+            file_path=stored.path,
+            file_size=stored.size,
+            mime_type=stored.mime_type,
+            uploaded_by=current_user.id,
+            file_hash=stored.sha256
         )
         
         db.session.add(session_file)
@@ -388,6 +393,242 @@ def upload_session_file(session_id):
         current_app.logger.error(f"Error uploading file for session {session_id}: {str(e)}")
         return jsonify({'error': 'Failed to upload file'}), 500
 
+# Resumable uploads, after the tus protocol: POST creates an upload of a
+# given Upload-Length, each PATCH appends the next fixed-size chunk at
+# Upload-Offset, HEAD reports how far the upload got so a client can carry
+# on after a dropped connection, and the chunk that completes the upload
+# turns it into a SessionFile.
+
+def _tus_response(body=None, status=204, **headers):
+    response = jsonify(body) if body is not None else current_app.response_class(status=status)
+    response.status_code = status
+    response.headers['Tus-Resumable'] = TUS_VERSION
+    response.headers['Cache-Control'] = 'no-store'
+    for name, value in headers.items():
+        response.headers[name.replace('_', '-')] = str(value)
+    return response
+
+def _upload_filename(metadata):
+    """The filename from a tus Upload-Metadata header"""
+    for pair in (metadata or '').split(','):
+        key, _, value = pair.strip().partition(' ')
+        if key == 'filename' and value:
+            try:
+                return base64.b64decode(value, validate=True).decode('utf-8')
+            except (binascii.Error, UnicodeDecodeError):
+                return None
+    return None
+
+def _find_upload(session_id, upload_id):
+    """The session's unexpired upload, or None"""
+    upload = ResumableUpload.query.filter_by(id=upload_id, session_id=session_id).first()
+    if upload is None or upload.expires_at < datetime.utcnow():
+        return None
+    return upload
+
+def _finish_upload(upload, uploaded_by):
+    """Move a completed upload into the object store as a SessionFile;
+    raises UnsupportedUpload if its contents don't match its filename"""
+    staging_path = upload.staging_path
+    with open(staging_path, 'rb') as staged:
+        mime_type = upload_mime_type(staged.read(SNIFF_SIZE), upload.filename)
+    # Chunks may have arrived at different workers, so the file is hashed
+    # once it is whole rather than as it is written
+    file_hash = hash_file(staging_path)
+    
+    session_file = SessionFile(
+        session_id=upload.session_id,
+        filename=file_hash,
+        original_filename=upload.filename,
+        file_path=object_path(file_hash),
+        file_size=upload.upload_length,
+        mime_type=mime_type,
+        uploaded_by=uploaded_by,
+        file_hash=file_hash
+    )
+    db.session.add(session_file)
+    db.session.delete(upload)
+    db.session.flush()
+    # Moved only once the rows are in place, as a rename within UPLOAD_FOLDER
+    store_object(staging_path, file_hash)
+    return session_file
+
+@sessions_bp.route('/sessions/<int:session_id>/uploads', methods=['POST'])
+@jwt_required()
+@require_ownership_or_role('admin', 'manager')
+@rate_limit(max_requests=30, window_minutes=15)
+@log_api_access
+def create_upload(session_id):
+    """Start a resumable upload of Upload-Length bytes"""
+    try:
+        session = Session.query.get(session_id)
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
+        
+        current_user = get_current_user()
+        if not session.can_edit(current_user):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        filename = _upload_filename(request.headers.get('Upload-Metadata'))
+        if not filename or not allowed_file(filename):
+            return jsonify({
+                'error': f'Upload-Metadata must name a file of an allowed type: {", ".join(ALLOWED_EXTENSIONS)}'
+            }), 400
+        
+        try:
+            upload_length = int(request.headers.get('Upload-Length', ''))
+        except ValueError:
+            return jsonify({'error': 'Upload-Length header required'}), 400
+        if upload_length <= 0:
+            return jsonify({'error': 'Upload-Length must be positive'}), 400
+        if upload_length > MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+            return jsonify({'error': f'File too large. Maximum size: {MAX_UPLOAD_SIZE_MB}MB'}), 413
+        
+        # Chunks are written at their offsets into a file of the final size
+        upload_id = uuid.uuid4().hex
+        staging_path = os.path.join(incoming_directory(), f'{upload_id}.upload')
+        with open(staging_path, 'wb') as staged:
+            staged.truncate(upload_length)
+        
+        upload = ResumableUpload(
+            id=upload_id,
+            session_id=session.id,
+            user_id=current_user.id,
+            filename=filename,
+            upload_length=upload_length,
+            upload_offset=0,
+            chunk_size=current_app.config['RESUMABLE_CHUNK_SIZE'],
+            staging_path=staging_path,
+            expires_at=datetime.utcnow() + timedelta(hours=current_app.config['RESUMABLE_UPLOAD_EXPIRY_HOURS'])
+        )
+        db.session.add(upload)
+        db.session.commit()
+        
+        return _tus_response(
+            {'upload': upload.to_dict()}, 201,
+            Location=url_for('sessions.upload_status', session_id=session.id, upload_id=upload.id),
+            Upload_Offset=0,
+            Upload_Chunk_Size=upload.chunk_size
+        )
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error creating upload for session {session_id}: {str(e)}")
+        return jsonify({'error': 'Failed to create upload'}), 500
+
+@sessions_bp.route('/sessions/<int:session_id>/uploads/<upload_id>', methods=['HEAD'])
+@jwt_required()
+@require_ownership_or_role('admin', 'manager')
+@log_api_access
+def upload_status(session_id, upload_id):
+    """Report how many bytes of an upload have been received"""
+    upload = _find_upload(session_id, upload_id)
+    if upload is None or upload.user_id != get_current_user().id:
+        return _tus_response(status=404)
+    return _tus_response(
+        Upload_Offset=upload.upload_offset,
+        Upload_Length=upload.upload_length,
+        Upload_Chunk_Size=upload.chunk_size
+    )
+
+@sessions_bp.route('/sessions/<int:session_id>/uploads/<upload_id>', methods=['PATCH'])
+@jwt_required()
+@require_ownership_or_role('admin', 'manager')
+@log_api_access
+def upload_chunk(session_id, upload_id):
+    """Write the next chunk of an upload at Upload-Offset"""
+    try:
+        upload = _find_upload(session_id, upload_id)
+        current_user = get_current_user()
+        if upload is None or upload.user_id != current_user.id:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        if request.mimetype != 'application/offset+octet-stream':
+            return jsonify({'error': 'Content-Type must be application/offset+octet-stream'}), 415
+        
+        offset = request.headers.get('Upload-Offset', type=int)
+        if offset != upload.upload_offset:
+            return _tus_response(
+                {'error': 'Upload-Offset does not match the bytes received'}, 409,
+                Upload_Offset=upload.upload_offset
+            )
+        
+        chunk_length = upload.next_chunk_length()
+        if request.content_length != chunk_length:
+            return jsonify({'error': f'Chunk must be exactly {chunk_length} bytes'}), 400
+        
+        with open(upload.staging_path, 'r+b') as staged:
+            staged.seek(offset)
+            received = 0
+            while received < chunk_length:
+                block = request.stream.read(min(UPLOAD_CHUNK_SIZE, chunk_length - received))
+                if not block:
+                    break
+                staged.write(block)
+                received += len(block)
+            if received != chunk_length:
+                return jsonify({'error': 'Chunk ended early'}), 400
+            # The offset below promises these bytes survive a crash
+            staged.flush()
+            os.fsync(staged.fileno())
+        
+        # Recorded only if the offset is still the one read above
+        upload.upload_offset = offset + chunk_length
+        upload.expires_at = datetime.utcnow() + timedelta(hours=current_app.config['RESUMABLE_UPLOAD_EXPIRY_HOURS'])
+        db.session.flush()
+        
+        if not upload.is_complete:
+            db.session.commit()
+            return _tus_response(Upload_Offset=upload.upload_offset)
+        
+        try:
+            session_file = _finish_upload(upload, current_user.id)
+        except UnsupportedUpload as e:
+            # Complete but unusable, so the upload is discarded
+            staging_path = upload.staging_path
+            db.session.delete(upload)
+            db.session.commit()
+            os.remove(staging_path)
+            return jsonify({'error': str(e)}), 400
+        db.session.commit()
+        
+        return _tus_response({
+            'message': 'File uploaded successfully',
+            'file': session_file.to_dict()
+        }, 201, Upload_Offset=offset + chunk_length)
+        
+    except StaleDataError:
+        db.session.rollback()
+        return _tus_response({'error': 'Another request moved this upload on'}, 409)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error writing chunk of upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'Failed to write chunk'}), 500
+
+@sessions_bp.route('/sessions/<int:session_id>/uploads/<upload_id>', methods=['DELETE'])
+@jwt_required()
+@require_ownership_or_role('admin', 'manager')
+@log_api_access
+def cancel_upload(session_id, upload_id):
+    """Abandon an upload and discard its bytes"""
+    try:
+        upload = _find_upload(session_id, upload_id)
+        if upload is None or upload.user_id != get_current_user().id:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        staging_path = upload.staging_path
+        db.session.delete(upload)
+        db.session.commit()
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+        
+        return _tus_response()
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error cancelling upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'Failed to cancel upload'}), 500
+
 @sessions_bp.route('/sessions/<int:session_id>/files/<int:file_id>/download', methods=['GET'])
 @jwt_required()
 @require_ownership_or_role('admin', 'manager')
@@ -413,11 +654,13 @@ def download_session_file(session_id, file_id):
         if not os.path.exists(session_file.file_path):
             return jsonify({'error': 'File not found on disk'}), 404
         
-        return send_file(
+        return send_stored_file(
             session_file.file_path,
-            as_attachment=True,
+            session_file.mime_type,
+            etag=session_file.file_hash,
+            last_modified=session_file.uploaded_at,
             download_name=session_file.original_filename,
-            mimetype=session_file.mime_type
+            as_attachment=True
         )
         
     except Exception as e:
@@ -449,15 +692,104 @@ def view_session_file(session_id, file_id):
         if not os.path.exists(session_file.file_path):
             return jsonify({'error': 'File not found on disk'}), 404
         
-        return send_file(
+        return send_stored_file(
             session_file.file_path,
-            mimetype=session_file.mime_type
+            session_file.mime_type,
+            etag=session_file.file_hash,
+            last_modified=session_file.uploaded_at,
+            download_name=session_file.original_filename
         )
         
     except Exception as e:
         current_app.logger.error(f"Error viewing file {file_id}: {str(e)}")
         return jsonify({'error': 'Failed to view file'}), 500
 
+@sessions_bp.route('/sessions/<int:session_id>/files/<int:file_id>/signed-url', methods=['GET'])
+@jwt_required()
+@require_ownership_or_role('admin', 'manager')
+@log_api_access
+def sign_session_file_url(session_id, file_id):
+    """Issue a short-lived signed URL for a session file's current version"""
+    try:
+        session = Session.query.get(session_id)
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
+        
+        session_file = SessionFile.query.filter_by(
+            id=file_id, session_id=session_id
+        ).first()
+        if not session_file:
+            return jsonify({'error': 'File not found'}), 404
+        
+        current_user = get_current_user()
+        if not session.can_view(current_user):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        disposition = request.args.get('disposition', 'inline')
+        if disposition not in DISPOSITIONS:
+            return jsonify({'error': f'disposition must be one of: {", ".join(DISPOSITIONS)}'}), 400
+        
+        # Only files in the object store can be found from their hash alone
+        if not session_file.file_hash or session_file.file_path != object_path(session_file.file_hash) \
+                or not os.path.exists(session_file.file_path):
+            return jsonify({'error': 'File not found on disk'}), 404
+        
+        url, expires = signed_file_url(session_file, disposition)
+        expires_at = datetime.utcfromtimestamp(expires).isoformat()
+        # The URL works for anyone until it expires, so record who it was issued to
+        record_audit_event(
+            user_id=current_user.id,
+            action='signed_url_issued',
+            resource_type='session_file',
+            resource_id=session_file.id,
+            details={'session_id': session_id, 'file_hash': session_file.file_hash, 'expires_at': expires_at},
+            ip_address=request.remote_addr,
+            user_agent=request.headers.get('User-Agent')
+        )
+        return jsonify({
+            'url': url,
+            'expires_at': expires_at
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error signing URL for file {file_id}: {str(e)}")
+        return jsonify({'error': 'Failed to sign file URL'}), 500
+
+@sessions_bp.route('/files/signed/<int:file_id>/<sha256>', methods=['GET'])
+def signed_session_file(file_id, sha256):
+    """Serve a file through a signed URL, trusting the signature alone.
+    
+    No token, database or audit work is done here: the URL was issued after
+    the access check, names the exact bytes to send and expires shortly, so
+    responses may be cached by proxies until then. Served from the API's
+    origin, the file is sandboxed and only PDFs and videos are shown inline.
+    """
+    try:
+        granted = verify_signed_file_url(file_id, sha256, request.args)
+        if granted is None:
+            return jsonify({'error': 'Invalid or expired link'}), 403
+        mime_type, filename, disposition, remaining = granted
+        
+        file_path = object_path(sha256)
+        if not os.path.exists(file_path):
+            return jsonify({'error': 'File not found on disk'}), 404
+        
+        response = send_stored_file(
+            file_path,
+            mime_type,
+            etag=sha256,
+            download_name=filename,
+            as_attachment=served_disposition(mime_type, disposition) == 'attachment',
+            max_age=remaining
+        )
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        response.headers['Content-Security-Policy'] = 'sandbox'
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error serving signed file {file_id}: {str(e)}")
+        return jsonify({'error': 'Failed to serve file'}), 500
+
 @sessions_bp.route('/sessions/<int:session_id>/questions', methods=['POST'])
 @jwt_required()
 @require_ownership_or_role('admin', 'manager')
@@ -0,0 +1,378 @@
+import atexit
+import os
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from fnmatch import fnmatchcase
+from functools import lru_cache
+
+from flask import current_app, request
+
+from src.models import db, AuditLog
+
+# Queued by close() to tell the writer thread to finish
+_STOP = object()
+
+
+class AuditRule(namedtuple('AuditRule', 'mode every')):
+    """How log_api_access records an endpoint: 'always', 'sample' one request
+    in every, or 'aggregate' into per-minute api_access_summary rows"""
+
+
+ALWAYS = AuditRule('always', 1)
+AGGREGATE = AuditRule('aggregate', 1)
+
+
+def sample(every):
+    """Record one request in every, chosen at random"""
+    return AuditRule('sample', every)
+
+
+# (endpoint glob, methods or '*', rule); the first match wins. An app may set
+# AUDIT_POLICY to a sequence of the same shape before init_audit_writer, which
+# turns it into tuples so audit_rule can cache its lookups. Only successful api_access
+# entries are subject to this: denials, errors and authentication events are
+# always recorded, as are 401 and 403 responses.
+DEFAULT_AUDIT_POLICY = (
+    ('sessions.download_session_file', '*', ALWAYS),
+    ('sessions.view_session_file', '*', ALWAYS),
+    ('sessions.sign_session_file_url', '*', ALWAYS),
+    ('admin.*', '*', ALWAYS),
+    ('sessions.get_session', ('GET',), sample(10)),
+    ('sessions.get_session_questions', ('GET',), sample(10)),
+    ('*', ('GET', 'HEAD'), AGGREGATE),
+    ('*', '*', ALWAYS),
+)
+
+ALWAYS_RECORDED_STATUSES = (401, 403)
+
+
+class AuditWriter:
+    """Queue audit entries in memory and insert them in batches.
+
+    A background thread flushes whenever batch_size entries are waiting or
+    flush_interval_ms has passed since the first of them arrived, in one
+    executemany INSERT on its own connection, so recording an entry never
+    touches the request's session. The queue holds at most max_queue
+    entries; when it is full the overflow policy either drops the entry
+    straight away ('drop') or waits up to block_timeout_ms for room first
+    ('block'). Entries still queued at interpreter exit are flushed.
+    """
+
+    def __init__(self, app, batch_size=200, flush_interval_ms=500, max_queue=10000,
+                 overflow='drop', block_timeout_ms=50):
+        if overflow not in ('drop', 'block'):
+            raise ValueError(f'Unknown audit overflow policy: {overflow}')
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.block_timeout = block_timeout_ms / 1000
+        self.dropped = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def record(self, entry):
+        """Queue a row for audit_log; returns False if it was dropped"""
+        entry.setdefault('timestamp', datetime.utcnow())
+        self._ensure_started()
+        try:
+            if self.overflow == 'block':
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            # Log the first drop and then every thousandth, not every one
+            if dropped == 1 or dropped % 1000 == 0:
+                self.app.logger.warning(f"Audit queue full, {dropped} entries dropped so far")
+            return False
+
+    def close(self, timeout=5):
+        """Stop the writer thread once everything queued has been written"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            # Queued behind every pending entry, so those are written first
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _ensure_started(self):
+        # Threads do not survive a fork, so a forked worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(AuditLog.__table__.insert(), batch)
+            self.written += len(batch)
+        except Exception as e:
+            with self._lock:
+                self.dropped += len(batch)
+            self.app.logger.error(f"Failed to write {len(batch)} audit entries: {str(e)}")
+
+
+class ApiAccessAggregator:
+    """Per-minute request counts for aggregated endpoints.
+
+    Counts are kept per endpoint, method and status code and handed back as
+    api_access_summary rows once their minute is over. With an app, a
+    background thread also writes a finished minute out shortly after it
+    ends, so counts for an endpoint that goes quiet are not held until the
+    next aggregated request arrives.
+    """
+
+    def __init__(self, app=None, flush_delay=5):
+        self.app = app
+        self.flush_delay = flush_delay
+        self._minute = None
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._stop = None
+        self._thread = None
+
+    def add(self, endpoint, method, status_code, response_time_ms):
+        """Count a request; returns the rows of a minute that just ended"""
+        minute = datetime.utcnow().replace(second=0, microsecond=0)
+        self._ensure_started()
+        with self._lock:
+            finished = self._take() if self._minute not in (None, minute) else []
+            self._minute = minute
+            count, total, slowest = self._counts.get((endpoint, method, status_code), (0, 0, 0))
+            self._counts[(endpoint, method, status_code)] = (
+                count + 1, total + response_time_ms, max(slowest, response_time_ms)
+            )
+        return finished
+
+    def drain(self):
+        """Rows for everything counted so far"""
+        with self._lock:
+            return self._take()
+
+    def take_finished(self):
+        """Rows for the counted minute if it has ended"""
+        minute = datetime.utcnow().replace(second=0, microsecond=0)
+        with self._lock:
+            if self._minute in (None, minute):
+                return []
+            return self._take()
+
+    def close(self, timeout=5):
+        """Stop the flushing thread"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _ensure_started(self):
+        # Threads do not survive a fork, so a forked worker starts its own
+        if self.app is None or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='audit-aggregator', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            # Wake a little after each minute boundary
+            delay = 60 - time.time() % 60 + self.flush_delay
+            if self._stop.wait(delay):
+                return
+            rows = self.take_finished()
+            if rows:
+                try:
+                    _write_rows(self.app, rows)
+                except Exception as e:
+                    self.app.logger.error(f"Failed to write {len(rows)} aggregated audit rows: {str(e)}")
+
+    def _take(self):
+        rows = [
+            _audit_row('api_access_summary', 'endpoint', details={
+                'endpoint': endpoint,
+                'method': method,
+                'status_code': status_code,
+                'minute': self._minute.isoformat(),
+                'count': count,
+                'total_response_time_ms': round(total, 2),
+                'max_response_time_ms': slowest
+            })
+            for (endpoint, method, status_code), (count, total, slowest) in self._counts.items()
+        ]
+        for row in rows:
+            row['timestamp'] = self._minute
+        self._counts = {}
+        return rows
+
+
+def audit_policy(policy):
+    """policy as nested tuples, so it can key audit_rule's cache"""
+    return tuple(
+        (pattern, methods if methods == '*' else tuple(methods), AuditRule(*rule))
+        for pattern, methods, rule in policy
+    )
+
+
+@lru_cache(maxsize=1024)
+def audit_rule(policy, endpoint, method):
+    """The first rule in policy matching endpoint and method"""
+    for pattern, methods, rule in policy:
+        if fnmatchcase(endpoint or '', pattern) and (methods == '*' or method in methods):
+            return rule
+    return ALWAYS
+
+
+def _audit_row(action, resource_type, user_id=None, resource_id=None, details=None,
+               ip_address=None, user_agent=None):
+    """An audit_log row with AuditLog's defaults"""
+    return {
+        'action': action,
+        'resource_type': resource_type,
+        'user_id': user_id,
+        'resource_id': resource_id,
+        'details': details or {},
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+    }
+
+
+def record_audit_event(action, resource_type, **fields):
+    """Record an audit entry outside the request's transaction.
+
+    Takes the same arguments as AuditLog. With AUDIT_ASYNC the entry goes to
+    the app's AuditWriter; otherwise it is inserted straight away on its own
+    connection. Entries that belong with a data change should instead be
+    added to the session as AuditLog objects and committed with it.
+    """
+    if not current_app.config.get('AUDIT_ENABLED', True):
+        return
+    _write_rows(current_app._get_current_object(), [_audit_row(action, resource_type, **fields)])
+
+
+def record_api_access(user_id, status_code, response_time_ms):
+    """Record a successful API request as AUDIT_POLICY says for its endpoint"""
+    if not current_app.config.get('AUDIT_ENABLED', True):
+        return
+    endpoint, method = request.endpoint, request.method
+    rule = ALWAYS
+    if status_code not in ALWAYS_RECORDED_STATUSES:
+        rule = audit_rule(current_app.config.get('AUDIT_POLICY', DEFAULT_AUDIT_POLICY), endpoint, method)
+
+    if rule.mode == 'aggregate':
+        finished = current_app.extensions['audit_aggregator'].add(endpoint, method, status_code, response_time_ms)
+        if finished:
+            _write_rows(current_app._get_current_object(), finished)
+        return
+    if rule.mode == 'sample' and random.random() * rule.every >= 1:
+        return
+
+    details = {
+        'endpoint': endpoint,
+        'method': method,
+        'status_code': status_code,
+        'response_time_ms': response_time_ms
+    }
+    if rule.mode == 'sample':
+        details['sample_rate'] = rule.every
+    record_audit_event(
+        user_id=user_id,
+        action='api_access',
+        resource_type='endpoint',
+        details=details,
+        ip_address=request.remote_addr,
+        user_agent=request.headers.get('User-Agent')
+    )
+
+
+def _write_rows(app, rows):
+    """Queue rows on the app's AuditWriter, or insert them now without one"""
+    writer = app.extensions.get('audit_writer')
+    if writer is not None:
+        for row in rows:
+            writer.record(row)
+        return
+    now = datetime.utcnow()
+    for row in rows:
+        row.setdefault('timestamp', now)
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(AuditLog.__table__.insert(), rows)
+
+
+def _shutdown(app):
+    """Write the last aggregated counts and flush the writer at exit"""
+    aggregator = app.extensions['audit_aggregator']
+    aggregator.close()
+    rows = aggregator.drain()
+    if rows:
+        _write_rows(app, rows)
+    writer = app.extensions.get('audit_writer')
+    if writer is not None:
+        writer.close()
+
+
+def init_audit_writer(app):
+    """Set up the app's request aggregator, and its AuditWriter when
+    AUDIT_ASYNC is on"""
+    app.config['AUDIT_POLICY'] = audit_policy(app.config.get('AUDIT_POLICY', DEFAULT_AUDIT_POLICY))
+    if 'audit_aggregator' not in app.extensions:
+        app.extensions['audit_aggregator'] = ApiAccessAggregator(app)
+        atexit.register(_shutdown, app)
+    if not app.config.get('AUDIT_ASYNC'):
+        return None
+    writer = AuditWriter(
+        app,
+        batch_size=app.config['AUDIT_BATCH_SIZE'],
+        flush_interval_ms=app.config['AUDIT_FLUSH_INTERVAL_MS'],
+        max_queue=app.config['AUDIT_QUEUE_SIZE'],
+        overflow=app.config['AUDIT_OVERFLOW'],
+        block_timeout_ms=app.config['AUDIT_BLOCK_TIMEOUT_MS'],
+    )
+    app.extensions['audit_writer'] = writer
+    return writer
@@ -0,0 +1,289 @@
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+
+from sqlalchemy import Column, MetaData, Table, func, select, text, union_all
+
+from src.models import db, AuditLog
+
+# audit_log is split by calendar month (UTC). On PostgreSQL it is a range
+# partitioned table with one audit_log_pYYYYMM partition per month plus a
+# default partition; on SQLite audit_log holds the current month and
+# earlier months are rotated out into audit_log_pYYYYMM tables. Partitions
+# past retention are exported to audit_log_YYYY-MM.ndjson.gz and dropped.
+PARTITION_PREFIX = 'audit_log_p'
+DEFAULT_PARTITION = 'audit_log_default'
+
+_PARTITION_NAME = re.compile(r'^audit_log_p(\d{4})(\d{2})$')
+_ARCHIVE_NAME = re.compile(r'^audit_log_(\d{4})-(\d{2})\.ndjson\.gz$')
+
+
+class InvalidAuditFilter(ValueError):
+    """Raised when an audit query argument cannot be parsed"""
+
+
+def month_start(value):
+    """First day of value's month"""
+    return date(value.year, value.month, 1)
+
+
+def next_month(month):
+    """First day of the month after month"""
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{PARTITION_PREFIX}{month:%Y%m}'
+
+
+def archive_name(month):
+    return f'audit_log_{month:%Y-%m}.ndjson.gz'
+
+
+def _month_from(pattern, name):
+    match = pattern.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _table(name):
+    """audit_log's columns under another table name"""
+    return Table(name, MetaData(), *[
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+        for c in AuditLog.__table__.columns
+    ])
+
+
+def _bounds(month):
+    return datetime.combine(month, datetime.min.time()), datetime.combine(next_month(month), datetime.min.time())
+
+
+def partition_months(connection):
+    """Months with a partition (or rotated table), oldest first"""
+    if _is_postgres():
+        names = connection.execute(text('''
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            WHERE parent.relname = 'audit_log'
+        ''')).scalars()
+    else:
+        names = connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'audit_log_p%'"
+        )).scalars()
+    return sorted(month for month in (_month_from(_PARTITION_NAME, name) for name in names) if month)
+
+
+def _create_postgres_partition(connection, month):
+    """Attach a partition for month, moving in any of its rows that landed in
+    the default partition"""
+    name = partition_name(month)
+    start, end = _bounds(month)
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    connection.execute(text(f'CREATE TABLE {name} (LIKE audit_log INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    connection.execute(text(
+        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} '
+        f'WHERE timestamp >= :start AND timestamp < :end RETURNING *) '
+        f'INSERT INTO {name} SELECT * FROM moved'
+    ), {'start': start, 'end': end})
+    connection.execute(text(f'ALTER TABLE audit_log ATTACH PARTITION {name} FOR VALUES {bounds}'))
+
+
+def _rotate_sqlite_month(connection, month):
+    """Move month's rows out of audit_log into their own table"""
+    name = partition_name(month)
+    start, end = _bounds(month)
+    live = AuditLog.__table__
+    connection.execute(text(f'CREATE TABLE IF NOT EXISTS {name} AS SELECT * FROM audit_log WHERE 0'))
+    create_partition_indexes(connection, name)
+    in_month = (live.c.timestamp >= start) & (live.c.timestamp < end)
+    connection.execute(_table(name).insert().from_select(
+        [c.name for c in live.columns], select(*live.columns).where(in_month)
+    ))
+    connection.execute(live.delete().where(in_month))
+
+
+def create_partition_indexes(connection, name):
+    """Give a rotated SQLite table each of audit_log's indexes"""
+    for index in AuditLog.__table__.indexes:
+        columns = ', '.join(c.name for c in index.columns)
+        connection.execute(text(
+            f'CREATE INDEX IF NOT EXISTS {index.name.replace("audit_log", name, 1)} ON {name} ({columns})'
+        ))
+
+
+def ensure_partitions(months_ahead=3):
+    """Bring the partitions up to date; returns the names created.
+
+    PostgreSQL gets a partition for the current month and the next
+    months_ahead; on SQLite every completed month still in audit_log is
+    rotated into its own table.
+    """
+    current = month_start(datetime.utcnow())
+    created = []
+    with db.engine.begin() as connection:
+        existing = set(partition_months(connection))
+        if _is_postgres():
+            month = current
+            for _ in range(months_ahead + 1):
+                if month not in existing:
+                    _create_postgres_partition(connection, month)
+                    created.append(partition_name(month))
+                month = next_month(month)
+        else:
+            live = AuditLog.__table__
+            # Each pass empties the oldest finished month, skipping months
+            # without entries
+            while True:
+                oldest = connection.execute(
+                    select(func.min(live.c.timestamp)).where(live.c.timestamp < _bounds(current)[0])
+                ).scalar()
+                if oldest is None:
+                    break
+                _rotate_sqlite_month(connection, month_start(oldest))
+                created.append(partition_name(month_start(oldest)))
+    return created
+
+
+def audit_entry(row):
+    """An audit entry as AuditLog.to_dict() shapes it"""
+    entry = dict(row._mapping)
+    timestamp = entry['timestamp']
+    if isinstance(timestamp, datetime):
+        entry['timestamp'] = timestamp.isoformat()
+    return entry
+
+
+def archive_partition(connection, month, archive_dir):
+    """Export month's partition to gzipped NDJSON; returns (path, rows)"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, archive_name(month))
+    partition = _table(partition_name(month))
+    rows = connection.execution_options(yield_per=1000).execute(
+        select(partition).order_by(partition.c.timestamp, partition.c.id)
+    )
+
+    written = 0
+    partial = f'{path}.partial'
+    with gzip.open(partial, 'wt', encoding='utf-8') as archive:
+        for row in rows:
+            archive.write(json.dumps(audit_entry(row), separators=(',', ':')) + '\n')
+            written += 1
+    if os.path.exists(path):
+        # Entries for a month archived before: add them as another gzip
+        # member, which readers see as a continuation of the same file
+        with open(partial, 'rb') as extra, open(path, 'ab') as archive:
+            archive.write(extra.read())
+        os.remove(partial)
+    else:
+        os.replace(partial, path)
+    return path, written
+
+
+def drop_partition(connection, month):
+    name = partition_name(month)
+    if _is_postgres():
+        connection.execute(text(f'ALTER TABLE audit_log DETACH PARTITION {name}'))
+    connection.execute(text(f'DROP TABLE {name}'))
+
+
+def expire_partitions(older_than_days, archive_dir, dry_run=False):
+    """Archive and drop every month that ended more than older_than_days ago.
+
+    Yields (month, rows archived, archive path) per month; a partition is
+    only dropped once its archive holds every one of its rows.
+    """
+    if not dry_run:
+        ensure_partitions()
+    cutoff = datetime.utcnow().date().toordinal() - older_than_days
+    with db.engine.connect() as connection:
+        expired = [month for month in partition_months(connection) if next_month(month).toordinal() <= cutoff]
+
+    for month in expired:
+        if dry_run:
+            yield month, None, None
+            continue
+        with db.engine.begin() as connection:
+            partition = _table(partition_name(month))
+            expected = connection.execute(select(func.count()).select_from(partition)).scalar()
+            path, written = archive_partition(connection, month, archive_dir)
+            if written != expected:
+                raise RuntimeError(f'Archived {written} of {expected} rows from {partition_name(month)}')
+            drop_partition(connection, month)
+        yield month, written, path
+
+
+def archived_months(archive_dir):
+    """Months with an archive file, oldest first"""
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(month for month in (_month_from(_ARCHIVE_NAME, name) for name in os.listdir(archive_dir)) if month)
+
+
+def _matches(entry, start, end, filters):
+    timestamp = entry['timestamp']
+    if start is not None and timestamp < start.isoformat():
+        return False
+    if end is not None and timestamp >= end.isoformat():
+        return False
+    return all(entry.get(key) == value for key, value in filters.items())
+
+
+def _live_tables(connection):
+    """Tables holding live entries: the partitioned audit_log on PostgreSQL,
+    audit_log and its rotated months on SQLite"""
+    if _is_postgres():
+        return [AuditLog.__table__]
+    return [_table(partition_name(month)) for month in partition_months(connection)] + [AuditLog.__table__]
+
+
+def _filtered(source, start, end, filters):
+    query = select(source)
+    if start is not None:
+        query = query.where(source.c.timestamp >= start)
+    if end is not None:
+        query = query.where(source.c.timestamp < end)
+    for key, value in filters.items():
+        query = query.where(source.c[key] == value)
+    return query
+
+
+def audit_entries(archive_dir, start=None, end=None, **filters):
+    """Audit entries from start up to end, oldest first, across archives and
+    the live partitions.
+
+    filters are column=value equality tests, e.g. user_id=3. Archived months
+    are always older than the live partitions, so reading the archives
+    first keeps the whole sequence in timestamp order.
+    """
+    for month in archived_months(archive_dir):
+        if (end is not None and month >= end.date()) or (start is not None and next_month(month) <= start.date()):
+            continue
+        with gzip.open(os.path.join(archive_dir, archive_name(month)), 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                entry = json.loads(line)
+                if _matches(entry, start, end, filters):
+                    yield entry
+
+    with db.engine.connect() as connection:
+        for source in _live_tables(connection):
+            query = _filtered(source, start, end, filters).order_by(source.c.timestamp, source.c.id)
+            for row in connection.execution_options(yield_per=1000).execute(query):
+                yield audit_entry(row)
+
+
+def audit_query(start=None, end=None, **filters):
+    """ORM query over the live audit entries from start up to end, for
+    paginate_query; returns the query and its columns.
+
+    Filters are pushed into each table of the union so every one can use
+    its own indexes.
+    """
+    selects = [_filtered(source, start, end, filters) for source in _live_tables(db.session.connection())]
+    entries = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery('audit_entries')
+    return db.session.query(entries), entries.c
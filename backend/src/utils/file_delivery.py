@@ -0,0 +1,181 @@
+import os
+import uuid
+from urllib.parse import quote
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+from werkzeug.utils import send_file
+
+from src.utils.uploads import served_mime_type
+
+# How FILE_DELIVERY has the bytes sent: by the worker, or by the front proxy
+# from the header it is given
+FILE_DELIVERY_MODES = ('send_file', 'x-accel-redirect', 'x-sendfile')
+
+# Range requests with more byte ranges than this (after merging overlaps)
+# are answered with the whole file, as RFC 9110 allows
+MAX_BYTE_RANGES = 32
+# Ranged bodies are read from disk in blocks of this size
+RANGE_CHUNK_SIZE = 256 * 1024
+
+
+def _byte_ranges(ranges, length):
+    """A Range header's ranges as sorted (start, stop) offsets into a file
+    of length bytes, unsatisfiable ones dropped and overlaps merged"""
+    spans = []
+    for start, stop in ranges:
+        if stop is None:
+            # "bytes=N-" runs to the end; "bytes=-N" is the last N bytes
+            start, stop = (max(length + start, 0), length) if start < 0 else (start, length)
+        stop = min(stop, length)
+        if start < stop:
+            spans.append((start, stop))
+
+    merged = []
+    for start, stop in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def _read_spans(path, spans, separators=None, closing=b''):
+    """Yield the bytes of each span of path, each preceded by its separator"""
+    with open(path, 'rb') as f:
+        for index, (start, stop) in enumerate(spans):
+            if separators:
+                yield separators[index]
+            f.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                block = f.read(min(RANGE_CHUNK_SIZE, remaining))
+                if not block:
+                    return
+                remaining -= len(block)
+                yield block
+    if closing:
+        yield closing
+
+
+def _replace_body(response, body):
+    if hasattr(response.response, 'close'):
+        response.response.close()
+    response.response = body
+
+
+def _accel_redirect_path(path):
+    """The internal nginx location serving path, or None for a file outside
+    UPLOAD_FOLDER"""
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(current_app.config['UPLOAD_FOLDER']))
+    if relative.startswith(os.pardir):
+        return None
+    prefix = current_app.config['FILE_DELIVERY_PREFIX'].rstrip('/')
+    return f"{prefix}/{quote(relative.replace(os.sep, '/'))}"
+
+
+def _partial_response(response, path, spans, length, mime_type):
+    """Turn a full send_file response into a 206 for spans"""
+    _replace_body(response, [])
+    response.status_code = 206
+    response.direct_passthrough = True
+    if len(spans) == 1:
+        start, stop = spans[0]
+        response.response = _read_spans(path, spans)
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{length}'
+        response.content_length = stop - start
+        return response
+
+    boundary = uuid.uuid4().hex
+    separators = [
+        (f'\r\n--{boundary}\r\nContent-Type: {mime_type}\r\n'
+         f'Content-Range: bytes {start}-{stop - 1}/{length}\r\n\r\n').encode('latin-1')
+        for start, stop in spans
+    ]
+    closing = f'\r\n--{boundary}--\r\n'.encode('latin-1')
+    response.response = _read_spans(path, spans, separators, closing)
+    response.headers['Content-Type'] = f'multipart/byteranges; boundary={boundary}'
+    response.content_length = (
+        sum(len(s) for s in separators) + sum(stop - start for start, stop in spans) + len(closing)
+    )
+    return response
+
+
+def send_stored_file(path, mime_type, etag=None, last_modified=None, download_name=None, as_attachment=False,
+                     max_age=None):
+    """send_file for a stored file, with caching and ranges driven by its
+    metadata.
+
+    etag (the file's SHA-256) is sent as a strong ETag and last_modified as
+    Last-Modified; If-None-Match and If-Modified-Since are answered with 304
+    before any Range is considered. Single and multiple byte ranges get a
+    206, the latter as multipart/byteranges; an If-Range that no longer
+    matches gets the whole file, and a Range nothing of the file satisfies
+    gets a 416. Responses are private to the requesting user and revalidated
+    on every use, since access is checked per request, unless max_age
+    seconds are given: URLs that carry their own authorization may be
+    cached by any cache for that long.
+
+    A mime_type no upload may be stored as today is sent as
+    application/octet-stream, as an attachment.
+
+    Under the x-accel-redirect and x-sendfile FILE_DELIVERY modes the body
+    and any range are left to the front proxy; files it cannot reach are
+    still sent by the worker.
+    """
+    mode = current_app.config['FILE_DELIVERY']
+    accel_path = _accel_redirect_path(path) if mode == 'x-accel-redirect' else None
+    offloaded = mode == 'x-sendfile' or accel_path is not None
+    if served_mime_type(mime_type) != mime_type:
+        mime_type, as_attachment = served_mime_type(mime_type), True
+
+    length = os.path.getsize(path)
+    response = send_file(
+        os.path.abspath(path),
+        request.environ,
+        mimetype=mime_type,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=False,
+        etag=etag or True,
+        last_modified=last_modified,
+        max_age=current_app.get_send_file_max_age if max_age is None else max_age,
+        use_x_sendfile=offloaded,
+        response_class=current_app.response_class,
+        _root_path=current_app.root_path
+    )
+    if accel_path is not None:
+        del response.headers['X-Sendfile']
+        response.headers['X-Accel-Redirect'] = accel_path
+    if max_age is None:
+        response.cache_control.private = True
+    response.headers['Accept-Ranges'] = 'bytes'
+    etag_header = response.headers.get('ETag')
+    last_modified_header = response.headers.get('Last-Modified')
+
+    if not is_resource_modified(request.environ, etag=etag_header, last_modified=last_modified_header):
+        _replace_body(response, [])
+        for header in ('Content-Length', 'X-Sendfile', 'X-Accel-Redirect'):
+            response.headers.pop(header, None)
+        response.status_code = 304
+        return response
+
+    byte_range = request.range
+    if offloaded or byte_range is None or byte_range.units != 'bytes' or length == 0:
+        return response
+    if 'If-Range' in request.headers and is_resource_modified(
+        request.environ, etag=etag_header, last_modified=last_modified_header, ignore_if_range=False
+    ):
+        return response
+
+    spans = _byte_ranges(byte_range.ranges, length)
+    if not spans:
+        _replace_body(response, [])
+        response.status_code = 416
+        response.headers['Content-Range'] = f'bytes */{length}'
+        response.content_length = 0
+        return response
+    if len(spans) > MAX_BYTE_RANGES:
+        current_app.logger.info(f"Serving whole file for a request of {len(spans)} ranges")
+        return response
+    return _partial_response(response, path, spans, length, mime_type)
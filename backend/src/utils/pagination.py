@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, false, or_
+
+from src.models import db
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(values):
+    """Encode sort key values into an opaque cursor string"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_columns):
+    """Decode a cursor back into sort key values typed to match sort_columns"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor('Malformed cursor')
+
+    if not isinstance(payload, list) or len(payload) != len(sort_columns):
+        raise InvalidCursor('Cursor does not match this listing')
+
+    values = []
+    for column, value in zip(sort_columns, payload):
+        if value is not None and column.type.python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise InvalidCursor('Malformed cursor')
+        values.append(value)
+    return values
+
+
+def _nullable(column):
+    return getattr(column, 'nullable', True)
+
+
+def _descending(column):
+    """DESC with NULLs last; NOT NULL columns sort plainly so a b-tree index
+    can be read backwards"""
+    return column.desc().nullslast() if _nullable(column) else column.desc()
+
+
+def _after(sort_columns, values):
+    """Filter for rows that sort after values under DESC NULLS LAST ordering"""
+    clauses = []
+    for i, (column, value) in enumerate(zip(sort_columns, values)):
+        # Earlier keys equal, this key strictly later
+        equal = [c.is_(None) if v is None else c == v
+                 for c, v in zip(sort_columns[:i], values[:i])]
+        if value is None or value is False:
+            # Nothing but NULL sorts after these within this key
+            later = column.is_(None) if value is False else None
+        elif value is True:
+            later = or_(column == False, column.is_(None))
+        elif _nullable(column):
+            later = or_(column < value, column.is_(None))
+        else:
+            later = column < value
+        if later is not None:
+            clauses.append(and_(*equal, later))
+    return or_(*clauses) if clauses else false()
+
+
+def _estimate_count(query):
+    """Planner row estimate on PostgreSQL; exact count elsewhere"""
+    if db.engine.dialect.name != 'postgresql':
+        return query.count()
+
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    result = db.session.connection().exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+    ).scalar()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return int(result[0]['Plan']['Plan Rows'])
+
+
+def paginate_query(query, sort_columns):
+    """Paginate a query from the request's page/per_page or cursor arguments.
+
+    Rows are ordered by sort_columns descending with NULLs last; the last
+    column must be unique (normally the primary key) so the order is total.
+    Passing ``cursor`` (empty for the first page) switches from OFFSET to
+    keyset pagination. ``count`` selects how the total is computed: ``exact``
+    (the default for page-based requests), ``estimate`` or ``none`` (the
+    default for cursor requests).
+
+    Returns the page's items and a pagination dict for the response.
+    """
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+    cursor = request.args.get('cursor')
+    count_mode = request.args.get('count', 'exact' if cursor is None else 'none')
+    if count_mode not in COUNT_MODES:
+        count_mode = 'exact'
+
+    base_query = query.order_by(None)
+    query = query.order_by(*[_descending(column) for column in sort_columns])
+
+    if cursor:
+        query = query.filter(_after(sort_columns, decode_cursor(cursor, sort_columns)))
+    elif cursor is None:
+        query = query.offset((page - 1) * per_page)
+
+    # Fetch one extra row to learn whether another page follows
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    has_next = len(rows) > per_page
+
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in sort_columns])
+
+    if count_mode == 'exact':
+        total = base_query.count()
+    elif count_mode == 'estimate':
+        total = _estimate_count(base_query)
+    else:
+        total = None
+
+    return items, {
+        'page': page if cursor is None else None,
+        'per_page': per_page,
+        'total': total,
+        'total_is_estimate': count_mode == 'estimate',
+        'pages': math.ceil(total / per_page) if total is not None else None,
+        'has_next': has_next,
+        'has_prev': page > 1 if cursor is None else bool(cursor),
+        'next_cursor': next_cursor
+    }
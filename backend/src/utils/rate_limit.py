@@ -0,0 +1,198 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models import db, RateLimitCounter
+
+
+class RateLimiter(ABC):
+    """Sliding-window counter rate limiter over a shared store.
+
+    Each client has a counter per fixed window. A hit increments the current
+    window and weights the previous window by how much of it still overlaps
+    the sliding window, so a check costs one upsert and one read whatever the
+    traffic. Counters outlive their window by one window, after which the
+    store evicts them.
+    """
+
+    def __init__(self, prune_seconds=60):
+        self.prune_seconds = prune_seconds
+        self._pruned_at = time.monotonic()
+
+    def hit(self, key, limit, window):
+        """Count a request for key against limit per window seconds.
+
+        Returns (allowed, remaining, seconds until the current window ends).
+        """
+        now = time.time()
+        start = int(now // window * window)
+        current, previous = self._increment(key, start, window, start + 2 * window)
+
+        overlap = 1 - (now - start) / window
+        used = previous * overlap + current
+        reset = max(1, math.ceil(start + window - now))
+
+        if time.monotonic() - self._pruned_at > self.prune_seconds:
+            self.prune()
+
+        return used <= limit, max(0, math.floor(limit - used)), reset
+
+    def prune(self):
+        """Evict counters for windows no longer read"""
+        self._pruned_at = time.monotonic()
+        return self._prune(int(time.time()))
+
+    @abstractmethod
+    def _increment(self, key, start, window, expires_at):
+        """Add one to key's window at start; returns (that count, the count
+        of the window before it)"""
+
+    @abstractmethod
+    def _prune(self, now):
+        """Delete counters that expired before now; returns how many"""
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Counters in this process only, for development and single-worker runs"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _increment(self, key, start, window, expires_at):
+        with self._lock:
+            count, _ = self._counters.get((key, start), (0, expires_at))
+            self._counters[(key, start)] = (count + 1, expires_at)
+            previous, _ = self._counters.get((key, start - window), (0, None))
+        return count + 1, previous
+
+    def _prune(self, now):
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._counters.items() if expires_at < now]
+            for key in expired:
+                del self._counters[key]
+        return len(expired)
+
+
+class DatabaseRateLimiter(RateLimiter):
+    """Counters in the application database's rate_limit_counter table,
+    written on their own connection outside the request's session"""
+
+    def _increment(self, key, start, window, expires_at):
+        table = RateLimitCounter.__table__
+        dialect = db.engine.dialect.name
+        with db.engine.begin() as connection:
+            if dialect in ('postgresql', 'sqlite'):
+                insert = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+                current = connection.execute(
+                    insert.values(key=key, window_start=start, count=1, expires_at=expires_at)
+                    .on_conflict_do_update(
+                        index_elements=[table.c.key, table.c.window_start],
+                        set_={'count': table.c.count + 1}
+                    )
+                    .returning(table.c.count)
+                ).scalar()
+            else:
+                where = (table.c.key == key) & (table.c.window_start == start)
+                result = connection.execute(table.update().where(where).values(count=table.c.count + 1))
+                if result.rowcount == 0:
+                    connection.execute(table.insert().values(
+                        key=key, window_start=start, count=1, expires_at=expires_at
+                    ))
+                current = connection.execute(select(table.c.count).where(where)).scalar()
+
+            previous = connection.execute(
+                select(table.c.count).where(table.c.key == key, table.c.window_start == start - window)
+            ).scalar()
+        return current, previous or 0
+
+    def _prune(self, now):
+        table = RateLimitCounter.__table__
+        with db.engine.begin() as connection:
+            return connection.execute(delete(table).where(table.c.expires_at < now)).rowcount
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Counters in a standalone SQLite file in WAL mode, shared by the workers
+    of a single node"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(sqlite3.connect(path, timeout=5)) as connection, connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limit_counter (
+                    key TEXT NOT NULL,
+                    window_start INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    expires_at INTEGER NOT NULL,
+                    PRIMARY KEY (key, window_start)
+                )
+            ''')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS ix_rate_limit_counter_expires_at ON rate_limit_counter (expires_at)'
+            )
+
+    def _connection(self):
+        """This thread's connection to the counter file, reopened in a forked
+        worker rather than shared with its parent"""
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _increment(self, key, start, window, expires_at):
+        with self._connection() as connection:
+            current = connection.execute(
+                'INSERT INTO rate_limit_counter (key, window_start, count, expires_at) VALUES (?, ?, 1, ?) '
+                'ON CONFLICT (key, window_start) DO UPDATE SET count = count + 1 RETURNING count',
+                (key, start, expires_at)
+            ).fetchone()[0]
+            previous = connection.execute(
+                'SELECT count FROM rate_limit_counter WHERE key = ? AND window_start = ?',
+                (key, start - window)
+            ).fetchone()
+        return current, previous[0] if previous else 0
+
+    def _prune(self, now):
+        with self._connection() as connection:
+            return connection.execute('DELETE FROM rate_limit_counter WHERE expires_at < ?', (now,)).rowcount
+
+
+def init_rate_limiter(app):
+    """Create the limiter named by RATE_LIMIT_STORAGE_URL: empty for the
+    application database, sqlite:///<path> for a standalone file, or memory://
+    for per-process counters"""
+    options = {'prune_seconds': app.config['RATE_LIMIT_PRUNE_SECONDS']}
+    url = app.config.get('RATE_LIMIT_STORAGE_URL')
+    if not url:
+        limiter = DatabaseRateLimiter(**options)
+    elif url.startswith('sqlite:///'):
+        limiter = SQLiteRateLimiter(url[len('sqlite:///'):], **options)
+    elif url == 'memory://':
+        limiter = MemoryRateLimiter(**options)
+    else:
+        raise ValueError(f'Unsupported RATE_LIMIT_STORAGE_URL: {url}')
+    app.extensions['rate_limiter'] = limiter
+    return limiter
+
+
+def get_rate_limiter():
+    """The current app's rate limiter"""
+    return current_app.extensions['rate_limiter']
@@ -0,0 +1,166 @@
+import html
+import re
+
+from sqlalchemy import or_, text
+
+from src.models import db, User, Session
+
+# Private-use characters bracket matches inside the database, so highlights
+# can be HTML-escaped before the <mark> tags go in
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_END = '\ue001'
+
+USER_FIELDS = ('first_name', 'last_name', 'email', 'organization')
+SESSION_FIELDS = ('title', 'description')
+
+MAX_RESULTS = 50
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_POSTGRES_HEADLINE = f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_END}", HighlightAll=true'
+_POSTGRES_SNIPPET = (
+    f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_END}", '
+    'MaxFragments=2, MinWords=8, MaxWords=20, FragmentDelimiter=" … "'
+)
+
+_POSTGRES_USER_SEARCH = text(f'''
+    SELECT id,
+           ts_rank(search_vector, q)
+             + similarity(first_name || ' ' || last_name || ' ' || email, :term) AS rank,
+           {", ".join(
+               f"ts_headline('simple', coalesce({field}, ''), q, :headline) AS {field}"
+               for field in USER_FIELDS
+           )}
+    FROM "user", websearch_to_tsquery('simple', :term) AS q
+    WHERE search_vector @@ q
+       OR {" OR ".join(f"{field} ILIKE :pattern" for field in USER_FIELDS)}
+    ORDER BY rank DESC, id DESC
+    LIMIT :limit
+''')
+
+_POSTGRES_SESSION_SEARCH = text('''
+    SELECT id,
+           ts_rank(search_vector, q) + similarity(title, :term) AS rank,
+           ts_headline('english', title, q, :headline) AS title,
+           ts_headline('english', description, q, :snippet) AS description
+    FROM session, websearch_to_tsquery('english', :term) AS q
+    WHERE search_vector @@ q OR title ILIKE :pattern
+    ORDER BY rank DESC, id DESC
+    LIMIT :limit
+''')
+
+_SQLITE_USER_SEARCH = text(f'''
+    SELECT rowid AS id,
+           -bm25(user_search) AS rank,
+           {", ".join(
+               f"highlight(user_search, {column}, :start, :end) AS {field}"
+               for column, field in enumerate(USER_FIELDS)
+           )}
+    FROM user_search
+    WHERE user_search MATCH :match
+    ORDER BY rank DESC, id DESC
+    LIMIT :limit
+''')
+
+_SQLITE_SESSION_SEARCH = text('''
+    SELECT rowid AS id,
+           -bm25(session_search, 10.0, 1.0) AS rank,
+           highlight(session_search, 0, :start, :end) AS title,
+           snippet(session_search, 1, :start, :end, ' … ', 20) AS description
+    FROM session_search
+    WHERE session_search MATCH :match
+    ORDER BY rank DESC, id DESC
+    LIMIT :limit
+''')
+
+
+class InvalidSearch(ValueError):
+    """Raised when a search term has nothing to search for"""
+
+
+def _is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _like_pattern(term):
+    """ILIKE pattern matching term anywhere, with wildcards in term escaped"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _tokens(term):
+    """Words in a search term"""
+    tokens = _TOKEN.findall(term or '')
+    if not tokens:
+        raise InvalidSearch('Search term must contain at least one letter or digit')
+    return tokens
+
+
+def _fts5_match(term):
+    """FTS5 query matching every word of term as a prefix"""
+    return ' '.join(f'"{token}"*' for token in _tokens(term))
+
+
+def render_highlight(fragment):
+    """HTML-escape a highlighted fragment and mark its matches with <mark>"""
+    if fragment is None:
+        return None
+    return (
+        html.escape(fragment)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+def user_search_condition(term):
+    """Filter for users matching term, for listings that add their own filters"""
+    if _is_postgres():
+        # Served by the trigram indexes
+        pattern = _like_pattern(term)
+        return or_(*[getattr(User, field).ilike(pattern, escape='\\') for field in USER_FIELDS])
+
+    matches = text('SELECT rowid FROM user_search WHERE user_search MATCH :match').bindparams(
+        match=_fts5_match(term)
+    ).columns(rowid=db.Integer)
+    return User.id.in_(matches)
+
+
+def _search(model, statement, fields, term, limit, options):
+    """Run a ranked search statement and load the matching rows in rank order"""
+    params = {'term': term, 'limit': min(max(limit, 1), MAX_RESULTS)}
+    if _is_postgres():
+        _tokens(term)
+        params.update(pattern=_like_pattern(term), headline=_POSTGRES_HEADLINE, snippet=_POSTGRES_SNIPPET)
+    else:
+        params.update(match=_fts5_match(term), start=HIGHLIGHT_START, end=HIGHLIGHT_END)
+
+    rows = db.session.execute(statement, params).mappings().all()
+    if not rows:
+        return []
+
+    matched = model.query.filter(model.id.in_([row['id'] for row in rows])).options(*options)
+    objects = {obj.id: obj for obj in matched}
+    return [
+        {
+            'object': objects[row['id']],
+            'rank': round(float(row['rank']), 4),
+            'highlights': {field: render_highlight(row[field]) for field in fields}
+        }
+        for row in rows if row['id'] in objects
+    ]
+
+
+def search_users(term, limit=20, options=()):
+    """Users matching term by name, email or organization, best match first.
+
+    Returns dicts holding the matched ``object``, its ``rank`` and HTML
+    ``highlights`` per field; options are loader options for the users.
+    """
+    statement = _POSTGRES_USER_SEARCH if _is_postgres() else _SQLITE_USER_SEARCH
+    return _search(User, statement, USER_FIELDS, term, limit, options)
+
+
+def search_sessions(term, limit=20, options=()):
+    """Sessions matching term by title or description, best match first"""
+    statement = _POSTGRES_SESSION_SEARCH if _is_postgres() else _SQLITE_SESSION_SEARCH
+    return _search(Session, statement, SESSION_FIELDS, term, limit, options)
@@ -1,25 +1,131 @@
 from functools import wraps
-from flask import jsonify, request, current_app
+from flask import jsonify, make_response, request, current_app, g
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy.orm import joinedload
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
-from src.models import User, AuditLog, db
+from src.models import User, db, permission_bit, permission_names
+from src.utils.rate_limit import get_rate_limiter
+from src.utils.audit import record_audit_event, record_api_access
+from src.utils.uploads import stream_uploads
 
-# Rate limiting storage (in production, use Redis)
-rate_limit_storage = defaultdict(list)
+def load_current_user():
+    """Load the authenticated user with roles, once per request.
+
+    The user is cached on flask.g alongside the identity it was loaded for,
+    so every decorator and helper in a request shares one lookup.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+    except Exception:
+        return None
+    if not current_user_id:
+        return None
+    
+    cached = g.get('_current_user')
+    if cached is not None and cached[0] == current_user_id:
+        return cached[1]
+    
+    user = db.session.get(User, current_user_id, options=[joinedload(User.roles)])
+    g._current_user = (current_user_id, user)
+    return user
+
+# Token epochs recently read from the database (user_id -> (epoch, read_at)),
+# least recently used first. Each worker process has its own, so revoking a
+# user's tokens takes effect at once in the worker that did it and within
+# AUTH_EPOCH_CACHE_SECONDS in the others.
+token_epoch_cache = OrderedDict()
+token_epoch_lock = threading.Lock()
+
+def token_epoch_is_current(user_id, epoch):
+    """Check a token's epoch against the user's, re-reading it at most every
+    AUTH_EPOCH_CACHE_SECONDS and caching at most AUTH_EPOCH_CACHE_SIZE users"""
+    now = time.monotonic()
+    with token_epoch_lock:
+        cached = token_epoch_cache.get(user_id)
+        if cached is not None:
+            token_epoch_cache.move_to_end(user_id)
+    if cached is None or now - cached[1] > current_app.config.get('AUTH_EPOCH_CACHE_SECONDS', 30):
+        current_epoch = db.session.query(User.token_epoch).filter(
+            User.id == user_id, User.is_active == True
+        ).scalar()
+        cached = (current_epoch, now)
+        with token_epoch_lock:
+            token_epoch_cache[user_id] = cached
+            token_epoch_cache.move_to_end(user_id)
+            while len(token_epoch_cache) > current_app.config.get('AUTH_EPOCH_CACHE_SIZE', 10000):
+                token_epoch_cache.popitem(last=False)
+    return cached[0] is not None and cached[0] == epoch
+
+def forget_token_epoch(user_id):
+    """Drop a cached epoch after revoking a user's tokens; other workers
+    re-read it once their copy is AUTH_EPOCH_CACHE_SECONDS old"""
+    with token_epoch_lock:
+        token_epoch_cache.pop(user_id, None)
+
+def trusted_claims(*required):
+    """The token's claims when AUTH_TRUST_ROLE_CLAIMS lets them stand in for
+    the database and the token carries an epoch and every required claim.
+
+    Returns (claims, error response); claims is None when the caller must
+    load the user instead.
+    """
+    claims = get_jwt()
+    if not current_app.config.get('AUTH_TRUST_ROLE_CLAIMS') or 'epoch' not in claims:
+        return None, None
+    if any(claim not in claims for claim in required):
+        return None, None
+    if not token_epoch_is_current(get_jwt_identity(), claims['epoch']):
+        return None, (jsonify({'error': 'Token has been revoked'}), 401)
+    return claims, None
+
+def authorize_request():
+    """Resolve the caller for a role check.
+
+    Returns (user_id, role names, error response). With AUTH_TRUST_ROLE_CLAIMS
+    the roles come from the token's signed claims and no query runs while the
+    token's epoch is cached as current; tokens without an epoch claim, or with
+    the mode off, fall back to loading the user.
+    """
+    claims, error = trusted_claims('roles')
+    if error:
+        return None, None, error
+    if claims is not None:
+        return get_jwt_identity(), list(claims['roles']), None
+    
+    user = load_current_user()
+    if not user or not user.is_active:
+        return None, None, (jsonify({'error': 'User not found or inactive'}), 401)
+    return user.id, [role.name for role in user.roles], None
+
+def authorize_permissions():
+    """Resolve the caller for a permission check.
+
+    Returns (user_id, permission mask, error response), from the token's
+    ``perms`` claim when trusted and otherwise from the user's roles.
+    """
+    claims, error = trusted_claims('perms')
+    if error:
+        return None, 0, error
+    if claims is not None:
+        return get_jwt_identity(), claims['perms'], None
+    
+    user = load_current_user()
+    if not user or not user.is_active:
+        return None, 0, (jsonify({'error': 'User not found or inactive'}), 401)
+    return user.id, user.permission_mask, None
 
 def require_auth(f):
     """Decorator to require authentication"""
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or not user.is_active:
-            return jsonify({'error': 'User not found or inactive'}), 401
+        _, _, error = authorize_request()
+        if error:
+            return error
         
         return f(*args, **kwargs)
     return decorated_function
@@ -30,18 +136,14 @@ def require_role(*allowed_roles):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-            
-            if not user or not user.is_active:
-                return jsonify({'error': 'User not found or inactive'}), 401
-            
-            user_roles = [role.name for role in user.roles]
+            user_id, user_roles, error = authorize_request()
+            if error:
+                return error
             
             if not any(role in user_roles for role in allowed_roles):
                 # Log unauthorized access attempt
-                audit_log = AuditLog(
-                    user_id=user.id,
+                record_audit_event(
+                    user_id=user_id,
                     action='unauthorized_access_attempt',
                     resource_type='endpoint',
                     details={
@@ -52,8 +154,6 @@ def require_role(*allowed_roles):
                     ip_address=request.remote_addr,
                     user_agent=request.headers.get('User-Agent')
                 )
-                db.session.add(audit_log)
-                db.session.commit()
                 
                 return jsonify({
                     'error': 'Insufficient permissions',
@@ -66,39 +166,30 @@ def require_role(*allowed_roles):
 
 def require_permission(permission):
     """Decorator to require specific permission for access"""
+    bit = permission_bit(permission)
+    
     def decorator(f):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-            
-            if not user or not user.is_active:
-                return jsonify({'error': 'User not found or inactive'}), 401
-            
-            # Check if user has the required permission through any of their roles
-            has_permission = False
-            for role in user.roles:
-                if role.has_permission(permission):
-                    has_permission = True
-                    break
+            user_id, user_permissions, error = authorize_permissions()
+            if error:
+                return error
             
-            if not has_permission:
+            if not user_permissions & bit:
                 # Log unauthorized access attempt
-                audit_log = AuditLog(
-                    user_id=user.id,
+                record_audit_event(
+                    user_id=user_id,
                     action='unauthorized_access_attempt',
                     resource_type='endpoint',
                     details={
                         'endpoint': request.endpoint,
                         'required_permission': permission,
-                        'user_permissions': [p for role in user.roles for p in role.permissions.keys()]
+                        'user_permissions': permission_names(user_permissions)
                     },
                     ip_address=request.remote_addr,
                     user_agent=request.headers.get('User-Agent')
                 )
-                db.session.add(audit_log)
-                db.session.commit()
                 
                 return jsonify({
                     'error': 'Insufficient permissions',
@@ -115,13 +206,9 @@ def require_ownership_or_role(*allowed_roles):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-            
-            if not user or not user.is_active:
-                return jsonify({'error': 'User not found or inactive'}), 401
-            
-            user_roles = [role.name for role in user.roles]
+            user_id, user_roles, error = authorize_request()
+            if error:
+                return error
             
             # Check if user has required role
             if any(role in user_roles for role in allowed_roles):
@@ -135,17 +222,17 @@ def require_ownership_or_role(*allowed_roles):
                 if 'presentation' in request.endpoint:
                     from src.models import Presentation
                     presentation = Presentation.query.get(resource_id)
-                    if presentation and presentation.speaker_id == current_user_id:
+                    if presentation and presentation.speaker_id == user_id:
                         return f(*args, **kwargs)
                 
                 # For user resources, check if it's the same user
                 elif 'user' in request.endpoint:
-                    if int(resource_id) == current_user_id:
+                    if int(resource_id) == user_id:
                         return f(*args, **kwargs)
             
             # Log unauthorized access attempt
-            audit_log = AuditLog(
-                user_id=user.id,
+            record_audit_event(
+                user_id=user_id,
                 action='unauthorized_access_attempt',
                 resource_type='endpoint',
                 details={
@@ -156,8 +243,6 @@ def require_ownership_or_role(*allowed_roles):
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent')
             )
-            db.session.add(audit_log)
-            db.session.commit()
             
             return jsonify({
                 'error': 'Access denied. Insufficient permissions or not resource owner.'
@@ -167,10 +252,19 @@ def require_ownership_or_role(*allowed_roles):
     return decorator
 
 def rate_limit(max_requests=100, window_minutes=15):
-    """Rate limiting decorator"""
+    """Rate limiting decorator.
+
+    Counts requests per endpoint and client in the shared limiter and reports
+    the client's budget in X-RateLimit-* headers.
+    """
+    window = int(window_minutes * 60)
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+                return f(*args, **kwargs)
+            
             # Get client identifier (IP + User ID if authenticated)
             client_id = request.remote_addr
             
@@ -178,29 +272,36 @@ def rate_limit(max_requests=100, window_minutes=15):
                 current_user_id = get_jwt_identity()
                 if current_user_id:
                     client_id = f"{client_id}:{current_user_id}"
-            except:
+            except Exception:
                 pass  # Not authenticated, use IP only
             
-            now = time.time()
-            window_start = now - (window_minutes * 60)
+            try:
+                allowed, remaining, reset = get_rate_limiter().hit(
+                    f"{request.endpoint}:{client_id}", max_requests, window
+                )
+            except Exception as e:
+                # Fail open: an unavailable limiter store must not lock everyone out
+                current_app.logger.warning(f"Rate limiter unavailable: {str(e)}")
+                return f(*args, **kwargs)
             
-            # Clean old entries
-            rate_limit_storage[client_id] = [
-                timestamp for timestamp in rate_limit_storage[client_id]
-                if timestamp > window_start
-            ]
+            headers = {
+                'X-RateLimit-Limit': str(max_requests),
+                'X-RateLimit-Remaining': str(remaining),
+                'X-RateLimit-Reset': str(reset)
+            }
             
-            # Check rate limit
-            if len(rate_limit_storage[client_id]) >= max_requests:
-                return jsonify({
+            if not allowed:
+                response = make_response(jsonify({
                     'error': 'Rate limit exceeded',
-                    'retry_after': window_minutes * 60
-                }), 429
-            
-            # Add current request
-            rate_limit_storage[client_id].append(now)
-            
-            return f(*args, **kwargs)
+                    'retry_after': reset
+                }), 429)
+                response.headers.update(headers)
+                response.headers['Retry-After'] = str(reset)
+                return response
+            
+            response = make_response(f(*args, **kwargs))
+            response.headers.update(headers)
+            return response
         return decorated_function
     return decorator
 
@@ -237,7 +338,9 @@ def validate_file_upload(allowed_extensions=None, max_size_mb=100):
                 }), 400
             
             return f(*args, **kwargs)
-        return decorated_function
+        # Files are streamed to storage as they arrive, with the size limit
+        # enforced along the way
+        return stream_uploads(max_size_mb)(decorated_function)
     return decorator
 
 def log_api_access(f):
@@ -248,37 +351,25 @@ def log_api_access(f):
         
         try:
             current_user_id = get_jwt_identity()
-        except:
+        except Exception:
             current_user_id = None
         
         try:
             result = f(*args, **kwargs)
             status_code = result[1] if isinstance(result, tuple) else 200
             
-            # Log successful API access
+            # Log successful API access, as the audit policy says
             if current_user_id:
-                audit_log = AuditLog(
-                    user_id=current_user_id,
-                    action='api_access',
-                    resource_type='endpoint',
-                    details={
-                        'endpoint': request.endpoint,
-                        'method': request.method,
-                        'status_code': status_code,
-                        'response_time_ms': round((time.time() - start_time) * 1000, 2)
-                    },
-                    ip_address=request.remote_addr,
-                    user_agent=request.headers.get('User-Agent')
+                record_api_access(
+                    current_user_id, status_code, round((time.time() - start_time) * 1000, 2)
                 )
-                db.session.add(audit_log)
-                db.session.commit()
             
             return result
             
         except Exception as e:
             # Log API error
             if current_user_id:
-                audit_log = AuditLog(
+                record_audit_event(
                     user_id=current_user_id,
                     action='api_error',
                     resource_type='endpoint',
@@ -291,8 +382,6 @@ def log_api_access(f):
                     ip_address=request.remote_addr,
                     user_agent=request.headers.get('User-Agent')
                 )
-                db.session.add(audit_log)
-                db.session.commit()
             
             raise
             
@@ -300,24 +389,14 @@ def log_api_access(f):
 
 def get_current_user():
     """Helper function to get current authenticated user"""
-    try:
-        current_user_id = get_jwt_identity()
-        if current_user_id:
-            return User.query.get(current_user_id)
-    except:
-        pass
-    return None
+    return load_current_user()
 
 def check_user_permission(user, permission):
     """Check if user has specific permission"""
     if not user or not user.is_active:
         return False
     
-    for role in user.roles:
-        if role.has_permission(permission):
-            return True
-    
-    return False
+    return bool(user.permission_mask & permission_bit(permission))
 
 def check_user_role(user, role_name):
     """Check if user has specific role"""
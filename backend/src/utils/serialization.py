@@ -0,0 +1,46 @@
+from flask import request
+
+from src.models import Session
+
+
+class InvalidFieldset(ValueError):
+    """Raised when ?fields= or ?include= names something that cannot be serialized"""
+
+
+def _parse_list(name, allowed):
+    """Split a comma-separated query argument, rejecting unknown names"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+
+    names = {item.strip() for item in value.split(',') if item.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise InvalidFieldset(
+            f'Unknown {name}: {", ".join(sorted(unknown))}. Allowed: {", ".join(allowed)}'
+        )
+    return names
+
+
+def session_serialization_args(include_files=True, include_reviews=False, include_speakers=True,
+                               include_schedule=True):
+    """Read ?include= and ?fields= for an endpoint that serializes sessions.
+
+    The keyword arguments are the endpoint's defaults, used when the request
+    has no ?include=. Returns the include_* flags, to pass to both
+    Session.serialization_options() and Session.to_dict(), and the fields
+    set for to_dict() (None for all fields).
+    """
+    includes = {
+        'include_files': include_files,
+        'include_reviews': include_reviews,
+        'include_speakers': include_speakers,
+        'include_schedule': include_schedule
+    }
+
+    requested = _parse_list('include', Session.SERIALIZED_INCLUDES)
+    if requested is not None:
+        includes = {f'include_{name}': name in requested for name in Session.SERIALIZED_INCLUDES}
+
+    fields = _parse_list('fields', Session.SERIALIZED_FIELDS)
+    return includes, fields
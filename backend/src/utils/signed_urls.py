@@ -0,0 +1,70 @@
+import base64
+import hashlib
+import hmac
+import math
+import time
+
+from flask import current_app, url_for
+
+# A signed URL names one stored file version (file id and SHA-256) with the
+# type, filename and disposition it is served with, valid until an expiry;
+# all of it is covered by an HMAC, so serving it needs no token or database.
+# Expiries are rounded up to the minute, giving every viewer of a file in
+# the same minute the same URL for proxies and browsers to cache.
+DISPOSITIONS = ('inline', 'attachment')
+EXPIRY_GRANULARITY = 60
+# Types a signed URL may show inline; anything else is always an attachment
+INLINE_MIME_TYPES = ('application/pdf', 'video/mp4', 'video/quicktime')
+
+
+def _key():
+    secret = current_app.config['SIGNED_URL_SECRET'] or current_app.config['SECRET_KEY']
+    # Derived, so a signature is good for nothing else keyed on the secret
+    return hmac.new(secret.encode(), b'signed-file-url', hashlib.sha256).digest()
+
+
+def _signature(file_id, sha256, expires, mime_type, filename, disposition):
+    message = '\n'.join([str(file_id), sha256, str(expires), mime_type, filename, disposition])
+    digest = hmac.new(_key(), message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def served_disposition(mime_type, disposition):
+    """The disposition a file of mime_type is sent with when disposition is
+    asked for"""
+    return disposition if mime_type in INLINE_MIME_TYPES else 'attachment'
+
+
+def signed_file_url(session_file, disposition='inline'):
+    """A signed URL for session_file's current bytes; returns (url, expires)
+    with expires in Unix seconds"""
+    lifetime = current_app.config['SIGNED_URL_EXPIRY_SECONDS']
+    expires = math.ceil((time.time() + lifetime) / EXPIRY_GRANULARITY) * EXPIRY_GRANULARITY
+    mime_type = session_file.mime_type or 'application/octet-stream'
+    disposition = served_disposition(mime_type, disposition)
+    sig = _signature(
+        session_file.id, session_file.file_hash, expires, mime_type, session_file.original_filename, disposition
+    )
+    url = url_for(
+        'sessions.signed_session_file', file_id=session_file.id, sha256=session_file.file_hash,
+        expires=expires, type=mime_type, name=session_file.original_filename, disposition=disposition, sig=sig
+    )
+    return url, expires
+
+
+def verify_signed_file_url(file_id, sha256, args):
+    """The (mime_type, filename, disposition, seconds left) a signed URL's
+    query args grant, or None if they are malformed, tampered with or
+    expired"""
+    try:
+        expires = int(args['expires'])
+        mime_type, filename, disposition, sig = args['type'], args['name'], args['disposition'], args['sig']
+    except (KeyError, ValueError):
+        return None
+    remaining = expires - int(time.time())
+    if remaining <= 0 or disposition not in DISPOSITIONS:
+        return None
+    expected = _signature(file_id, sha256, expires, mime_type, filename, disposition)
+    if not hmac.compare_digest(expected, sig):
+        return None
+    return mime_type, filename, disposition, remaining
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, select
+
+from src.models import (
+    db, User, Role, Session, SessionFile, SessionQuestion, SessionAssignment, StatsCounter,
+    user_roles
+)
+from src.models.stats import created_counter, status_counter
+
+RECENT_ACTIVITY_DAYS = 7
+
+
+def _count_where(condition):
+    """Conditional aggregate counting the rows that match condition"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def assigned_session_ids(user_id):
+    """Subquery of the sessions actively assigned to an approver"""
+    return select(SessionAssignment.session_id).where(
+        SessionAssignment.approver_id == user_id,
+        SessionAssignment.status == 'active'
+    )
+
+
+def session_status_counts(session_ids=None):
+    """Count sessions per status with a single GROUP BY"""
+    query = db.session.query(Session.status, func.count(Session.id)).group_by(Session.status)
+    if session_ids is not None:
+        query = query.filter(Session.id.in_(session_ids))
+    return dict(query.all())
+
+
+def role_counts():
+    """Count users per role name with a single GROUP BY"""
+    return dict(
+        db.session.query(Role.name, func.count(user_roles.c.user_id))
+        .join(user_roles, user_roles.c.role_id == Role.id)
+        .group_by(Role.name)
+        .all()
+    )
+
+
+def question_counts(session_ids=None):
+    """Count questions by state with conditional aggregation"""
+    query = db.session.query(
+        func.count(SessionQuestion.id),
+        _count_where(SessionQuestion.status == 'open'),
+        _count_where(SessionQuestion.status == 'answered'),
+        _count_where(and_(SessionQuestion.status == 'open', SessionQuestion.is_urgent == True))
+    )
+    if session_ids is not None:
+        query = query.filter(SessionQuestion.session_id.in_(session_ids))
+
+    total, open_count, answered, urgent_open = query.one()
+    return {
+        'total': total,
+        'open': open_count,
+        'answered': answered,
+        'urgent_open': urgent_open
+    }
+
+
+def _created_per_day(column):
+    """Rows per UTC creation day of column's table"""
+    day = func.date(column)
+    return db.session.query(day, func.count()).group_by(day).all()
+
+
+def expected_counters():
+    """Recompute every stats_counter value from the underlying tables"""
+    counters = {}
+
+    total_users, active_users = db.session.query(
+        func.count(User.id), _count_where(User.is_active == True)
+    ).one()
+    counters['users.total'] = total_users
+    counters['users.active'] = active_users
+    for name, count in role_counts().items():
+        counters[f'users.role.{name}'] = count
+    for day, count in _created_per_day(User.created_at):
+        if day is not None:
+            counters[created_counter('users', day)] = count
+
+    for status, count in session_status_counts().items():
+        counters[status_counter('sessions', status)] = count
+    for day, count in _created_per_day(Session.created_at):
+        if day is not None:
+            counters[created_counter('sessions', day)] = count
+
+    total_files, total_bytes = db.session.query(
+        func.count(SessionFile.id), func.coalesce(func.sum(SessionFile.file_size), 0)
+    ).one()
+    counters['files.total'] = total_files
+    counters['files.bytes'] = total_bytes
+
+    question_statuses = db.session.query(
+        SessionQuestion.status, func.count(SessionQuestion.id)
+    ).group_by(SessionQuestion.status)
+    for status, count in question_statuses:
+        counters[status_counter('questions', status)] = count
+
+    return {name: value for name, value in counters.items() if value}
+
+
+def system_stats():
+    """Admin dashboard statistics, read from stats_counter in one query"""
+    today = datetime.utcnow().date()
+    days = [today - timedelta(days=offset) for offset in range(RECENT_ACTIVITY_DAYS)]
+    counters = StatsCounter.snapshot(days)
+
+    def counter(name):
+        return counters.get(name, 0)
+
+    def statuses(prefix):
+        return {
+            name[len(prefix) + len('.status.'):]: value
+            for name, value in counters.items() if name.startswith(f'{prefix}.status.')
+        }
+
+    sessions = statuses('sessions')
+    questions = statuses('questions')
+
+    return {
+        'users': {
+            'total': counter('users.total'),
+            'active': counter('users.active'),
+            'speakers': counter('users.role.speaker'),
+            'managers': counter('users.role.manager'),
+            'admins': counter('users.role.admin')
+        },
+        'sessions': {
+            'total': sum(sessions.values()),
+            'draft': sessions.get('draft', 0),
+            'submitted': sessions.get('submitted', 0),
+            'approved': sessions.get('approved', 0),
+            'rejected': sessions.get('rejected', 0),
+            'scheduled': sessions.get('scheduled', 0)
+        },
+        'files': {
+            'total_files': counter('files.total'),
+            'total_size_mb': round(counter('files.bytes') / (1024 * 1024), 2)
+        },
+        'questions': {
+            'total': sum(questions.values()),
+            'open': questions.get('open', 0),
+            'answered': questions.get('answered', 0)
+        },
+        'recent_activity': {
+            'new_sessions_week': sum(counter(created_counter('sessions', day)) for day in days),
+            'new_users_week': sum(counter(created_counter('users', day)) for day in days)
+        }
+    }
+
+
+def approver_dashboard_stats(user):
+    """Approver dashboard statistics: two queries for admins and managers alike"""
+    # Admins see every session, managers only those assigned to them
+    session_ids = None if user.has_role('admin') else assigned_session_ids(user.id)
+    statuses = session_status_counts(session_ids)
+    questions = question_counts(session_ids)
+
+    return {
+        'total_sessions': sum(statuses.values()),
+        'pending_sessions': statuses.get('submitted', 0),
+        'approved_sessions': statuses.get('approved', 0),
+        'rejected_sessions': statuses.get('rejected', 0),
+        'scheduled_sessions': statuses.get('scheduled', 0),
+        'open_questions': questions['open'],
+        'urgent_questions': questions['urgent_open']
+    }
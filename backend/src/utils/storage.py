@@ -0,0 +1,53 @@
+import os
+import re
+
+from flask import current_app
+
+# Stored files live under UPLOAD_FOLDER/objects, named by their SHA-256 and
+# fanned out by its first two hex digits (objects/ab/cdef...), so identical
+# uploads share one file. FileObject counts the SessionFile rows using each.
+OBJECTS_DIR = 'objects'
+
+_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+def objects_directory():
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], OBJECTS_DIR)
+
+
+def object_path(sha256):
+    """Where the file with the given SHA-256 is stored"""
+    if not _SHA256.match(sha256 or ''):
+        raise ValueError(f'Not a SHA-256 hex digest: {sha256!r}')
+    return os.path.join(objects_directory(), sha256[:2], sha256[2:])
+
+
+def store_object(path, sha256):
+    """Move the file at path into the object store; returns its object path.
+
+    When the object is already stored the file at path is a duplicate and is
+    removed instead. Its mtime is refreshed either way, which keeps
+    ``gc-file-objects`` off an object that is about to be referenced again.
+    """
+    target = object_path(sha256)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.exists(target):
+        os.remove(path)
+        os.utime(target)
+    else:
+        os.replace(path, target)
+    return target
+
+
+def iter_objects():
+    """(sha256, path) of every file in the object store"""
+    root = objects_directory()
+    if not os.path.isdir(root):
+        return
+    for prefix in sorted(os.listdir(root)):
+        directory = os.path.join(root, prefix)
+        if not os.path.isdir(directory):
+            continue
+        for rest in sorted(os.listdir(directory)):
+            if _SHA256.match(prefix + rest):
+                yield prefix + rest, os.path.join(directory, rest)
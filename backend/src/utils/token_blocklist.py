@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from src.models import db, RevokedToken
+
+# Tokens issued without an expiry stay revoked until this (2100-01-01)
+NEVER_EXPIRES = 4102444800
+
+# Each sync re-reads revocations this many seconds older than the previous
+# one, covering transactions that commit late and clock skew between hosts
+SYNC_OVERLAP_SECONDS = 30
+
+
+class TokenBlocklist(ABC):
+    """Revoked JWT ids in a store shared by every worker.
+
+    Each worker keeps its own copy of the revoked ids that have not expired
+    yet, so a check is a dict lookup. Revocations from other workers are
+    pulled in incrementally at most every ``sync_seconds``; revocations made
+    by this worker count immediately. The live set only holds tokens logged
+    out within one token lifetime, so it is kept exactly rather than in a
+    probabilistic filter.
+    """
+
+    def __init__(self, sync_seconds=5, prune_seconds=3600):
+        self.sync_seconds = sync_seconds
+        self.prune_seconds = prune_seconds
+        self._revoked = {}
+        self._synced_since = 0
+        self._synced_at = None
+        self._pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def revoke(self, jwt_payload):
+        """Revoke a decoded token until it expires"""
+        jti = jwt_payload['jti']
+        expires = jwt_payload.get('exp') or NEVER_EXPIRES
+        self._add(jti, expires, jwt_payload.get('type'), jwt_payload.get('sub'))
+        with self._lock:
+            self._revoked[jti] = expires
+
+        if time.monotonic() - self._pruned_at > self.prune_seconds:
+            self.prune()
+
+    def is_revoked(self, jti):
+        """Whether a token id has been revoked, syncing first when due"""
+        if self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_seconds:
+            self.sync()
+        return jti in self._revoked
+
+    def sync(self):
+        """Pull revocations added since the last sync and drop expired ones"""
+        now = time.time()
+        rows = self._since(self._synced_since, now)
+        with self._lock:
+            self._revoked.update(rows)
+            self._synced_since = now - SYNC_OVERLAP_SECONDS
+            for jti in [jti for jti, expires in self._revoked.items() if expires < now]:
+                del self._revoked[jti]
+            self._synced_at = time.monotonic()
+
+    def prune(self):
+        """Delete stored revocations of tokens that have expired"""
+        self._pruned_at = time.monotonic()
+        return self._prune(time.time())
+
+    @abstractmethod
+    def _add(self, jti, expires, token_type, user_id):
+        """Store a revocation"""
+
+    @abstractmethod
+    def _since(self, since, now):
+        """(jti, expires) of unexpired tokens revoked after since"""
+
+    @abstractmethod
+    def _prune(self, now):
+        """Delete revocations that expired before now; returns how many"""
+
+
+class DatabaseTokenBlocklist(TokenBlocklist):
+    """Revocations in the application database's revoked_token table.
+
+    Uses its own connections so revoking or syncing never commits or rolls
+    back the request's session.
+    """
+
+    def _add(self, jti, expires, token_type, user_id):
+        table = RevokedToken.__table__
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(table.insert().values(
+                    jti=jti,
+                    token_type=token_type,
+                    user_id=int(user_id) if user_id is not None else None,
+                    expires_at=datetime.utcfromtimestamp(expires),
+                    revoked_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            pass  # Already revoked
+
+    def _since(self, since, now):
+        table = RevokedToken.__table__
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                select(table.c.jti, table.c.expires_at).where(
+                    table.c.revoked_at > datetime.utcfromtimestamp(since),
+                    table.c.expires_at > datetime.utcfromtimestamp(now)
+                )
+            ).all()
+        return [(jti, _timestamp(expires_at)) for jti, expires_at in rows]
+
+    def _prune(self, now):
+        table = RevokedToken.__table__
+        with db.engine.begin() as connection:
+            result = connection.execute(
+                delete(table).where(table.c.expires_at < datetime.utcfromtimestamp(now))
+            )
+        return result.rowcount
+
+
+class SQLiteTokenBlocklist(TokenBlocklist):
+    """Revocations in a standalone SQLite file, for single-node deployments
+    whose workers share a filesystem but not a database server"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(sqlite3.connect(path, timeout=5)) as connection, connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS revoked_token (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    jti TEXT NOT NULL UNIQUE,
+                    token_type TEXT,
+                    user_id INTEGER,
+                    expires_at INTEGER NOT NULL,
+                    revoked_at REAL NOT NULL
+                )
+            ''')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS ix_revoked_token_expires_at ON revoked_token (expires_at)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS ix_revoked_token_revoked_at ON revoked_token (revoked_at)'
+            )
+
+    def _connection(self):
+        """This thread's connection to the blocklist file, reopened in a
+        forked worker rather than shared with its parent"""
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _add(self, jti, expires, token_type, user_id):
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO revoked_token (jti, token_type, user_id, expires_at, revoked_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (jti, token_type, int(user_id) if user_id is not None else None, int(expires), time.time())
+            )
+
+    def _since(self, since, now):
+        return self._connection().execute(
+            'SELECT jti, expires_at FROM revoked_token WHERE revoked_at > ? AND expires_at > ?',
+            (since, now)
+        ).fetchall()
+
+    def _prune(self, now):
+        with self._connection() as connection:
+            return connection.execute('DELETE FROM revoked_token WHERE expires_at < ?', (int(now),)).rowcount
+
+
+def _timestamp(value):
+    """Seconds since the epoch for a naive UTC datetime"""
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+def init_token_blocklist(app):
+    """Create the blocklist named by JWT_BLOCKLIST_URL: empty for the
+    application database, or sqlite:///<path> for a standalone file"""
+    options = {
+        'sync_seconds': app.config['JWT_BLOCKLIST_SYNC_SECONDS'],
+        'prune_seconds': app.config['JWT_BLOCKLIST_PRUNE_SECONDS'],
+    }
+    url = app.config.get('JWT_BLOCKLIST_URL')
+    if not url:
+        blocklist = DatabaseTokenBlocklist(**options)
+    elif url.startswith('sqlite:///'):
+        blocklist = SQLiteTokenBlocklist(url[len('sqlite:///'):], **options)
+    else:
+        raise ValueError(f'Unsupported JWT_BLOCKLIST_URL: {url}')
+    app.extensions['token_blocklist'] = blocklist
+    return blocklist
+
+
+def get_token_blocklist():
+    """The current app's token blocklist"""
+    return current_app.extensions['token_blocklist']
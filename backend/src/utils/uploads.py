@@ -0,0 +1,212 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+import magic
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from src.utils.storage import store_object
+
+# Uploads are copied in blocks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# libmagic recognises every allowed file type from its opening bytes
+SNIFF_SIZE = 8192
+# Allowed upload extensions -> (the MIME type files with it are stored and
+# served as, the types libmagic may sniff from their contents). PowerPoint
+# files sniff as the zip or OLE containers they are underneath, and MP4 and
+# QuickTime share a container format. The stored type only ever comes from
+# here, never from the sniff, so no upload is served as HTML, SVG or any
+# other type a browser would run.
+PPTX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+UPLOAD_TYPES = {
+    '.pdf': ('application/pdf', ('application/pdf',)),
+    '.ppt': ('application/vnd.ms-powerpoint',
+             ('application/vnd.ms-powerpoint', 'application/CDFV2', 'application/x-ole-storage')),
+    '.pptx': (PPTX_MIME_TYPE, (PPTX_MIME_TYPE, 'application/zip')),
+    '.mp4': ('video/mp4', ('video/mp4', 'video/quicktime', 'video/x-m4v', 'application/octet-stream')),
+    '.mov': ('video/quicktime', ('video/quicktime', 'video/mp4', 'video/x-m4v', 'application/octet-stream')),
+}
+# Types a stored file may be served as; any other stored type (from before
+# types were checked) is sent as an opaque download
+SERVED_MIME_TYPES = frozenset(mime_type for mime_type, _ in UPLOAD_TYPES.values())
+# Staging directory under UPLOAD_FOLDER, on the same filesystem as the object
+# store so that committing an upload is a rename
+INCOMING_DIR = 'incoming'
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    """Raised when an upload passes its size limit while being written"""
+
+
+class UnsupportedUpload(ValueError):
+    """Raised when an upload's extension is not allowed or its contents are
+    not what the extension says"""
+
+
+def hash_file(path):
+    """SHA-256 hex digest of the file at path, read in a single pass"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def upload_mime_type(head, filename):
+    """The MIME type to store an upload as, from its filename's extension.
+
+    The type sniffed from the opening bytes must agree with the extension,
+    so an HTML page named deck.pdf is refused rather than stored.
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in UPLOAD_TYPES:
+        raise UnsupportedUpload(f'File type not allowed: {extension or "no extension"}')
+    mime_type, sniffable = UPLOAD_TYPES[extension]
+    sniffed = magic.from_buffer(bytes(head), mime=True)
+    if sniffed not in sniffable:
+        raise UnsupportedUpload(f'File contents ({sniffed}) do not match its {extension} extension')
+    return mime_type
+
+
+def served_mime_type(mime_type):
+    """The type to send a stored file as, given the type it was stored as"""
+    return mime_type if mime_type in SERVED_MIME_TYPES else 'application/octet-stream'
+
+
+class UploadSink:
+    """A file that stores an upload in a single pass.
+
+    Bytes go to a staging file in directory while their SHA-256 and length
+    are computed and the opening bytes are kept for MIME sniffing, so the
+    file never has to be read back. commit() checks the contents match the
+    filename's extension and moves the finished file into the object store.
+    Closing a sink that was never committed, or leaving a with block on an
+    exception, deletes the staging file.
+
+    It can be read and seeked like the temporary file Werkzeug would
+    otherwise have used, so it serves as a FileStorage's stream.
+    """
+
+    def __init__(self, directory, filename=None, max_size=None):
+        self.filename = filename
+        self.max_size = max_size
+        self.size = 0
+        self.path = None
+        self._hash = hashlib.sha256()
+        self._head = bytearray()
+        self._partial = os.path.join(directory, f'{uuid.uuid4().hex}.part')
+        self._file = open(self._partial, 'w+b')
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise UploadTooLarge(f'File too large. Maximum size is {self.max_size // (1024 * 1024)}MB.')
+        if len(self._head) < SNIFF_SIZE:
+            self._head += data[:SNIFF_SIZE - len(self._head)]
+        self._hash.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readline(self, size=-1):
+        return self._file.readline(size)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    @property
+    def mime_type(self):
+        return upload_mime_type(self._head, self.filename)
+
+    def commit(self):
+        """Close the file and move it into the object store, where
+        self.path then names it; raises UnsupportedUpload, leaving the
+        file to be deleted on close, if it is not of an allowed type"""
+        self._file.close()
+        self.mime_type
+        self.path = store_object(self._partial, self.sha256)
+
+    def close(self):
+        self._file.close()
+        if self.path is None and os.path.exists(self._partial):
+            os.remove(self._partial)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.close()
+
+
+def incoming_directory():
+    """The app's staging directory for uploads in progress"""
+    directory = os.path.join(current_app.config['UPLOAD_FOLDER'], INCOMING_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def save_upload(file, max_size=None):
+    """Store an uploaded FileStorage in the object store; returns the
+    committed UploadSink, which holds the file's path, size, SHA-256 and
+    MIME type. Raises UnsupportedUpload for a file of a type not allowed.
+
+    A file already streamed into a sink by UploadRequest is just renamed
+    into place; any other is copied through a new sink.
+    """
+    if isinstance(file.stream, UploadSink):
+        file.stream.commit()
+        return file.stream
+    with UploadSink(incoming_directory(), file.filename, max_size) as sink:
+        shutil.copyfileobj(file.stream, sink, UPLOAD_CHUNK_SIZE)
+        sink.commit()
+    return sink
+
+
+def stream_uploads(max_size_mb=100):
+    """Mark a view whose file uploads UploadRequest should stream straight
+    into UploadSinks, refusing any file over max_size_mb as it arrives"""
+    def decorator(f):
+        f.upload_max_size = max_size_mb * 1024 * 1024
+        return f
+    return decorator
+
+
+class UploadRequest(Request):
+    """Request class that parses multipart files for views marked with
+    stream_uploads into UploadSinks in the staging directory, instead of
+    Werkzeug's temporary files that would then be copied to storage."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._upload_sinks = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        view = current_app.view_functions.get(self.endpoint) if self.endpoint else None
+        max_size = getattr(view, 'upload_max_size', None)
+        if max_size is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+        if self.max_content_length is not None:
+            max_size = min(max_size, self.max_content_length)
+        sink = UploadSink(incoming_directory(), filename, max_size)
+        self._upload_sinks.append(sink)
+        return sink
+
+    def close(self):
+        # Sinks the view did not commit, including any left behind when
+        # parsing stopped part way, are deleted with the request
+        super().close()
+        for sink in self._upload_sinks:
+            sink.close()
@@ -0,0 +1,148 @@
+import io
+import os
+from datetime import date, time
+
+import pytest
+from flask import g
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv('UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    monkeypatch.setenv('RATE_LIMIT_ENABLED', 'false')
+    monkeypatch.setenv('AUDIT_ASYNC', 'false')
+
+    from src.main import create_app
+    from src.models import db
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def db(app):
+    from src.models import db
+    return db
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    original_open = client.open
+
+    def open_request(*args, **kwargs):
+        # Requests share the test's app context, so drop the user cached on g
+        g.pop('_current_user', None)
+        return original_open(*args, **kwargs)
+
+    client.open = open_request
+    return client
+
+
+@pytest.fixture
+def make_user(db):
+    from src.models import Role, User
+
+    def make_user(email, role='speaker'):
+        role_row = Role.query.filter_by(name=role).first() or Role(role)
+        user = User(email, 'password', 'Test', 'User')
+        user.roles.append(role_row)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def auth_headers(app):
+    def auth_headers(user):
+        token = create_access_token(identity=user.id, additional_claims=user.token_claims())
+        return {'Authorization': f'Bearer {token}'}
+
+    return auth_headers
+
+
+@pytest.fixture
+def make_sessions(db):
+    """Sessions with a speaker, a review and a schedule slot each"""
+    from src.models import Room, Session, SessionReview, SessionSchedule, SessionSpeaker, SessionType
+
+    def make_sessions(owner, reviewer, count):
+        session_type = SessionType.query.first() or SessionType('Talk')
+        room = Room.query.first() or Room('Room 1')
+        db.session.add_all([session_type, room])
+        db.session.flush()
+        sessions = []
+        for i in range(count):
+            session = Session(owner.id, session_type.id, f'Session {i}', 'Description', status='submitted')
+            db.session.add(session)
+            db.session.flush()
+            db.session.add(SessionSpeaker(session.id, reviewer.id))
+            db.session.add(SessionReview(session.id, reviewer.id, status='completed', overall_score=4, decision='approve'))
+            db.session.add(SessionSchedule(session.id, room.id, date.today(), time(9), time(10), reviewer.id))
+            sessions.append(session)
+        db.session.commit()
+        return sessions
+
+    return make_sessions
+
+
+@pytest.fixture
+def pdf_bytes():
+    """A minimal PDF, as python-magic recognises it"""
+    return b'%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n'
+
+
+@pytest.fixture
+def html_bytes():
+    """HTML that would run script if served inline as text/html"""
+    return b'<!DOCTYPE html><html><body><script>alert(document.cookie)</script></body></html>'
+
+
+@pytest.fixture
+def upload_file(client):
+    """Uploads content to a session as a multipart form, as the dashboard does"""
+    def upload_file(session, headers, content, filename):
+        return client.post(
+            f'/api/sessions/sessions/{session.id}/files',
+            data={'file': (io.BytesIO(content), filename)},
+            headers=headers,
+            content_type='multipart/form-data'
+        )
+
+    return upload_file
+
+
+class QueryCounter:
+    """Collects the SQL statements run on an engine inside a with block"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries(db):
+    return lambda: QueryCounter(db.engine)
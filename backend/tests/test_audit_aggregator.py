@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+
+def test_finished_minute_is_taken_without_a_later_request():
+    from src.utils.audit import ApiAccessAggregator
+
+    aggregator = ApiAccessAggregator()
+    assert aggregator.add('sessions.get_sessions', 'GET', 200, 12.5) == []
+    aggregator.add('sessions.get_sessions', 'GET', 200, 7.5)
+    # Nothing is handed out while the minute is still running
+    assert aggregator.take_finished() == []
+
+    aggregator._minute -= timedelta(minutes=1)
+    rows = aggregator.take_finished()
+    assert len(rows) == 1
+    assert rows[0]['action'] == 'api_access_summary'
+    assert rows[0]['details']['count'] == 2
+    assert rows[0]['details']['total_response_time_ms'] == 20.0
+    assert aggregator.take_finished() == []
+    assert aggregator.drain() == []
+
+
+def test_flush_thread_stops_on_close(app):
+    aggregator = app.extensions['audit_aggregator']
+    aggregator.add('sessions.get_sessions', 'GET', 200, 1.0)
+    assert aggregator._thread.is_alive()
+
+    aggregator.close()
+    assert not aggregator._thread.is_alive()
+
+
+def test_policy_given_as_lists_is_usable(app, client, db, make_user, auth_headers):
+    from src.models.user import AuditLog
+    from src.utils.audit import ALWAYS, init_audit_writer
+
+    app.config['AUDIT_POLICY'] = [['*', ['GET'], ALWAYS]]
+    init_audit_writer(app)
+    assert app.config['AUDIT_POLICY'] == (('*', ('GET',), ALWAYS),)
+
+    headers = auth_headers(make_user('admin@example.com', 'admin'))
+    for _ in range(2):
+        assert client.get('/api/admin/users', headers=headers).status_code == 200
+    assert db.session.query(AuditLog).filter_by(action='api_access').count() == 2
@@ -0,0 +1,35 @@
+import json
+
+
+def _failing_entries(*args, **kwargs):
+    yield {'id': 1, 'action': 'login'}
+    yield {'id': 2, 'action': 'logout'}
+    raise RuntimeError('connection lost')
+
+
+def test_export_that_fails_part_way_ends_with_a_marker(client, make_user, auth_headers, monkeypatch):
+    import src.routes.admin as admin_routes
+
+    monkeypatch.setattr(admin_routes, 'audit_entries', _failing_entries)
+    headers = auth_headers(make_user('admin@example.com', 'admin'))
+
+    response = client.get('/api/admin/audit/export', headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line.get('id') for line in lines[:2]] == [1, 2]
+    assert lines[-1] == {'export_truncated': True, 'rows': 2}
+
+    response = client.get('/api/admin/audit/export?format=csv', headers=headers)
+    rows = response.get_data(as_text=True).splitlines()
+    assert len(rows) == 4
+    assert rows[-1] == '# export truncated after 2 rows'
+
+
+def test_complete_export_has_no_marker(client, make_user, auth_headers, monkeypatch):
+    import src.routes.admin as admin_routes
+
+    monkeypatch.setattr(admin_routes, 'audit_entries', lambda *args, **kwargs: iter([{'id': 1}]))
+    headers = auth_headers(make_user('admin@example.com', 'admin'))
+
+    response = client.get('/api/admin/audit/export', headers=headers)
+    assert response.get_data(as_text=True).splitlines() == ['{"id":1}']
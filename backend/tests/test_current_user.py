@@ -0,0 +1,48 @@
+import re
+
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+
+USER_SELECT = re.compile(r'^SELECT .*\sFROM "?user"?(\s|$)', re.DOTALL)
+
+
+def test_current_user_is_loaded_once_per_request(app, db, client, make_user, auth_headers, count_queries,
+                                                 monkeypatch):
+    from src.models import User
+    from src.utils.security import get_current_user, log_api_access, require_role
+
+    @app.route('/test/current-user')
+    @jwt_required()
+    @require_role('admin')
+    @log_api_access
+    def current_user_route():
+        users = [get_current_user() for _ in range(3)]
+        return jsonify({'ids': [user.id for user in users]})
+
+    admin = make_user('admin@example.com', 'admin')
+    headers = auth_headers(admin)
+    # The first request also syncs the token blocklist; keep it out of the counts
+    client.get('/test/current-user', headers=headers)
+    # Requests share the test's session, so make the user come from the database
+    db.session.expunge_all()
+
+    # The identity map would hide repeated lookups from the SQL count, so
+    # count the lookups themselves too
+    lookups = []
+    session_get = db.session.get
+
+    def counting_get(entity, *args, **kwargs):
+        if entity is User:
+            lookups.append(args)
+        return session_get(entity, *args, **kwargs)
+
+    monkeypatch.setattr(db.session, 'get', counting_get)
+
+    with count_queries() as queries:
+        response = client.get('/test/current-user', headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['ids'] == [admin.id] * 3
+    assert len(lookups) == 1
+    user_selects = [s for s in queries.statements if USER_SELECT.match(s)]
+    assert len(user_selects) == 1, user_selects
@@ -0,0 +1,123 @@
+import os
+from datetime import datetime
+
+import pytest
+
+CONTENT = bytes(range(256)) * 4
+ETAG = 'a' * 64
+
+
+@pytest.fixture
+def stored_file(app):
+    path = os.path.join(app.config['UPLOAD_FOLDER'], 'stored.pdf')
+    with open(path, 'wb') as f:
+        f.write(CONTENT)
+    return path
+
+
+def _send(app, path, headers=None):
+    from src.utils.file_delivery import send_stored_file
+
+    with app.test_request_context(headers=headers):
+        response = send_stored_file(path, 'application/pdf', etag=ETAG, last_modified=datetime(2025, 1, 1))
+        response.direct_passthrough = False
+        return response.status_code, response.headers, response.get_data()
+
+
+def test_whole_file_advertises_ranges(app, stored_file):
+    status, headers, body = _send(app, stored_file)
+    assert status == 200
+    assert body == CONTENT
+    assert headers['Accept-Ranges'] == 'bytes'
+    assert headers['ETag'] == f'"{ETAG}"'
+
+
+def test_matching_if_none_match_is_not_modified(app, stored_file):
+    status, headers, body = _send(app, stored_file, {'If-None-Match': f'"{ETAG}"', 'Range': 'bytes=0-9'})
+    assert status == 304
+    assert body == b''
+    assert 'Content-Range' not in headers
+
+
+def test_single_range(app, stored_file):
+    status, headers, body = _send(app, stored_file, {'Range': 'bytes=10-19'})
+    assert status == 206
+    assert body == CONTENT[10:20]
+    assert headers['Content-Range'] == f'bytes 10-19/{len(CONTENT)}'
+    assert headers['Content-Length'] == '10'
+
+
+def test_suffix_range(app, stored_file):
+    status, headers, body = _send(app, stored_file, {'Range': 'bytes=-100'})
+    assert status == 206
+    assert body == CONTENT[-100:]
+    assert headers['Content-Range'] == f'bytes {len(CONTENT) - 100}-{len(CONTENT) - 1}/{len(CONTENT)}'
+
+
+def test_multiple_ranges(app, stored_file):
+    status, headers, body = _send(app, stored_file, {'Range': 'bytes=0-4,100-109'})
+    assert status == 206
+    assert headers['Content-Type'].startswith('multipart/byteranges; boundary=')
+    assert int(headers['Content-Length']) == len(body)
+    boundary = headers['Content-Type'].split('boundary=')[1].encode()
+    parts = body.split(b'--' + boundary)
+    assert parts[-1] == b'--\r\n'
+    assert parts[1].endswith(b'\r\n\r\n' + CONTENT[0:5] + b'\r\n')
+    assert f'Content-Range: bytes 0-4/{len(CONTENT)}'.encode() in parts[1]
+    assert parts[2].endswith(b'\r\n\r\n' + CONTENT[100:110] + b'\r\n')
+    assert f'Content-Range: bytes 100-109/{len(CONTENT)}'.encode() in parts[2]
+
+
+def test_unsatisfiable_range(app, stored_file):
+    status, headers, body = _send(app, stored_file, {'Range': f'bytes={len(CONTENT) + 10}-'})
+    assert status == 416
+    assert body == b''
+    assert headers['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+
+def test_stale_if_range_gets_the_whole_file(app, stored_file):
+    status, _, body = _send(app, stored_file, {'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert status == 200
+    assert body == CONTENT
+
+
+@pytest.mark.parametrize('prefix', ['/protected-files/', '/protected-files'])
+def test_x_accel_redirect_hands_the_file_to_nginx(app, stored_file, prefix):
+    app.config['FILE_DELIVERY'] = 'x-accel-redirect'
+    app.config['FILE_DELIVERY_PREFIX'] = prefix
+    status, headers, body = _send(app, stored_file, {'Range': 'bytes=0-9'})
+    # nginx answers the range itself
+    assert status == 200
+    assert body == b''
+    assert headers['X-Accel-Redirect'] == '/protected-files/stored.pdf'
+    assert 'X-Sendfile' not in headers
+    assert headers['ETag'] == f'"{ETAG}"'
+
+
+def test_x_accel_redirect_sends_files_outside_the_upload_folder_itself(app, tmp_path):
+    app.config['FILE_DELIVERY'] = 'x-accel-redirect'
+    path = tmp_path / 'elsewhere.pdf'
+    path.write_bytes(CONTENT)
+    status, headers, body = _send(app, str(path))
+    assert status == 200
+    assert body == CONTENT
+    assert 'X-Accel-Redirect' not in headers
+
+
+def test_x_sendfile_hands_the_path_to_the_server(app, stored_file):
+    app.config['FILE_DELIVERY'] = 'x-sendfile'
+    status, headers, body = _send(app, stored_file)
+    assert status == 200
+    assert body == b''
+    assert headers['X-Sendfile'] == os.path.abspath(stored_file)
+    assert 'X-Accel-Redirect' not in headers
+
+
+def test_unknown_delivery_mode_is_refused_at_startup(tmp_path, monkeypatch):
+    from src.main import create_app
+
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv('UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    monkeypatch.setenv('FILE_DELIVERY', 'x-accel')
+    with pytest.raises(ValueError, match='FILE_DELIVERY'):
+        create_app()
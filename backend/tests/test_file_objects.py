@@ -0,0 +1,47 @@
+import os
+
+
+def test_apply_creates_then_increments_a_missing_object(db):
+    from src.models import FileObject
+
+    sha256 = 'ab' * 32
+    with db.engine.begin() as connection:
+        FileObject.apply(connection, {sha256: 1}, {sha256: 10})
+    with db.engine.begin() as connection:
+        FileObject.apply(connection, {sha256: 2}, {sha256: 10})
+    with db.engine.begin() as connection:
+        FileObject.apply(connection, {sha256: -1, 'cd' * 32: -1}, {})
+
+    stored = db.session.get(FileObject, sha256)
+    assert (stored.ref_count, stored.size) == (2, 10)
+    assert db.session.get(FileObject, 'cd' * 32) is None
+
+
+def test_prune_legacy_files_keeps_referenced_files(app, db, make_user, make_sessions):
+    from src.models import SessionFile
+
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    legacy = os.path.join(app.config['UPLOAD_FOLDER'], 'sessions', str(session.id))
+    os.makedirs(legacy)
+    paths = {}
+    for name in ('moved.pdf', 'current.pdf'):
+        paths[name] = os.path.join(legacy, name)
+        with open(paths[name], 'wb') as f:
+            f.write(b'%PDF-1.4\n')
+    # A row the migration could not move still names its original file
+    db.session.add(SessionFile(
+        session_id=session.id, filename='current.pdf', original_filename='current.pdf',
+        file_path=paths['current.pdf'], file_size=9, mime_type='application/pdf', uploaded_by=admin.id
+    ))
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['prune-legacy-files', '--dry-run'])
+    assert '1 legacy files would be removed' in result.output
+    assert os.path.exists(paths['moved.pdf'])
+
+    result = runner.invoke(args=['prune-legacy-files'])
+    assert '1 legacy files removed' in result.output
+    assert not os.path.exists(paths['moved.pdf'])
+    assert os.path.exists(paths['current.pdf'])
@@ -0,0 +1,27 @@
+import pytest
+
+
+def test_limiter_missing_a_storage_method_cannot_be_built():
+    from src.utils.rate_limit import RateLimiter
+
+    class Incomplete(RateLimiter):
+        def _increment(self, key, start, window, expires_at):
+            return 1, 0
+
+    with pytest.raises(TypeError, match='_prune'):
+        Incomplete()
+
+
+def test_memory_limiter_refuses_past_the_limit():
+    from src.utils.rate_limit import MemoryRateLimiter
+
+    limiter = MemoryRateLimiter()
+    results = [limiter.hit('client', 2, 60)[0] for _ in range(3)]
+    assert results == [True, True, False]
+
+
+def test_rate_limit_headers_are_exposed_to_the_frontend(client):
+    response = client.get('/api/health')
+    exposed = [name.strip() for name in response.headers['Access-Control-Expose-Headers'].split(',')]
+    for name in ('X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset', 'Retry-After'):
+        assert name in exposed
@@ -0,0 +1,55 @@
+import base64
+import hashlib
+
+
+def _create(client, session, headers, filename, length):
+    metadata = 'filename ' + base64.b64encode(filename.encode()).decode()
+    return client.post(
+        f'/api/sessions/sessions/{session.id}/uploads',
+        headers={**headers, 'Tus-Resumable': '1.0.0', 'Upload-Length': str(length), 'Upload-Metadata': metadata}
+    )
+
+
+def _send(client, location, headers, content, chunk_size):
+    response = None
+    for offset in range(0, len(content), chunk_size):
+        response = client.patch(
+            location,
+            data=content[offset:offset + chunk_size],
+            headers={**headers, 'Tus-Resumable': '1.0.0', 'Upload-Offset': str(offset),
+                     'Content-Type': 'application/offset+octet-stream'}
+        )
+    return response
+
+
+def test_chunked_upload_is_hashed_once_complete(app, client, make_user, make_sessions, auth_headers, pdf_bytes):
+    app.config['RESUMABLE_CHUNK_SIZE'] = 16
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    headers = auth_headers(admin)
+
+    response = _create(client, session, headers, 'deck.pdf', len(pdf_bytes))
+    assert response.status_code == 201
+    response = _send(client, response.headers['Location'], headers, pdf_bytes, 16)
+
+    assert response.status_code == 201
+    stored = response.get_json()['file']
+    assert stored['filename'] == hashlib.sha256(pdf_bytes).hexdigest()
+    assert stored['mime_type'] == 'application/pdf'
+
+
+def test_chunked_upload_with_contradicting_contents_is_discarded(app, db, client, make_user, make_sessions,
+                                                                auth_headers, html_bytes):
+    from src.models import ResumableUpload, SessionFile
+
+    app.config['RESUMABLE_CHUNK_SIZE'] = 32
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    headers = auth_headers(admin)
+
+    response = _create(client, session, headers, 'deck.pdf', len(html_bytes))
+    response = _send(client, response.headers['Location'], headers, html_bytes, 32)
+
+    assert response.status_code == 400
+    assert ResumableUpload.query.count() == 0
+    assert SessionFile.query.count() == 0
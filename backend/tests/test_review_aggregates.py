@@ -0,0 +1,54 @@
+def test_review_aggregates_follow_review_changes(db, make_user, make_sessions):
+    from src.models import SessionReview
+
+    reviewer = make_user('reviewer@example.com', 'reviewer')
+    speaker = make_user('speaker@example.com')
+    session = make_sessions(speaker, reviewer, 1)[0]
+
+    review = SessionReview(session.id, reviewer.id)
+    db.session.add(review)
+    db.session.commit()
+    assert session.review_summary['total_reviews'] == 2
+    assert session.review_summary['completed_reviews'] == 1
+
+    review.complete_review('reject', overall_score=2)
+    db.session.commit()
+    assert session.review_summary == {
+        'total_reviews': 2, 'completed_reviews': 2, 'average_score': 3.0, 'recommendation': 'pending'
+    }
+
+    db.session.delete(review)
+    db.session.commit()
+    assert session.review_summary['total_reviews'] == 1
+    assert session.reject_count == 0
+    assert not session.recompute_review_aggregates()
+
+
+def test_concurrent_reviews_do_not_lose_updates(db, make_user, make_sessions):
+    from src.models import Session, SessionReview
+
+    reviewer = make_user('reviewer@example.com', 'reviewer')
+    speaker = make_user('speaker@example.com')
+    session_id = make_sessions(speaker, reviewer, 1)[0].id
+    db.session.add_all([SessionReview(session_id, reviewer.id), SessionReview(session_id, reviewer.id)])
+    db.session.commit()
+    first_id, second_id = [r.id for r in SessionReview.query.filter_by(status='assigned')]
+
+    # Both sides have the session's aggregates loaded before either commits
+    other = db.session.session_factory()
+    try:
+        db.session.get(Session, session_id).review_count
+        other.get(Session, session_id).review_count
+
+        db.session.get(SessionReview, first_id).complete_review('approve', overall_score=5)
+        db.session.commit()
+        other.get(SessionReview, second_id).complete_review('approve', overall_score=3)
+        other.commit()
+    finally:
+        other.close()
+
+    session = db.session.get(Session, session_id)
+    db.session.refresh(session)
+    assert session.completed_review_count == 3
+    assert session.approve_count == 3
+    assert session.review_score_sum == 12
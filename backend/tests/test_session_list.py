@@ -0,0 +1,32 @@
+def test_session_list_query_count_is_independent_of_page_size(client, make_user, make_sessions, auth_headers, count_queries):
+    admin = make_user('admin@example.com', 'admin')
+    speaker = make_user('speaker@example.com')
+    make_sessions(speaker, admin, 30)
+    headers = auth_headers(admin)
+    # The first request also syncs the token blocklist; keep it out of the counts
+    client.get('/api/sessions/sessions', headers=headers)
+
+    counts = {}
+    for per_page in (5, 25):
+        with count_queries() as queries:
+            response = client.get(f'/api/sessions/sessions?per_page={per_page}', headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['sessions']) == per_page
+        counts[per_page] = queries.count
+
+    assert counts[5] == counts[25]
+
+
+def test_session_type_is_serialized_without_speakers(client, make_user, make_sessions, auth_headers):
+    admin = make_user('admin@example.com', 'admin')
+    speaker = make_user('speaker@example.com')
+    make_sessions(speaker, admin, 1)
+
+    response = client.get('/api/sessions/sessions?include=files', headers=auth_headers(admin))
+    assert response.status_code == 200
+    session = response.get_json()['sessions'][0]
+    assert 'primary_speaker' not in session
+    assert session['session_type']['name'] == 'Talk'
+
+    response = client.get('/api/sessions/sessions?fields=title', headers=auth_headers(admin))
+    assert 'session_type' not in response.get_json()['sessions'][0]
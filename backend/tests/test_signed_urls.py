@@ -0,0 +1,87 @@
+import io
+import zipfile
+
+
+def _pptx():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as pptx:
+        pptx.writestr('[Content_Types].xml', '<Types/>')
+        pptx.writestr('_rels/.rels', '<Relationships/>')
+        pptx.writestr('ppt/presentation.xml', '<presentation/>')
+    return buffer.getvalue()
+
+
+def _upload_and_sign(client, upload_file, session, headers, content, filename, disposition='inline'):
+    response = upload_file(session, headers, content, filename)
+    assert response.status_code == 201
+    file_id = response.get_json()['file']['id']
+    response = client.get(
+        f'/api/sessions/sessions/{session.id}/files/{file_id}/signed-url?disposition={disposition}',
+        headers=headers
+    )
+    assert response.status_code == 200
+    return file_id, response.get_json()
+
+
+def test_signed_file_is_sandboxed(client, make_user, make_sessions, auth_headers, upload_file, pdf_bytes):
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    _, signed = _upload_and_sign(client, upload_file, session, auth_headers(admin), pdf_bytes, 'deck.pdf')
+
+    response = client.get(signed['url'])
+    assert response.status_code == 200
+    assert response.get_data() == pdf_bytes
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+    assert response.headers['Content-Security-Policy'] == 'sandbox'
+    assert response.headers['Content-Disposition'].startswith('inline')
+
+
+def test_types_not_shown_inline_are_attachments(client, make_user, make_sessions, auth_headers, upload_file):
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    _, signed = _upload_and_sign(client, upload_file, session, auth_headers(admin), _pptx(), 'deck.pptx')
+
+    assert 'disposition=attachment' in signed['url']
+    response = client.get(signed['url'])
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'].startswith('attachment')
+
+    # Changing the disposition breaks the signature
+    response = client.get(signed['url'].replace('disposition=attachment', 'disposition=inline'))
+    assert response.status_code == 403
+
+
+def test_inline_signature_for_other_types_is_served_as_attachment(app, client, make_user, make_sessions,
+                                                                 auth_headers, upload_file):
+    from urllib.parse import parse_qs, urlencode, urlsplit
+    from src.utils.signed_urls import _signature
+
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    _, signed = _upload_and_sign(client, upload_file, session, auth_headers(admin), _pptx(), 'deck.pptx')
+
+    # As a URL signed before dispositions depended on the type
+    url = urlsplit(signed['url'])
+    args = {key: values[0] for key, values in parse_qs(url.query).items()}
+    file_id, sha256 = url.path.rsplit('/', 2)[1:]
+    args['disposition'] = 'inline'
+    args['sig'] = _signature(int(file_id), sha256, int(args['expires']), args['type'], args['name'], 'inline')
+
+    response = client.get(f'{url.path}?{urlencode(args)}')
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'].startswith('attachment')
+
+
+def test_issued_urls_are_audited(db, client, make_user, make_sessions, auth_headers, upload_file, pdf_bytes):
+    from src.models import AuditLog
+
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    file_id, signed = _upload_and_sign(client, upload_file, session, auth_headers(admin), pdf_bytes, 'deck.pdf')
+
+    issued = AuditLog.query.filter_by(action='signed_url_issued').all()
+    assert len(issued) == 1
+    assert (issued[0].user_id, issued[0].resource_id) == (admin.id, file_id)
+    assert issued[0].details['expires_at'] == signed['expires_at']
+    access = AuditLog.query.filter_by(action='api_access').all()
+    assert 'sessions.sign_session_file_url' in [entry.details['endpoint'] for entry in access]
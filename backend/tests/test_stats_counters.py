@@ -0,0 +1,59 @@
+def test_apply_creates_then_increments_a_missing_counter(db):
+    from src.models import StatsCounter
+
+    with db.engine.begin() as connection:
+        StatsCounter.apply(connection, {'test.missing': 2})
+    with db.engine.begin() as connection:
+        StatsCounter.apply(connection, {'test.missing': 3, 'test.zero': 0})
+
+    assert db.session.get(StatsCounter, 'test.missing').value == 5
+    assert db.session.get(StatsCounter, 'test.zero') is None
+
+
+def _assert_counters_match(app, db):
+    from src.models import StatsCounter
+    from src.utils.stats import expected_counters
+
+    db.session.expire_all()
+    stored = {counter.name: counter.value for counter in StatsCounter.query if counter.value}
+    expected = {name: value for name, value in expected_counters().items() if value}
+    assert stored == expected
+
+    result = app.test_cli_runner().invoke(args=['reconcile-stats', '--dry-run'])
+    assert result.output.strip().endswith('found 0')
+
+
+def test_flush_hooks_keep_counters_in_step_with_orm_changes(app, db, make_user, make_sessions):
+    from src.models import Role, SessionFile
+
+    admin = make_user('admin@example.com', 'admin')
+    speaker = make_user('speaker@example.com')
+    leaving = make_user('leaving@example.com')
+    session = make_sessions(speaker, admin, 1)[0]
+    db.session.add(SessionFile(
+        session_id=session.id, filename='a' * 64, original_filename='deck.pdf', file_path='/nowhere',
+        file_size=1234, mime_type='application/pdf', uploaded_by=speaker.id, file_hash='a' * 64
+    ))
+    db.session.commit()
+    _assert_counters_match(app, db)
+
+    # Status change
+    session.status = 'approved'
+    db.session.commit()
+    _assert_counters_match(app, db)
+
+    # Role change
+    speaker.roles.append(Role.query.filter_by(name='admin').one())
+    db.session.commit()
+    _assert_counters_match(app, db)
+
+    # Deactivation, of a user whose attributes were expired by the commit
+    db.session.expire(speaker)
+    speaker.is_active = False
+    db.session.commit()
+    _assert_counters_match(app, db)
+
+    # Deletion
+    db.session.delete(leaving)
+    db.session.commit()
+    _assert_counters_match(app, db)
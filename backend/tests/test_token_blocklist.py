@@ -0,0 +1,27 @@
+import pytest
+
+
+def test_blocklist_missing_a_storage_method_cannot_be_built():
+    from src.utils.token_blocklist import TokenBlocklist
+
+    class Incomplete(TokenBlocklist):
+        def _add(self, jti, expires, token_type, user_id):
+            pass
+
+        def _since(self, since, now):
+            return []
+
+    with pytest.raises(TypeError, match='_prune'):
+        Incomplete()
+
+
+def test_database_blocklist_revokes_across_instances(app):
+    from src.utils.token_blocklist import DatabaseTokenBlocklist
+
+    revoking, other = DatabaseTokenBlocklist(), DatabaseTokenBlocklist()
+    other.sync()
+    revoking.revoke({'jti': 'abc', 'exp': 4102444800, 'type': 'access', 'sub': 1})
+
+    assert revoking.is_revoked('abc')
+    other.sync()
+    assert other.is_revoked('abc')
@@ -0,0 +1,18 @@
+def test_epoch_cache_is_bounded_and_forgets_revoked_users(app, db, make_user):
+    from src.utils.security import forget_token_epoch, token_epoch_cache, token_epoch_is_current
+
+    app.config['AUTH_EPOCH_CACHE_SIZE'] = 2
+    token_epoch_cache.clear()
+    users = [make_user(f'user{i}@example.com') for i in range(3)]
+    for user in users:
+        assert token_epoch_is_current(user.id, user.token_epoch)
+
+    assert list(token_epoch_cache) == [users[1].id, users[2].id]
+
+    users[2].revoke_tokens()
+    db.session.commit()
+    # Still cached as current until forgotten
+    assert token_epoch_is_current(users[2].id, users[2].token_epoch - 1)
+    forget_token_epoch(users[2].id)
+    assert not token_epoch_is_current(users[2].id, users[2].token_epoch - 1)
+    token_epoch_cache.clear()
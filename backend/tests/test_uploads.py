@@ -0,0 +1,53 @@
+import os
+
+
+def _stored_objects(app):
+    root = os.path.join(app.config['UPLOAD_FOLDER'], 'objects')
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+def test_html_named_as_pdf_is_refused(app, make_user, make_sessions, auth_headers, upload_file, html_bytes):
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+
+    response = upload_file(session, auth_headers(admin), html_bytes, 'deck.pdf')
+
+    assert response.status_code == 400
+    assert 'text/html' in response.get_json()['error']
+    assert _stored_objects(app) == []
+    assert os.listdir(os.path.join(app.config['UPLOAD_FOLDER'], 'incoming')) == []
+
+
+def test_pdf_is_stored_and_served_as_pdf(app, client, make_user, make_sessions, auth_headers, upload_file,
+                                         pdf_bytes):
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    headers = auth_headers(admin)
+
+    response = upload_file(session, headers, pdf_bytes, 'deck.pdf')
+    assert response.status_code == 201
+    file_id = response.get_json()['file']['id']
+    assert response.get_json()['file']['mime_type'] == 'application/pdf'
+
+    response = client.get(f'/api/sessions/sessions/{session.id}/files/{file_id}/view', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.get_data() == pdf_bytes
+
+
+def test_active_type_stored_earlier_is_served_as_a_download(db, client, make_user, make_sessions, auth_headers,
+                                                            upload_file, pdf_bytes):
+    from src.models import SessionFile
+
+    admin = make_user('admin@example.com', 'admin')
+    session = make_sessions(make_user('speaker@example.com'), admin, 1)[0]
+    headers = auth_headers(admin)
+    file_id = upload_file(session, headers, pdf_bytes, 'deck.pdf').get_json()['file']['id']
+    # As a file sniffed before types were checked against the extension
+    db.session.get(SessionFile, file_id).mime_type = 'text/html'
+    db.session.commit()
+
+    response = client.get(f'/api/sessions/sessions/{session.id}/files/{file_id}/view', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/octet-stream'
+    assert response.headers['Content-Disposition'].startswith('attachment')
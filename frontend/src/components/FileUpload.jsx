@@ -16,14 +16,123 @@ import {
   Download,
   Eye,
 } from 'lucide-react';
+import { useAuth } from '../contexts/AuthContext';
+
+const TUS_VERSION = '1.0.0';
+const CHUNK_RETRIES = 5;
+
+// Remembers an unfinished upload of the same file across page reloads
+const uploadKey = (sessionId, file) =>
+  `upload:${sessionId}:${file.name}:${file.size}:${file.lastModified}`;
+
+const encodeMetadata = (value) => btoa(unescape(encodeURIComponent(value)));
+
+const headerInt = (response, name) => parseInt(response.headers.get(name), 10);
+
+// Sends a file to the session's resumable upload endpoints in the chunk size
+// the server asks for. A dropped chunk is retried from the offset the server
+// reports, and an upload cut short earlier carries on where it stopped.
+const uploadResumable = async (apiCall, sessionId, file, onProgress) => {
+  const uploadsPath = `/sessions/sessions/${sessionId}/uploads`;
+  const key = uploadKey(sessionId, file);
+  let uploadPath = null;
+  let offset = 0;
+  let chunkSize = 0;
+
+  const savedId = localStorage.getItem(key);
+  if (savedId) {
+    const response = await apiCall(`${uploadsPath}/${savedId}`, {
+      method: 'HEAD',
+      headers: { 'Tus-Resumable': TUS_VERSION },
+    });
+    if (response.ok) {
+      uploadPath = `${uploadsPath}/${savedId}`;
+      offset = headerInt(response, 'Upload-Offset');
+      chunkSize = headerInt(response, 'Upload-Chunk-Size');
+    } else {
+      localStorage.removeItem(key);
+    }
+  }
+
+  if (!uploadPath) {
+    const response = await apiCall(uploadsPath, {
+      method: 'POST',
+      headers: {
+        'Tus-Resumable': TUS_VERSION,
+        'Upload-Length': String(file.size),
+        'Upload-Metadata': `filename ${encodeMetadata(file.name)}`,
+      },
+    });
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.error || 'Could not start the upload');
+    }
+    uploadPath = `${uploadsPath}/${data.upload.id}`;
+    chunkSize = data.upload.chunk_size;
+    localStorage.setItem(key, data.upload.id);
+  }
+
+  let failures = 0;
+  for (;;) {
+    onProgress((offset / file.size) * 100);
+
+    let response = null;
+    try {
+      response = await apiCall(uploadPath, {
+        method: 'PATCH',
+        headers: {
+          'Tus-Resumable': TUS_VERSION,
+          'Content-Type': 'application/offset+octet-stream',
+          'Upload-Offset': String(offset),
+        },
+        body: file.slice(offset, offset + chunkSize),
+      });
+    } catch (error) {
+      // Connection dropped; ask the server how far it got below
+    }
+
+    if (response && response.status === 201) {
+      localStorage.removeItem(key);
+      onProgress(100);
+      return (await response.json()).file;
+    }
+    if (response && response.status === 204) {
+      offset = headerInt(response, 'Upload-Offset');
+      failures = 0;
+      continue;
+    }
+    if (response && response.status !== 409 && response.status < 500) {
+      const data = await response.json().catch(() => ({}));
+      if (response.status === 404) {
+        localStorage.removeItem(key);
+      }
+      throw new Error(data.error || `Upload failed (HTTP ${response.status})`);
+    }
+
+    failures += 1;
+    if (failures > CHUNK_RETRIES) {
+      throw new Error('Upload interrupted. Choose the file again to resume where it stopped.');
+    }
+    await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** (failures - 1)));
+    const head = await apiCall(uploadPath, {
+      method: 'HEAD',
+      headers: { 'Tus-Resumable': TUS_VERSION },
+    }).catch(() => null);
+    if (head && head.ok) {
+      offset = headerInt(head, 'Upload-Offset');
+    }
+  }
+};
 
 const FileUpload = ({ 
   onFileUpload, 
   existingFile = null, 
+  sessionId = null, // uploads to the server when set
   maxSize = 100 * 1024 * 1024, // 100MB default
   acceptedTypes = ['.pdf', '.ppt', '.pptx', '.mp4', '.mov'],
   disabled = false 
 }) => {
+  const { apiCall } = useAuth();
   const [uploadProgress, setUploadProgress] = useState(0);
   const [uploading, setUploading] = useState(false);
   const [error, setError] = useState('');
@@ -95,19 +204,30 @@ const FileUpload = ({
     setUploadProgress(0);
 
     try {
-      // Simulate file upload progress
-      await simulateUpload(file);
-
-      // Create file object
-      const fileData = {
-        id: Date.now(), // In real app, this would come from server
-        original_filename: file.name,
-        file_size: file.size,
-        file_type: file.type,
-        upload_date: new Date().toISOString(),
-        file_hash: 'sha256_' + Math.random().toString(36).substring(7), // Mock hash
-        version: 1,
-      };
+      let fileData;
+      if (sessionId) {
+        const uploaded = await uploadResumable(apiCall, sessionId, file, setUploadProgress);
+        fileData = {
+          ...uploaded,
+          file_type: uploaded.mime_type,
+          upload_date: uploaded.uploaded_at,
+          version: uploaded.version_number,
+        };
+      } else {
+        // Simulate file upload progress
+        await simulateUpload(file);
+
+        // Create file object
+        fileData = {
+          id: Date.now(), // In real app, this would come from server
+          original_filename: file.name,
+          file_size: file.size,
+          file_type: file.type,
+          upload_date: new Date().toISOString(),
+          file_hash: 'sha256_' + Math.random().toString(36).substring(7), // Mock hash
+          version: 1,
+        };
+      }
 
       setUploadedFile(fileData);
       
@@ -117,7 +237,7 @@ const FileUpload = ({
       }
 
     } catch (error) {
-      setError('Upload failed. Please try again.');
+      setError(error.message || 'Upload failed. Please try again.');
     } finally {
       setUploading(false);
       setUploadProgress(0);
@@ -128,7 +248,7 @@ const FileUpload = ({
     if (acceptedFiles.length > 0) {
       handleFileUpload(acceptedFiles[0]);
     }
-  }, []);
+  }, [sessionId]);
 
   const { getRootProps, getInputProps, isDragActive } = useDropzone({
     onDrop,
@@ -42,7 +42,7 @@ const NotificationCenter = () => {
 
   const fetchNotifications = async () => {
     try {
-      const response = await apiCall('/notifications');
+      const response = await apiCall('/notifications?count=none');
       if (response.ok) {
         const data = await response.json();
         setNotifications(data.notifications || []);
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Alert, AlertDescription } from '@/components/ui/alert';
@@ -16,6 +16,20 @@ import {
   Eye,
   ExternalLink,
 } from 'lucide-react';
+import { useAuth } from '../contexts/AuthContext';
+
+// Signed URLs let the browser fetch a file itself (video seeking, new tabs,
+// downloads) without the bearer token; they expire after a few minutes
+const fetchSignedUrl = async (apiCall, apiBaseUrl, file, disposition = 'inline') => {
+  const response = await apiCall(
+    `/sessions/sessions/${file.session_id}/files/${file.id}/signed-url?disposition=${disposition}`
+  );
+  const data = await response.json();
+  if (!response.ok) {
+    throw new Error(data.error || 'Failed to load file');
+  }
+  return new URL(data.url, apiBaseUrl).href;
+};
 
 const PresentationViewer = ({ 
   file, 
@@ -27,6 +41,11 @@ const PresentationViewer = ({
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [zoom, setZoom] = useState(100);
+  const [videoUrl, setVideoUrl] = useState('');
+  const videoRef = useRef(null);
+  const { apiCall, API_BASE_URL } = useAuth();
+
+  const isVideo = Boolean(file) && /\.(mp4|mov)$/i.test(file.original_filename);
 
   useEffect(() => {
     if (file) {
@@ -34,6 +53,21 @@ const PresentationViewer = ({
     }
   }, [file]);
 
+  useEffect(() => {
+    setVideoUrl('');
+    if (!isVideo || !file.session_id) {
+      return undefined;
+    }
+    let cancelled = false;
+    fetchSignedUrl(apiCall, API_BASE_URL, file)
+      .then((url) => !cancelled && setVideoUrl(url))
+      .catch((err) => !cancelled && setError(err.message));
+    return () => {
+      cancelled = true;
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [file?.id, isVideo]);
+
   if (!file) {
     return (
       <Card className={className}>
@@ -80,19 +114,58 @@ const PresentationViewer = ({
     });
   };
 
-  const handleDownload = () => {
-    // In a real application, this would trigger a download from the server
-    const link = document.createElement('a');
-    link.href = `/api/sessions/files/${file.id}/download`;
-    link.download = file.original_filename;
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
+  const handleDownload = async () => {
+    try {
+      const link = document.createElement('a');
+      link.href = await fetchSignedUrl(apiCall, API_BASE_URL, file, 'attachment');
+      link.download = file.original_filename;
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+    } catch (err) {
+      setError(err.message);
+    }
+  };
+
+  const handleFullscreen = async () => {
+    // Opened before the URL is fetched so it is not taken for a popup
+    const viewer = window.open('', '_blank');
+    try {
+      const url = await fetchSignedUrl(apiCall, API_BASE_URL, file);
+      if (viewer) {
+        viewer.location = url;
+      }
+    } catch (err) {
+      viewer?.close();
+      setError(err.message);
+    }
   };
 
-  const handleFullscreen = () => {
-    // In a real application, this would open the file in fullscreen mode
-    window.open(`/api/sessions/files/${file.id}/view`, '_blank');
+  const handleVideoError = async () => {
+    // The signed URL expired mid-playback: sign a fresh one and carry on
+    // from the same position
+    const video = videoRef.current;
+    if (!video || !videoUrl) {
+      return;
+    }
+    const position = video.currentTime;
+    const wasPlaying = !video.paused;
+    try {
+      const url = await fetchSignedUrl(apiCall, API_BASE_URL, file);
+      if (url === videoUrl) {
+        setError('The video could not be played.');
+        return;
+      }
+      video.addEventListener('loadedmetadata', () => {
+        video.currentTime = position;
+        if (wasPlaying) {
+          video.play().catch(() => {});
+        }
+      }, { once: true });
+      setVideoUrl(url);
+    } catch (err) {
+      setError(err.message);
+    }
   };
 
   const fileType = getFileType();
@@ -210,30 +283,43 @@ const PresentationViewer = ({
         return (
           <div className="space-y-4">
             <div className="border rounded-lg overflow-hidden bg-black">
-              <div className="h-96 flex items-center justify-center">
-                <div className="text-center text-white">
-                  <Video className="mx-auto h-16 w-16 text-blue-400 mb-4" />
-                  <h3 className="text-lg font-medium mb-2">Video Presentation</h3>
-                  <p className="text-gray-300 mb-4">
-                    {file.original_filename}
-                  </p>
-                  <div className="space-x-2">
-                    <Button variant="outline" onClick={handleFullscreen}>
-                      <Eye className="mr-1 h-3 w-3" />
-                      Play Video
-                    </Button>
-                    {showDownload && (
-                      <Button variant="outline" onClick={handleDownload}>
-                        <Download className="mr-1 h-3 w-3" />
-                        Download
-                      </Button>
-                    )}
+              {videoUrl ? (
+                // The server answers Range requests, so the player fetches
+                // only what it shows and can seek anywhere at once
+                <video
+                  ref={videoRef}
+                  src={videoUrl}
+                  controls
+                  preload="metadata"
+                  className="w-full h-96"
+                  onError={handleVideoError}
+                >
+                  {file.original_filename}
+                </video>
+              ) : (
+                <div className="h-96 flex items-center justify-center">
+                  <div className="text-center text-white">
+                    <Video className="mx-auto h-16 w-16 text-blue-400 mb-4" />
+                    <h3 className="text-lg font-medium mb-2">Video Presentation</h3>
+                    <p className="text-gray-300 mb-4">
+                      {file.original_filename}
+                    </p>
+                    <div className="animate-spin rounded-full h-6 w-6 border-b-2 border-white mx-auto"></div>
                   </div>
-                  <p className="text-xs text-gray-400 mt-2">
-                    Click to play the video presentation
-                  </p>
                 </div>
-              </div>
+              )}
+            </div>
+            <div className="flex items-center justify-end space-x-2">
+              <Button variant="outline" size="sm" onClick={handleFullscreen}>
+                <Eye className="mr-1 h-3 w-3" />
+                Open in New Tab
+              </Button>
+              {showDownload && (
+                <Button variant="outline" size="sm" onClick={handleDownload}>
+                  <Download className="mr-1 h-3 w-3" />
+                  Download
+                </Button>
+              )}
             </div>
           </div>
         );